@@ -0,0 +1,9 @@
+"""
+DSP-in-Python Lessons
+=====================
+
+Each lesson's example scripts can be run directly (``python
+signal_types.py``) or imported as modules, e.g.
+``lessons.lesson_03.examples.convolution_basics``. Importing an example
+only loads NumPy; plotting libraries are loaded when ``main()`` runs.
+"""
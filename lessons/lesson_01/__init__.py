@@ -0,0 +1 @@
+"""Lesson 1: Discrete-time Signals."""
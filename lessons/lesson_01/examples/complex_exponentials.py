@@ -10,52 +10,48 @@ Author: DSP-in-Python Repository
 License: MIT
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
+import sys
 from pathlib import Path
 
+import numpy as np
+
+if __package__ in (None, ''):
+    # Run as a script: make the repository root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from utils.common_functions import complex_exponential
+from utils.plotting import get_pyplot, render_figures, render_options, stem
 
-def complex_exponential(n, omega):
+
+def compute_complex_exponential(omega=2 * np.pi / 8, length=32):
     """
-    Generate a complex exponential: e^(j*omega*n)
+    Generate e^(jωn) for n = 0, ..., length - 1.
     
     Parameters:
     -----------
-    n : array-like
-        Time indices
     omega : float
-        Frequency in radians per sample
+        Frequency in rad/sample (default: 2π/8, period 8)
+    length : int
+        Number of samples (default: 32)
     
     Returns:
     --------
-    z : ndarray (complex)
-        Complex exponential signal
+    signals : dict
+        n and z
     """
-    return np.exp(1j * omega * n)
+    n = np.arange(0, length)
+    return dict(n=n, z=complex_exponential(n, omega))
 
 
-def main():
-    """Demonstrate complex exponentials and Euler's formula."""
-    
-    # Set up output directory
-    output_dir = Path(__file__).parent.parent / 'data'
-    output_dir.mkdir(exist_ok=True)
-    
-    # Time index
-    n = np.arange(0, 32)
-    
-    # Frequency
-    omega = 2 * np.pi / 8  # Period of 8 samples
-    
-    # Generate complex exponential
-    z = complex_exponential(n, omega)
-    
+def plot_complex_exponential(n, z):
+    """Build the figure of real/imaginary parts, magnitude, phase and trajectory."""
     # Separate into real and imaginary parts
     real_part = np.real(z)
     imag_part = np.imag(z)
     magnitude = np.abs(z)
     phase = np.angle(z)
     
+    plt = get_pyplot()
+    
     # Create figure with subplots
     fig = plt.figure(figsize=(14, 10))
     fig.suptitle('Complex Exponential Signals: e^(j·2πn/8)', fontsize=16, fontweight='bold')
@@ -65,7 +61,7 @@ def main():
     
     # 1. Real part
     ax1 = fig.add_subplot(gs[0, 0])
-    ax1.stem(n, real_part, basefmt=' ')
+    stem(ax1, n, real_part, basefmt=' ')
     ax1.set_title('Real Part: cos(2πn/8)')
     ax1.set_xlabel('n')
     ax1.set_ylabel('Re{e^(jωn)}')
@@ -74,7 +70,7 @@ def main():
     
     # 2. Imaginary part
     ax2 = fig.add_subplot(gs[0, 1])
-    ax2.stem(n, imag_part, basefmt=' ', linefmt='C1-', markerfmt='C1o')
+    stem(ax2, n, imag_part, basefmt=' ', linefmt='C1-', markerfmt='C1o')
     ax2.set_title('Imaginary Part: sin(2πn/8)')
     ax2.set_xlabel('n')
     ax2.set_ylabel('Im{e^(jωn)}')
@@ -83,7 +79,7 @@ def main():
     
     # 3. Magnitude
     ax3 = fig.add_subplot(gs[1, 0])
-    ax3.stem(n, magnitude, basefmt=' ', linefmt='C2-', markerfmt='C2o')
+    stem(ax3, n, magnitude, basefmt=' ', linefmt='C2-', markerfmt='C2o')
     ax3.set_title('Magnitude: |e^(jωn)|')
     ax3.set_xlabel('n')
     ax3.set_ylabel('|e^(jωn)|')
@@ -94,7 +90,7 @@ def main():
     
     # 4. Phase
     ax4 = fig.add_subplot(gs[1, 1])
-    ax4.stem(n, phase, basefmt=' ', linefmt='C3-', markerfmt='C3o')
+    stem(ax4, n, phase, basefmt=' ', linefmt='C3-', markerfmt='C3o')
     ax4.set_title('Phase: ∠e^(jωn)')
     ax4.set_xlabel('n')
     ax4.set_ylabel('∠e^(jωn) [radians]')
@@ -135,10 +131,40 @@ def main():
     ax5.set_xlim(-1.3, 1.3)
     ax5.set_ylim(-1.3, 1.3)
     
+    return fig
+
+
+def main(show=True, workers=None):
+    """
+    Demonstrate complex exponentials and Euler's formula.
+    
+    Parameters:
+    -----------
+    show : bool
+        Open the figure in a window; False renders headless (default: True)
+    workers : int, optional
+        Number of processes used for headless rendering
+    """
+    
+    # Set up output directory
+    output_dir = Path(__file__).parent.parent / 'data'
+    output_dir.mkdir(exist_ok=True)
+    
+    # Frequency
+    omega = 2 * np.pi / 8  # Period of 8 samples
+    
+    # Generate complex exponential
+    signals = compute_complex_exponential(omega, length=32)
+    n, z = signals['n'], signals['z']
+    
+    # Separate into real and imaginary parts
+    real_part = np.real(z)
+    imag_part = np.imag(z)
+    
     output_path = output_dir / 'complex_exponentials.png'
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    render_figures([(plot_complex_exponential, dict(n=n, z=z), output_path)],
+                   show=show, workers=workers)
     print(f"Figure saved as '{output_path}'")
-    plt.show()
     
     # Print Euler's formula verification
     print("\n" + "="*60)
@@ -159,4 +185,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(**render_options())
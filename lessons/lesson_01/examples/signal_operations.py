@@ -13,10 +13,17 @@ Author: DSP-in-Python Repository
 License: MIT
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
+import sys
 from pathlib import Path
 
+import numpy as np
+
+if __package__ in (None, ''):
+    # Run as a script: make the repository root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from utils.common_functions import rect_pulse
+from utils.plotting import get_pyplot, render_figures, render_options, stem
+
 
 def time_shift(x, n, k):
     """
@@ -63,32 +70,54 @@ def time_reverse(x, n):
     return x[::-1], -n[::-1]
 
 
-def main():
-    """Demonstrate signal operations."""
+def compute_operations(k=5, scale=2.0, n_start=-10, n_stop=11):
+    """
+    Apply the four operations to a rectangular pulse on n = -3, ..., 3.
     
-    # Set up output directory
-    output_dir = Path(__file__).parent.parent / 'data'
-    output_dir.mkdir(exist_ok=True)
+    Parameters:
+    -----------
+    k : int
+        Time shift (default: 5)
+    scale : float
+        Amplitude scale factor (default: 2.0)
+    n_start, n_stop : int
+        Time index range (default: -10, 11)
     
+    Returns:
+    --------
+    signals : dict
+        n, x, n_shifted, x_shifted, n_reversed, x_reversed, x_scaled,
+        x2 and x_sum (the arguments of plot_signal_operations)
+    """
     # Create an example signal: rectangular pulse
-    n = np.arange(-10, 11)
-    x = np.where((n >= -3) & (n <= 3), 1.0, 0.0)
+    n = np.arange(n_start, n_stop)
+    x = rect_pulse(n, -3, 3)
     
     # Perform operations
-    x_shifted, n_shifted = time_shift(x, n, k=5)
+    x_shifted, n_shifted = time_shift(x, n, k=k)
     x_reversed, n_reversed = time_reverse(x, n)
-    x_scaled = 2.0 * x
+    x_scaled = scale * x
     
     # Create composite signal
-    x2 = np.where((n >= 0) & (n <= 5), 0.5, 0.0)
+    x2 = 0.5 * rect_pulse(n, 0, 5)
     x_sum = x + x2
     
+    return dict(n=n, x=x, n_shifted=n_shifted, x_shifted=x_shifted,
+                n_reversed=n_reversed, x_reversed=x_reversed,
+                x_scaled=x_scaled, x2=x2, x_sum=x_sum)
+
+
+def plot_signal_operations(n, x, n_shifted, x_shifted, n_reversed, x_reversed,
+                           x_scaled, x2, x_sum):
+    """Build the 3x2 figure of shifted, reversed, scaled and summed signals."""
+    plt = get_pyplot()
+    
     # Create figure with subplots
     fig, axes = plt.subplots(3, 2, figsize=(12, 14))
     fig.suptitle('Discrete-Time Signal Operations', fontsize=16, fontweight='bold')
     
     # Original signal
-    axes[0, 0].stem(n, x, basefmt=' ')
+    stem(axes[0, 0], n, x, basefmt=' ')
     axes[0, 0].set_title('Original Signal: x[n]')
     axes[0, 0].set_xlabel('n')
     axes[0, 0].set_ylabel('x[n]')
@@ -98,7 +127,7 @@ def main():
     axes[0, 0].set_ylim(-0.2, 2.5)
     
     # Time-shifted signal
-    axes[0, 1].stem(n_shifted, x_shifted, basefmt=' ')
+    stem(axes[0, 1], n_shifted, x_shifted, basefmt=' ')
     axes[0, 1].set_title('Time Shifted: x[n-5]')
     axes[0, 1].set_xlabel('n')
     axes[0, 1].set_ylabel('x[n-5]')
@@ -108,7 +137,7 @@ def main():
     axes[0, 1].set_ylim(-0.2, 2.5)
     
     # Time-reversed signal
-    axes[1, 0].stem(n_reversed, x_reversed, basefmt=' ')
+    stem(axes[1, 0], n_reversed, x_reversed, basefmt=' ')
     axes[1, 0].set_title('Time Reversed: x[-n]')
     axes[1, 0].set_xlabel('n')
     axes[1, 0].set_ylabel('x[-n]')
@@ -118,7 +147,7 @@ def main():
     axes[1, 0].set_ylim(-0.2, 2.5)
     
     # Amplitude-scaled signal
-    axes[1, 1].stem(n, x_scaled, basefmt=' ')
+    stem(axes[1, 1], n, x_scaled, basefmt=' ')
     axes[1, 1].set_title('Amplitude Scaled: 2·x[n]')
     axes[1, 1].set_xlabel('n')
     axes[1, 1].set_ylabel('2·x[n]')
@@ -128,7 +157,7 @@ def main():
     axes[1, 1].set_ylim(-0.2, 2.5)
     
     # Second signal for addition
-    axes[2, 0].stem(n, x2, basefmt=' ', linefmt='C1-', markerfmt='C1o')
+    stem(axes[2, 0], n, x2, basefmt=' ', linefmt='C1-', markerfmt='C1o')
     axes[2, 0].set_title('Second Signal: x₂[n]')
     axes[2, 0].set_xlabel('n')
     axes[2, 0].set_ylabel('x₂[n]')
@@ -138,7 +167,7 @@ def main():
     axes[2, 0].set_ylim(-0.2, 2.5)
     
     # Signal addition
-    axes[2, 1].stem(n, x_sum, basefmt=' ', linefmt='C2-', markerfmt='C2o')
+    stem(axes[2, 1], n, x_sum, basefmt=' ', linefmt='C2-', markerfmt='C2o')
     axes[2, 1].set_title('Signal Addition: x[n] + x₂[n]')
     axes[2, 1].set_xlabel('n')
     axes[2, 1].set_ylabel('x[n] + x₂[n]')
@@ -148,10 +177,33 @@ def main():
     axes[2, 1].set_ylim(-0.2, 2.5)
     
     plt.tight_layout()
+    
+    return fig
+
+
+def main(show=True, workers=None):
+    """
+    Demonstrate signal operations.
+    
+    Parameters:
+    -----------
+    show : bool
+        Open the figure in a window; False renders headless (default: True)
+    workers : int, optional
+        Number of processes used for headless rendering
+    """
+    
+    # Set up output directory
+    output_dir = Path(__file__).parent.parent / 'data'
+    output_dir.mkdir(exist_ok=True)
+    
+    # Shift, reverse, scale and add a rectangular pulse
+    signals = compute_operations(k=5, scale=2.0)
+    
     output_path = output_dir / 'signal_operations.png'
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    render_figures([(plot_signal_operations, signals, output_path)],
+                   show=show, workers=workers)
     print(f"Figure saved as '{output_path}'")
-    plt.show()
     
     # Print information
     print("\n" + "="*50)
@@ -165,4 +217,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(**render_options())
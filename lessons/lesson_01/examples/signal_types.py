@@ -9,112 +9,66 @@ This script demonstrates basic discrete-time signals:
 3. Exponential sequences
 4. Sinusoidal sequences
 
+The signal generators themselves live in utils/common_functions.py.
+
 Author: DSP-in-Python Repository
 License: MIT
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
+import sys
 from pathlib import Path
 
+import numpy as np
 
-def unit_impulse(n, n0=0):
-    """
-    Generate a unit impulse (delta function).
-    
-    Parameters:
-    -----------
-    n : array-like
-        Time indices
-    n0 : int
-        Position of the impulse (default: 0)
-    
-    Returns:
-    --------
-    delta : ndarray
-        Unit impulse signal
-    """
-    return np.where(n == n0, 1.0, 0.0)
-
-
-def unit_step(n, n0=0):
-    """
-    Generate a unit step function.
-    
-    Parameters:
-    -----------
-    n : array-like
-        Time indices
-    n0 : int
-        Starting position of the step (default: 0)
-    
-    Returns:
-    --------
-    u : ndarray
-        Unit step signal
-    """
-    return np.where(n >= n0, 1.0, 0.0)
-
-
-def exponential_sequence(n, a):
-    """
-    Generate an exponential sequence: x[n] = a^n
-    
-    Parameters:
-    -----------
-    n : array-like
-        Time indices
-    a : float or complex
-        Base of the exponential
-    
-    Returns:
-    --------
-    x : ndarray
-        Exponential sequence
-    """
-    return a ** n
+if __package__ in (None, ''):
+    # Run as a script: make the repository root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from utils.common_functions import (exponential_sequence, sinusoidal_sequence,
+                                    unit_impulse, unit_step)
+from utils.plotting import get_pyplot, render_figures, render_options, stem
 
 
-def sinusoidal_sequence(n, A, omega, phi=0):
+def compute_signals(n_start=-10, n_stop=21, a=0.8, A=1.0, omega=2 * np.pi / 8):
     """
-    Generate a sinusoidal sequence: x[n] = A*cos(omega*n + phi)
+    Generate the four basic signals on n = n_start, ..., n_stop - 1.
     
     Parameters:
     -----------
-    n : array-like
-        Time indices
+    n_start, n_stop : int
+        Time index range (default: -10, 21)
+    a : float
+        Base of the exponential a^n u[n] (default: 0.8)
     A : float
-        Amplitude
+        Amplitude of the sinusoid (default: 1.0)
     omega : float
-        Frequency in radians per sample
-    phi : float
-        Phase in radians (default: 0)
+        Frequency of the sinusoid in rad/sample (default: 2π/8, period 8)
     
     Returns:
     --------
-    x : ndarray
-        Sinusoidal sequence
+    signals : dict
+        n, delta, u, x_exp and x_sin
     """
-    return A * np.cos(omega * n + phi)
+    # Time index (a range lets the generators skip the index comparisons)
+    n = np.arange(n_start, n_stop)
+    n_range = range(n_start, n_stop)
+    
+    return dict(
+        n=n,
+        delta=unit_impulse(n_range, n0=0),         # 1. Unit Impulse
+        u=unit_step(n_range, n0=0),                # 2. Unit Step
+        x_exp=exponential_sequence(n_range, a),    # 3. Exponential Sequence
+        x_sin=sinusoidal_sequence(n, A, omega),    # 4. Sinusoidal Sequence
+    )
 
 
-def main():
-    """Demonstrate basic discrete-time signals."""
-    
-    # Set up output directory
-    output_dir = Path(__file__).parent.parent / 'data'
-    output_dir.mkdir(exist_ok=True)
-    
-    # Time index
-    n = np.arange(-10, 21)
-    
-    # Create figure with subplots
+def plot_basic_signals(n, delta, u, x_exp, x_sin, a):
+    """Build the 2x2 figure of impulse, step, exponential and sinusoid."""
+    plt = get_pyplot()
     fig, axes = plt.subplots(2, 2, figsize=(12, 10))
     fig.suptitle('Basic Discrete-Time Signals', fontsize=16, fontweight='bold')
     
     # 1. Unit Impulse
-    delta = unit_impulse(n, n0=0)
-    axes[0, 0].stem(n, delta, basefmt=' ')
+    stem(axes[0, 0], n, delta, basefmt=' ')
     axes[0, 0].set_title('Unit Impulse: δ[n]')
     axes[0, 0].set_xlabel('n')
     axes[0, 0].set_ylabel('δ[n]')
@@ -123,8 +77,7 @@ def main():
     axes[0, 0].axvline(x=0, color='k', linewidth=0.5)
     
     # 2. Unit Step
-    u = unit_step(n, n0=0)
-    axes[0, 1].stem(n, u, basefmt=' ')
+    stem(axes[0, 1], n, u, basefmt=' ')
     axes[0, 1].set_title('Unit Step: u[n]')
     axes[0, 1].set_xlabel('n')
     axes[0, 1].set_ylabel('u[n]')
@@ -133,10 +86,8 @@ def main():
     axes[0, 1].axvline(x=0, color='k', linewidth=0.5)
     
     # 3. Exponential Sequence (decay)
-    a = 0.8
-    x_exp = exponential_sequence(n, a)
-    axes[1, 0].stem(n, x_exp, basefmt=' ')
-    axes[1, 0].set_title(f'Exponential Sequence: x[n] = {a}^n')
+    stem(axes[1, 0], n, x_exp, basefmt=' ')
+    axes[1, 0].set_title(f'Exponential Sequence: x[n] = {a}^n·u[n]')
     axes[1, 0].set_xlabel('n')
     axes[1, 0].set_ylabel('x[n]')
     axes[1, 0].grid(True, alpha=0.3)
@@ -144,10 +95,7 @@ def main():
     axes[1, 0].axvline(x=0, color='k', linewidth=0.5)
     
     # 4. Sinusoidal Sequence
-    A = 1.0
-    omega = 2 * np.pi / 8  # Period of 8 samples
-    x_sin = sinusoidal_sequence(n, A, omega)
-    axes[1, 1].stem(n, x_sin, basefmt=' ')
+    stem(axes[1, 1], n, x_sin, basefmt=' ')
     axes[1, 1].set_title(f'Sinusoidal: x[n] = cos(2πn/8)')
     axes[1, 1].set_xlabel('n')
     axes[1, 1].set_ylabel('x[n]')
@@ -156,10 +104,34 @@ def main():
     axes[1, 1].axvline(x=0, color='k', linewidth=0.5)
     
     plt.tight_layout()
+    return fig
+
+
+def main(show=True, workers=None):
+    """
+    Demonstrate basic discrete-time signals.
+    
+    Parameters:
+    -----------
+    show : bool
+        Open the figure in a window; False renders headless (default: True)
+    workers : int, optional
+        Number of processes used for headless rendering
+    """
+    
+    # Set up output directory
+    output_dir = Path(__file__).parent.parent / 'data'
+    output_dir.mkdir(exist_ok=True)
+    
+    a = 0.8
+    signals = compute_signals(a=a)
+    n, delta, u = signals['n'], signals['delta'], signals['u']
+    x_exp, x_sin = signals['x_exp'], signals['x_sin']
+    
     output_path = output_dir / 'basic_signals.png'
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    render_figures([(plot_basic_signals, dict(signals, a=a), output_path)],
+                   show=show, workers=workers)
     print(f"Figure saved as '{output_path}'")
-    plt.show()
     
     # Print some signal properties
     print("\n" + "="*50)
@@ -175,4 +147,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(**render_options())
@@ -0,0 +1 @@
+"""Lesson 3: Convolution and its Properties."""
@@ -4,70 +4,82 @@ Lesson 4: Convolution - Basic Examples
 =======================================
 
 This script demonstrates discrete-time convolution with visual examples.
+discrete_convolution itself lives in utils/common_functions.py.
 
 Author: DSP-in-Python Repository
 License: MIT
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
+import sys
 from pathlib import Path
 
+import numpy as np
+
+if __package__ in (None, ''):
+    # Run as a script: make the repository root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from utils.common_functions import (discrete_convolution, exponential_sequence,
+                                    unit_impulse)
+from utils.plotting import get_pyplot, render_figures, render_options, stem
 
-def discrete_convolution(x, h):
+
+def compute_rectangles(x_length=4, h_length=3):
     """
-    Compute discrete convolution: y[n] = x[n] * h[n]
+    Convolve two all-ones rectangular pulses.
     
     Parameters:
     -----------
-    x : array-like
-        First signal
-    h : array-like
-        Second signal (often impulse response)
+    x_length, h_length : int
+        Pulse lengths (default: 4, 3)
     
     Returns:
     --------
-    y : ndarray
-        Convolved signal (length = len(x) + len(h) - 1)
+    signals : dict
+        x, h and y = x * h
     """
-    return np.convolve(x, h, mode='full')
+    x = np.ones(x_length, dtype=int)
+    h = np.ones(h_length, dtype=int)
+    return dict(x=x, h=h, y=discrete_convolution(x, h))
 
 
-def main():
-    """Demonstrate basic convolution with visualization."""
-    
-    # Set up output directory
-    output_dir = Path(__file__).parent.parent / 'data'
-    output_dir.mkdir(exist_ok=True)
-    
-    # Example 1: Rectangular pulses
-    print("Example 1: Convolution of Two Rectangular Pulses")
-    print("=" * 60)
+def compute_exponential(alpha=0.7, length=8, impulse_length=5):
+    """
+    Convolve a unit impulse with the exponential response alpha^n u[n].
     
-    # Create two rectangular pulses
-    x = np.array([1, 1, 1, 1])  # Length 4
-    h = np.array([1, 1, 1])      # Length 3
+    Parameters:
+    -----------
+    alpha : float
+        Decay factor (default: 0.7)
+    length : int
+        Length of the impulse response (default: 8)
+    impulse_length : int
+        Length of the input x[n] = δ[n] (default: 5)
     
-    # Compute convolution
-    y = discrete_convolution(x, h)
+    Returns:
+    --------
+    signals : dict
+        x2, h2 and y2 = x2 * h2
+    """
+    x2 = unit_impulse(range(impulse_length))
+    h2 = exponential_sequence(range(length), alpha)
+    return dict(x2=x2, h2=h2, y2=discrete_convolution(x2, h2))
+
+
+def plot_rectangles(x, h, y):
+    """Build the figure for the convolution of two rectangular pulses."""
+    plt = get_pyplot()
     
     # Time indices
     nx = np.arange(len(x))
     nh = np.arange(len(h))
     ny = np.arange(len(y))
     
-    print(f"x[n] = {x} (length {len(x)})")
-    print(f"h[n] = {h} (length {len(h)})")
-    print(f"y[n] = x[n] * h[n] = {y} (length {len(y)})")
-    print(f"Expected output length: {len(x)} + {len(h)} - 1 = {len(y)}")
-    
     # Create visualization
     fig, axes = plt.subplots(2, 2, figsize=(12, 10))
     fig.suptitle('Convolution of Rectangular Pulses', fontsize=14, fontweight='bold')
     
     # Input signal x[n]
-    axes[0, 0].stem(nx, x, basefmt=' ')
+    stem(axes[0, 0], nx, x, basefmt=' ')
     axes[0, 0].set_title('Input Signal: x[n]')
     axes[0, 0].set_xlabel('n')
     axes[0, 0].set_ylabel('x[n]')
@@ -75,7 +87,7 @@ def main():
     axes[0, 0].set_ylim(0, 4.5)
     
     # Impulse response h[n]
-    axes[0, 1].stem(nh, h, basefmt=' ', linefmt='C1-', markerfmt='C1o')
+    stem(axes[0, 1], nh, h, basefmt=' ', linefmt='C1-', markerfmt='C1o')
     axes[0, 1].set_title('Impulse Response: h[n]')
     axes[0, 1].set_xlabel('n')
     axes[0, 1].set_ylabel('h[n]')
@@ -83,7 +95,7 @@ def main():
     axes[0, 1].set_ylim(0, 4.5)
     
     # Output signal y[n]
-    axes[1, 0].stem(ny, y, basefmt=' ', linefmt='C2-', markerfmt='C2o')
+    stem(axes[1, 0], ny, y, basefmt=' ', linefmt='C2-', markerfmt='C2o')
     axes[1, 0].set_title('Output: y[n] = x[n] * h[n]')
     axes[1, 0].set_xlabel('n')
     axes[1, 0].set_ylabel('y[n]')
@@ -108,30 +120,13 @@ def main():
                      verticalalignment='center', family='monospace')
     
     plt.tight_layout()
-    output_path = output_dir / 'convolution_rectangles.png'
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    print(f"\nFigure saved as '{output_path}'\n")
-    
-    # Example 2: Exponential sequence
-    print("\nExample 2: Convolution with Exponential Decay")
-    print("=" * 60)
-    
-    # Input impulse
-    x2 = np.array([1, 0, 0, 0, 0])
-    
-    # Exponential decay impulse response (causal)
-    alpha = 0.7
-    h2 = alpha ** np.arange(8)
-    
-    # Convolution
-    y2 = discrete_convolution(x2, h2)
-    
-    print(f"x[n] = impulse at n=0")
-    print(f"h[n] = exponential decay: {alpha}^n")
-    print(f"y[n] = x[n] * h[n] = impulse response h[n]")
-    print(f"\nNote: Convolving with impulse returns the impulse response!")
+    return fig
+
+
+def plot_exponential(x2, h2, y2, alpha):
+    """Build the figure for the convolution with an exponential impulse response."""
+    plt = get_pyplot()
     
-    # Create second visualization
     fig2, axes2 = plt.subplots(1, 3, figsize=(14, 4))
     fig2.suptitle('Convolution with Exponential Impulse Response', 
                   fontsize=14, fontweight='bold')
@@ -140,28 +135,70 @@ def main():
     nh2 = np.arange(len(h2))
     ny2 = np.arange(len(y2))
     
-    axes2[0].stem(nx2, x2, basefmt=' ')
+    stem(axes2[0], nx2, x2, basefmt=' ')
     axes2[0].set_title('Input: x[n] = δ[n]')
     axes2[0].set_xlabel('n')
     axes2[0].set_ylabel('x[n]')
     axes2[0].grid(True, alpha=0.3)
     
-    axes2[1].stem(nh2, h2, basefmt=' ', linefmt='C1-', markerfmt='C1o')
+    stem(axes2[1], nh2, h2, basefmt=' ', linefmt='C1-', markerfmt='C1o')
     axes2[1].set_title(f'Impulse Response: h[n] = {alpha}^n·u[n]')
     axes2[1].set_xlabel('n')
     axes2[1].set_ylabel('h[n]')
     axes2[1].grid(True, alpha=0.3)
     
-    axes2[2].stem(ny2, y2, basefmt=' ', linefmt='C2-', markerfmt='C2o')
+    stem(axes2[2], ny2, y2, basefmt=' ', linefmt='C2-', markerfmt='C2o')
     axes2[2].set_title('Output: y[n] = x[n] * h[n]')
     axes2[2].set_xlabel('n')
     axes2[2].set_ylabel('y[n]')
     axes2[2].grid(True, alpha=0.3)
     
     plt.tight_layout()
-    output_path = output_dir / 'convolution_exponential.png'
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    print(f"\nFigure saved as '{output_path}'\n")
+    return fig2
+
+
+def main(show=True, workers=None):
+    """
+    Demonstrate basic convolution with visualization.
+    
+    Parameters:
+    -----------
+    show : bool
+        Open the figures in windows; False renders headless (default: True)
+    workers : int, optional
+        Number of processes used for headless rendering
+    """
+    
+    # Set up output directory
+    output_dir = Path(__file__).parent.parent / 'data'
+    output_dir.mkdir(exist_ok=True)
+    
+    # Example 1: Rectangular pulses
+    print("Example 1: Convolution of Two Rectangular Pulses")
+    print("=" * 60)
+    
+    # Convolve two rectangular pulses of lengths 4 and 3
+    rectangles = compute_rectangles(x_length=4, h_length=3)
+    x, h, y = rectangles['x'], rectangles['h'], rectangles['y']
+    
+    print(f"x[n] = {x} (length {len(x)})")
+    print(f"h[n] = {h} (length {len(h)})")
+    print(f"y[n] = x[n] * h[n] = {y} (length {len(y)})")
+    print(f"Expected output length: {len(x)} + {len(h)} - 1 = {len(y)}")
+    
+    # Example 2: Exponential sequence
+    print("\nExample 2: Convolution with Exponential Decay")
+    print("=" * 60)
+    
+    # Impulse input, exponential decay impulse response (causal)
+    alpha = 0.7
+    response = compute_exponential(alpha, length=8)
+    x2, h2, y2 = response['x2'], response['h2'], response['y2']
+    
+    print(f"x[n] = impulse at n=0")
+    print(f"h[n] = exponential decay: {alpha}^n")
+    print(f"y[n] = x[n] * h[n] = impulse response h[n]")
+    print(f"\nNote: Convolving with impulse returns the impulse response!")
     
     # Example 3: Convolution modes
     print("\nExample 3: Convolution Modes")
@@ -180,8 +217,16 @@ def main():
     print(f"mode='same':  {y_same}  (length {len(y_same)})")
     print(f"mode='valid': {y_valid}  (length {len(y_valid)})")
     
-    plt.show()
+    # Render both figures (in parallel when headless)
+    paths = render_figures([
+        (plot_rectangles, dict(x=x, h=h, y=y),
+         output_dir / 'convolution_rectangles.png'),
+        (plot_exponential, dict(x2=x2, h2=h2, y2=y2, alpha=alpha),
+         output_dir / 'convolution_exponential.png'),
+    ], show=show, workers=workers)
+    for output_path in paths:
+        print(f"\nFigure saved as '{output_path}'")
 
 
 if __name__ == "__main__":
-    main()
+    main(**render_options())
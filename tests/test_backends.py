@@ -0,0 +1,128 @@
+"""
+Compute Backends
+================
+
+Every kernel of utils/backends.py must give the same result on the numba
+backend as on the numpy fallback: bit-identical for lfilter, the
+oscillator and the integrators, equal to rounding for LMS. The numba
+tests are skipped when Numba is not installed.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+from utils import backends
+
+
+needs_numba = pytest.mark.skipif('numba' not in backends.available_backends(),
+                                reason='numba is not installed')
+
+B, A = [0.2, 0.3, 0.1, -0.05], [1.0, -0.5, 0.2]
+
+
+def _both(kernel, *args, **kwargs):
+    """Run a kernel on both backends (on copies of any in-place arrays)."""
+    results = []
+    for name in ('numpy', 'numba'):
+        copies = [a.copy() if isinstance(a, np.ndarray) else a for a in args]
+        with backends.backend(name):
+            result = kernel(*copies, **kwargs)
+        results.append((result, copies))
+    return results
+
+
+def _signal(shape, dtype=np.float64, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(shape)
+    if np.dtype(dtype).kind == 'c':
+        x = x + 1j * rng.standard_normal(shape)
+    return x.astype(dtype)
+
+
+@needs_numba
+@pytest.mark.parametrize('layout', ['C', 'F', 'transposed', 'strided'])
+def test_lfilter_layouts_identical(layout):
+    x = _signal((2, 3, 500))
+    if layout == 'F':
+        x = np.asfortranarray(x)
+    elif layout == 'transposed':
+        x = np.ascontiguousarray(x.T).T
+    elif layout == 'strided':
+        x = _signal((2, 3, 1000))[..., ::2]
+    (y_np, _), (y_nb, _) = _both(backends.lfilter, B, A, x)
+    np.testing.assert_array_equal(y_nb, y_np)
+
+
+@needs_numba
+@pytest.mark.parametrize('dtype', [np.float32, np.float64, np.complex128, np.int16])
+def test_lfilter_dtypes_identical(dtype):
+    (y_np, _), (y_nb, _) = _both(backends.lfilter, B, A, _signal((3, 400), dtype))
+    assert y_np.dtype == y_nb.dtype
+    np.testing.assert_array_equal(y_nb, y_np)
+
+
+@needs_numba
+def test_lfilter_streaming_identical():
+    x = _signal((2, 1000))
+    outputs = []
+    for name in ('numpy', 'numba'):
+        with backends.backend(name):
+            zi = np.zeros((2, 3))
+            blocks = []
+            for block in np.split(x, [0, 1, 250, 600], axis=-1):
+                y, zi = backends.lfilter(B, A, block, zi=zi)
+                blocks.append(y)
+        outputs.append(np.concatenate(blocks, axis=-1))
+    np.testing.assert_array_equal(outputs[1], outputs[0])
+    with backends.backend('numpy'):
+        np.testing.assert_allclose(outputs[0], backends.lfilter(B, A, x), atol=1e-12)
+
+
+@needs_numba
+def test_oscillator_identical():
+    (y_np, _), (y_nb, _) = _both(backends.oscillator, 10000, 1.5, 0.1, 0.3,
+                                 dtype=np.float32)
+    assert y_np.dtype == np.float32
+    np.testing.assert_array_equal(y_nb, y_np)
+
+
+@needs_numba
+@pytest.mark.parametrize('dtype', [np.int64, np.float64])
+def test_integrate_identical(dtype):
+    x = (1000 * _signal((3, 2000))).astype(dtype)
+    state = np.zeros((3, 4), dtype=dtype)
+    (y_np, (_, s_np)), (y_nb, (_, s_nb)) = _both(backends.integrate, x, state)
+    np.testing.assert_array_equal(y_nb, y_np)
+    np.testing.assert_array_equal(s_nb, s_np)
+
+
+@needs_numba
+def test_integrate_wraps_identically():
+    x = np.full((1, 100), 2**62, dtype=np.int64)
+    (y_np, _), (y_nb, _) = _both(backends.integrate, x, np.zeros((1, 3), dtype=np.int64))
+    np.testing.assert_array_equal(y_nb, y_np)
+
+
+@needs_numba
+@pytest.mark.parametrize('dtype', [np.float64, np.complex128])
+def test_lms_agrees(dtype):
+    x = _signal((2, 3000), dtype)
+    d = backends.lfilter([0.5, -0.2, 0.1], [1.0], x)
+    (r_np, _), (r_nb, _) = _both(backends.lms, x, d, np.zeros(8), 0.01)
+    for a, b in zip(r_np, r_nb):
+        np.testing.assert_allclose(b, a, rtol=0, atol=1e-12)
+
+
+def test_empty_blocks():
+    for name in backends.available_backends():
+        with backends.backend(name):
+            assert backends.lfilter(B, A, np.zeros((3, 0))).shape == (3, 0)
+            state = np.zeros((2, 3), dtype=np.int64)
+            assert backends.integrate(np.zeros((2, 0), np.int64), state).shape == (2, 0)
+            state = np.zeros((1, 3), dtype=np.int64)
+            assert backends.integrate(np.zeros(0, np.int64), state[0]).shape == (0,)
+            y, e, w = backends.lms(np.zeros((2, 0)), np.zeros((2, 0)), np.zeros(4), 0.1)
+            assert y.shape == e.shape == (2, 0) and w.shape == (2, 4)
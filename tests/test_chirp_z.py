@@ -0,0 +1,122 @@
+"""
+Chirp-Z Transform and Zoom FFT
+==============================
+
+czt and zoom_fft (utils/chirp_z.py) against scipy.signal.czt /
+zoom_fft and the direct z-transform, and the reuse of cached plans.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+scipy_signal = pytest.importorskip('scipy.signal')
+
+from utils import chirp_z
+from utils.chirp_z import CZTPlan, czt, get_plan, zoom_fft, zoom_frequencies
+
+
+def _x(shape, complex_=False, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(shape)
+    return x + 1j * rng.standard_normal(shape) if complex_ else x
+
+
+def _direct(x, m, w, a):
+    """X[k] = sum_n x[n] (a w^-k)^-n, term by term."""
+    z = a * w ** -np.arange(m)
+    return np.array([np.sum(x * zk ** -np.arange(x.size)) for zk in z])
+
+
+def _relative(a, b):
+    return np.max(np.abs(a - b)) / np.max(np.abs(b))
+
+
+@pytest.mark.parametrize('n', [1, 7, 64, 1000])
+def test_czt_default_is_fft(n):
+    x = _x(n, complex_=True)
+    assert _relative(czt(x), np.fft.fft(x)) < 1e-12
+
+
+@pytest.mark.parametrize('n, m, w, a, tolerance', [
+    (100, 50, np.exp(-0.02j), np.exp(0.3j), 1e-11),
+    (300, 30, np.exp(-2j * np.pi / 1000), 1.01 * np.exp(0.5j), 1e-11),
+    # A spiral: the chirps span many decades, for scipy as well
+    (64, 200, 0.999 * np.exp(-0.01j), 1.0, 1e-7),
+])
+def test_czt_matches_scipy_and_direct(n, m, w, a, tolerance):
+    x = _x(n)
+    X = czt(x, m, w, a)
+    assert _relative(X, scipy_signal.czt(x, m, w, a)) < tolerance
+    assert _relative(X, _direct(x, m, w, a)) < tolerance
+
+
+def test_czt_axis_and_batch():
+    x = _x((3, 128, 2), complex_=True)
+    X = czt(x, m=40, w=np.exp(-0.01j), axis=1)
+    assert X.shape == (3, 40, 2)
+    reference = scipy_signal.czt(x, 40, np.exp(-0.01j), axis=1)
+    assert _relative(X, reference) < 1e-11
+
+
+@pytest.mark.parametrize('fn, m, fs, endpoint', [
+    ((0.2, 0.3), 256, 2.0, False),
+    ((990.0, 1010.0), 2048, 48000.0, True),
+    (0.5, 100, 2.0, False),
+])
+def test_zoom_fft_matches_scipy(fn, m, fs, endpoint):
+    x = _x(4000)
+    X = zoom_fft(x, fn, m=m, fs=fs, endpoint=endpoint)
+    reference = scipy_signal.zoom_fft(x, fn, m=m, fs=fs, endpoint=endpoint)
+    assert _relative(X, reference) < 1e-11
+    f = zoom_frequencies(fn, m, fs=fs, endpoint=endpoint)
+    f1, f2 = (0.0, fn) if np.isscalar(fn) else fn
+    assert f.size == m and f[0] == pytest.approx(f1)
+    assert f[-1] == pytest.approx(f2 if endpoint else f2 - (f2 - f1) / m)
+
+
+def test_zoom_fft_matches_zero_padded_fft():
+    x = _x(1000)
+    nfft = 1 << 16
+    X = zoom_fft(x, (0.25, 0.25 + 2.0 * 512 / nfft), m=512)
+    first = round(0.25 / 2 * nfft)
+    assert _relative(X, np.fft.fft(x, nfft)[first:first + 512]) < 1e-11
+
+
+def test_float32_input_gives_complex64():
+    X = zoom_fft(_x(2048).astype(np.float32), (0.1, 0.2), m=256)
+    assert X.dtype == np.complex64
+    reference = zoom_fft(_x(2048), (0.1, 0.2), m=256)
+    assert _relative(X, reference) < 1e-5
+
+
+def test_plans_are_cached_and_reused():
+    get_plan.cache_clear()
+    x = _x(777)
+    zoom_fft(x, (0.1, 0.2), m=100)
+    zoom_fft(2 * x, (0.1, 0.2), m=100)
+    info = get_plan.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    plan = get_plan(777, 100, *_band_points((0.1, 0.2), 100))
+    assert get_plan.cache_info().hits == 2
+    # Per-dtype tables are built once per plan
+    plan(x.astype(np.float32))
+    tables = plan.tables(np.complex64)
+    plan(x.astype(np.float32))
+    assert plan.tables(np.complex64) is tables
+    zoom_fft(x, (0.1, 0.3), m=100)
+    assert get_plan.cache_info().misses == 2
+
+
+def _band_points(fn, m, fs=2.0):
+    f1, step, fs = chirp_z._band(fn, m, fs, False)
+    return complex(np.exp(-2j * np.pi * step / fs)), complex(np.exp(2j * np.pi * f1 / fs))
+
+
+def test_invalid_plans_raise():
+    with pytest.raises(ValueError):
+        CZTPlan(0, 10, 1j, 1.0)
+    with pytest.raises(ValueError):
+        CZTPlan(10, 10, 0, 1.0)
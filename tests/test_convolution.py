@@ -0,0 +1,86 @@
+"""
+Running-Sum Convolution
+=======================
+
+Boxcar kernels and run-length signals are convolved with running sums
+(utils/sparse_signals.py). The results must match np.convolve, also for
+inputs containing NaN or inf and for long single-precision inputs.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+from utils import precision
+from utils.common_functions import discrete_convolution
+from utils.sparse_signals import RunLengthSignal
+
+
+def _signal(size, dtype=np.float64, seed=0):
+    return np.random.default_rng(seed).standard_normal(size).astype(dtype)
+
+
+@pytest.mark.parametrize('bad', [np.nan, np.inf, -np.inf])
+def test_boxcar_non_finite_matches_np_convolve(bad):
+    x = _signal(2000)
+    x[500] = bad
+    h = np.ones(20)
+    y = discrete_convolution(x, h)
+    reference = np.convolve(x, h)
+    np.testing.assert_array_equal(np.isnan(y), np.isnan(reference))
+    np.testing.assert_allclose(y, reference, rtol=0, atol=1e-12)
+
+
+def test_boxcar_nan_and_inf():
+    x = _signal(2000)
+    x[300], x[1200] = np.inf, np.nan
+    y = discrete_convolution(np.ones(64), x)
+    reference = np.convolve(x, np.ones(64))
+    assert np.isnan(y).sum() == np.isnan(reference).sum()
+    np.testing.assert_allclose(y, reference, rtol=0, atol=1e-12)
+
+
+def test_boxcar_long_float32_error_does_not_grow():
+    # A large mean makes a single running sum over 10^7 samples cancel badly
+    x = (1 + 0.01 * _signal(10**7)).astype(np.float32)
+    y = discrete_convolution(x, np.ones(16, dtype=np.float32))
+    reference = np.convolve(x.astype(np.float64), np.ones(16))
+    assert y.dtype == np.float32
+    assert precision.max_relative_error(y, reference) <= 1e-6
+
+
+def test_boxcar_long_float64_error_does_not_grow():
+    x = 100 + _signal(10**7)
+    y = discrete_convolution(x, np.ones(16))
+    reference = np.convolve(x, np.ones(16))
+    assert precision.max_relative_error(y, reference) <= 1e-12
+
+
+def test_boxcar_integer_exact():
+    x = np.random.default_rng(0).integers(-2**40, 2**40, 10**5)
+    h = np.ones(1000, dtype=np.int64)
+    np.testing.assert_array_equal(discrete_convolution(x, h), np.convolve(x, h))
+
+
+def test_run_length_segments_match_np_convolve():
+    sig = RunLengthSignal([0, 30, 100], [10, 80, 5000], [1.0, -2.0, 0.5], 6000)
+    x = _signal((2, 20000))
+    x[1, 7] = np.inf
+    y = sig.convolve(x)
+    reference = np.array([np.convolve(np.asarray(sig), row) for row in x])
+    np.testing.assert_array_equal(np.isnan(y), np.isnan(reference))
+    np.testing.assert_allclose(y, reference, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('n1, n2', [(0, 2), (0, 9), (3, 6)])
+def test_rect_shorter_than_signal_matches_np_convolve(n1, n2):
+    # A single segment that ends before the end of the signal
+    pulse = RunLengthSignal.rect(range(0, 10), n1, n2)
+    x = np.arange(5.0)
+    y = pulse.convolve(x)
+    reference = np.convolve(np.asarray(pulse), x)
+    assert y.shape == reference.shape
+    np.testing.assert_allclose(y, reference, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(discrete_convolution(x, pulse), reference, rtol=0, atol=1e-12)
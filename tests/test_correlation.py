@@ -0,0 +1,129 @@
+"""
+Cross-Correlation and Matched Filtering
+=======================================
+
+MatchedFilter and cross_correlate (utils/correlation.py) against direct
+references: np.correlate, a brute-force normalized cross-correlation and
+a brute-force search for the strongest local maxima, both one-shot and
+streamed block by block.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+from utils import correlation
+from utils.correlation import MatchedFilter, cross_correlate
+
+
+def _ncc(x, t, zero_mean=False):
+    """Brute-force normalized cross-correlation of 1-D x and t."""
+    M = len(t)
+    if zero_mean:
+        t = t - t.mean()
+    out = np.zeros(len(x) - M + 1, dtype=np.result_type(x, t))
+    for n in range(out.size):
+        w = x[n:n + M]
+        if zero_mean:
+            w = w - w.mean()
+        norm = np.linalg.norm(w) * np.linalg.norm(t)
+        out[n] = np.vdot(t, w) / norm if norm > 0 else 0
+    return out
+
+
+def _top_peaks(mag, k):
+    """Indices of the k largest local maxima of mag (judged like MatchedFilter)."""
+    ext = np.concatenate(([0.0, 0.0], mag, [-np.inf]))
+    centre = ext[1:-1]
+    peak = (centre > ext[:-2]) & (centre >= ext[2:])
+    index = np.flatnonzero(peak) - 1
+    index = index[index >= 0]
+    return index[np.argsort(-mag[index], kind='stable')][:k]
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.complex128])
+def test_cross_correlate_matches_np_correlate(dtype):
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(3000).astype(dtype)
+    t = rng.standard_normal(50).astype(dtype)
+    if np.dtype(dtype).kind == 'c':
+        x = x + 1j * rng.standard_normal(3000)
+        t = t + 1j * rng.standard_normal(50)
+    np.testing.assert_allclose(cross_correlate(x, t), np.correlate(x, t, mode='valid'),
+                               atol=1e-10)
+
+
+@pytest.mark.parametrize('zero_mean', [False, True])
+def test_normalized_matches_brute_force(zero_mean):
+    rng = np.random.default_rng(1)
+    x = 3 + rng.standard_normal(2000)
+    t = rng.standard_normal(40)
+    x[700:740] += 5 * t
+    c = cross_correlate(x, t, normalize=True, zero_mean=zero_mean)
+    np.testing.assert_allclose(c, _ncc(x, t, zero_mean), atol=1e-9)
+    assert np.max(np.abs(c)) <= 1 + 1e-12
+
+
+def test_normalized_quiet_window_after_loud_samples():
+    rng = np.random.default_rng(2)
+    t = rng.standard_normal(64)
+    x = np.concatenate((1e4 * rng.standard_normal(10**6), 1e-2 * rng.standard_normal(5000)))
+    start = 10**6 + 1000
+    x[start:start + 64] += 1e-2 * t
+    c = cross_correlate(x, t, normalize=True)
+    lo = 10**6 - 200
+    np.testing.assert_allclose(c[lo:lo + 2000], _ncc(x[lo:lo + 2063], t), atol=1e-9)
+    assert c[start] > 0.5
+
+
+def test_batch_of_templates():
+    rng = np.random.default_rng(3)
+    x = rng.standard_normal(1000)
+    templates = rng.standard_normal((3, 32))
+    c = cross_correlate(x, templates, normalize=True)
+    assert c.shape == (3, 1000 - 31)
+    for row, t in zip(c, templates):
+        np.testing.assert_allclose(row, _ncc(x, t), atol=1e-9)
+
+
+@pytest.mark.parametrize('normalize', [False, True])
+def test_streaming_matches_one_shot(normalize):
+    rng = np.random.default_rng(4)
+    x = rng.standard_normal((2, 5000))
+    t = rng.standard_normal(100)
+    one_shot = cross_correlate(x, t, normalize=normalize)
+    mf = MatchedFilter(t, normalize=normalize)
+    blocks = [mf.process(x[:, a:b]) for a, b in
+              [(0, 0), (0, 1), (1, 60), (60, 61), (61, 3000), (3000, 5000)]]
+    np.testing.assert_allclose(np.concatenate(blocks, axis=-1), one_shot, atol=1e-10)
+    assert mf.position == one_shot.shape[-1]
+
+
+def test_top_k_peaks_match_brute_force(monkeypatch):
+    # Small chunks so peaks are merged across many update() chunks
+    monkeypatch.setattr(correlation, 'CHUNK_SIZE', 997)
+    rng = np.random.default_rng(5)
+    t = rng.standard_normal(64)
+    x = 0.5 * rng.standard_normal(20000)
+    for position, gain in [(1234, 3.0), (5000, 2.0), (9999, 4.0), (19936, 5.0)]:
+        x[position:position + 64] += gain * t
+    mf = MatchedFilter(t, normalize=True, top_k=5)
+    for a in range(0, x.size, 3333):
+        mf.update(x[a:a + 3333])
+    index, value = mf.peaks()
+    mag = np.abs(_ncc(x, t))
+    expected = _top_peaks(mag, 5)
+    np.testing.assert_array_equal(index, expected)
+    np.testing.assert_allclose(value, mag[expected], atol=1e-9)
+    assert set([1234, 5000, 9999, 19936]) <= set(index.tolist())
+
+
+def test_peaks_fewer_than_k():
+    mf = MatchedFilter(np.array([1.0, 3.0, 2.0]), top_k=3)
+    mf.update(np.array([1.0, 2, 3, 2, 1]))   # c = [13, 15, 11]: one peak
+    index, value = mf.peaks()
+    assert index.tolist() == [1, -1, -1]
+    np.testing.assert_allclose(value[0], 15.0)
+    assert np.all(value[1:] == -np.inf)
@@ -0,0 +1,153 @@
+"""
+FFT Convolution with Reusable Kernels
+=====================================
+
+fft_convolve and circular_convolve (utils/fast_convolution.py) against
+direct references, and the Kernel spectrum cache: LRU eviction and
+reuse, sharing between threads and pickling.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils import fast_convolution
+from utils.fast_convolution import Kernel, circular_convolve, fft_convolve
+
+
+def _x(shape, complex_=False, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(shape)
+    return x + 1j * rng.standard_normal(shape) if complex_ else x
+
+
+# ----------------------------------------------------------------------------
+# Convolution against np.convolve
+# ----------------------------------------------------------------------------
+
+@pytest.mark.parametrize('N, M', [(1, 1), (100, 7), (7, 100), (5000, 64),
+                                  (100_000, 129)])   # the last one overlap-adds
+@pytest.mark.parametrize('mode', ['full', 'same', 'valid'])
+def test_fft_convolve_matches_np_convolve(N, M, mode):
+    x, h = _x(N), _x(M, seed=1)
+    np.testing.assert_allclose(fft_convolve(x, h, mode=mode),
+                               np.convolve(x, h, mode=mode), rtol=0, atol=1e-9)
+
+
+def test_overlap_add_is_used_for_long_signals(monkeypatch):
+    calls = []
+    original = fast_convolution._overlap_add
+    monkeypatch.setattr(fast_convolution, '_overlap_add',
+                        lambda *args: calls.append(1) or original(*args))
+    x, h = _x(50_000), _x(33, seed=1)
+    np.testing.assert_allclose(fft_convolve(x, h), np.convolve(x, h), atol=1e-9)
+    assert calls
+
+
+def test_complex_and_multichannel():
+    x = _x((3, 20_000), complex_=True)
+    h = _x(50, complex_=True, seed=1)
+    y = fft_convolve(x, Kernel(h))
+    for row, ref_x in zip(y, x):
+        np.testing.assert_allclose(row, np.convolve(ref_x, h), atol=1e-9)
+
+
+def test_bank_of_kernels_broadcasts():
+    x = _x(30_000)
+    bank = _x((4, 40), seed=1)
+    y = fft_convolve(x[None, :], Kernel(bank))
+    assert y.shape == (4, 30_000 + 39)
+    for row, h in zip(y, bank):
+        np.testing.assert_allclose(row, np.convolve(x, h), atol=1e-9)
+
+
+def test_float32_stays_single_precision():
+    x, h = _x(10_000).astype(np.float32), _x(64, seed=1).astype(np.float32)
+    y = fft_convolve(x, h)
+    assert y.dtype == np.float32
+    reference = np.convolve(x.astype(np.float64), h.astype(np.float64))
+    assert np.max(np.abs(y - reference)) <= 1e-5 * np.max(np.abs(reference))
+
+
+@pytest.mark.parametrize('n', [4, 10, 64])
+def test_circular_convolve_matches_definition(n):
+    x, h = _x(37), _x(9, seed=1)
+    xf = np.zeros(n)
+    hf = np.zeros(n)
+    np.add.at(xf, np.arange(x.size) % n, x)   # fold longer sequences onto n
+    np.add.at(hf, np.arange(h.size) % n, h)
+    reference = np.array([sum(xf[k] * hf[(m - k) % n] for k in range(n)) for m in range(n)])
+    np.testing.assert_allclose(circular_convolve(x, h, n=n), reference, atol=1e-9)
+
+
+def test_circular_convolve_example():
+    np.testing.assert_allclose(circular_convolve([1, 2, 3, 4], [1, 1]), [5, 3, 5, 7])
+
+
+# ----------------------------------------------------------------------------
+# Kernel spectrum cache
+# ----------------------------------------------------------------------------
+
+def test_spectrum_is_reused():
+    k = Kernel(_x(32))
+    H = k.spectrum(256)
+    assert k.spectrum(256) is H
+    assert not H.flags.writeable
+    np.testing.assert_allclose(H, np.fft.rfft(k.h, 256), atol=1e-12)
+    assert k.spectrum(256, dtype=np.float32).dtype == np.complex64
+    assert len(k.cached_sizes()) == 2
+
+
+def test_lru_eviction_order():
+    k = Kernel(_x(16), cache_size=3)
+    for n in (64, 128, 256):
+        k.spectrum(n)
+    k.spectrum(64)              # most recently used again
+    k.spectrum(512)             # evicts 128, the least recently used
+    assert [key[0] for key in k.cached_sizes()] == [256, 64, 512]
+    H = k.spectrum(128)         # recomputed, evicting 256
+    assert [key[0] for key in k.cached_sizes()] == [64, 512, 128]
+    np.testing.assert_allclose(H, np.fft.rfft(k.h, 128), atol=1e-12)
+    k.clear_cache()
+    assert k.cached_sizes() == []
+
+
+def test_kernel_shared_between_threads():
+    k = Kernel(_x(100), cache_size=4)
+    frames = _x((64, 1000), seed=2)
+    sizes = [1100, 1200, 1300, 1500, 2000, 4000]
+
+    def work(i):
+        return circular_convolve(frames[i], k, n=sizes[i % len(sizes)])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(work, range(len(frames))))
+    for i, y in enumerate(results):
+        np.testing.assert_allclose(y, circular_convolve(frames[i], k.h, n=sizes[i % len(sizes)]),
+                                   atol=1e-9)
+    assert len(k.cached_sizes()) <= 4
+
+
+def test_kernel_pickles_without_cache():
+    k = Kernel(_x(50), cache_size=5)
+    k.spectrum(256)
+    clone = pickle.loads(pickle.dumps(k))
+    assert clone.cache_size == 5 and clone.cached_sizes() == []
+    np.testing.assert_array_equal(clone.h, k.h)
+    assert not clone.h.flags.writeable
+    x = _x(3000, seed=3)
+    np.testing.assert_allclose(fft_convolve(x, clone), fft_convolve(x, k), atol=1e-12)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        Kernel([])
+    with pytest.raises(ValueError):
+        Kernel([1.0], cache_size=0)
+    with pytest.raises(ValueError):
+        fft_convolve(np.ones(4), np.ones(2), mode='middle')
@@ -0,0 +1,82 @@
+"""
+Polyphase Filter Banks
+======================
+
+Streaming analysis followed by synthesis (utils/filterbank.py) must give
+the same output whatever the block sizes, including blocks shorter than
+the decimation factor.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+from utils.filterbank import PolyphaseAnalyzer, PolyphaseSynthesizer
+
+
+def _round_trip(x, blocks, K, D):
+    analysis = PolyphaseAnalyzer(K=K, D=D)
+    synthesis = PolyphaseSynthesizer(K=K, D=D, real=True)
+    edges = np.cumsum([0] + list(blocks))
+    out = [synthesis.process(analysis.process(x[..., a:b]))
+           for a, b in zip(edges[:-1], edges[1:])]
+    return np.concatenate(out, axis=-1), synthesis.delay
+
+
+@pytest.mark.parametrize('K, D', [(16, 16), (16, 8)])
+def test_short_chunks_round_trip(K, D):
+    x = np.random.default_rng(0).standard_normal((2, 600))
+    # Blocks of 0, 1 and D - 1 samples produce no frames
+    blocks = [0, 1, D - 1, 3, 250, 5, 1, 340]
+    y, delay = _round_trip(x, blocks, K, D)
+    whole, _ = _round_trip(x, [x.shape[-1]], K, D)
+    assert y.shape == whole.shape
+    np.testing.assert_allclose(y, whole, atol=1e-12)
+    n = x.shape[-1] - delay
+    tolerance = 1e-12 if D == K else 1e-2
+    np.testing.assert_allclose(y[..., delay:delay + n], x[..., :n], atol=tolerance)
+
+
+def test_zero_frames_give_empty_output():
+    analysis = PolyphaseAnalyzer(K=8, D=4)
+    synthesis = PolyphaseSynthesizer(K=8, D=4, real=True)
+    analysis.process(np.ones((3, 1)))      # the frame at n = 0
+    y = analysis.process(np.ones((3, 3)))  # no frame until n = 4
+    assert y.shape == (3, 8, 0)
+    assert synthesis.process(y).shape == (3, 0)
+
+
+@pytest.mark.parametrize('K, D', [(16, 16), (16, 8)])
+@pytest.mark.parametrize('dtype, subband_dtype, out_dtype', [
+    (np.float32, np.complex64, np.float32),
+    (np.complex64, np.complex64, np.complex64),
+    (np.float64, np.complex128, np.float64),
+    (np.complex128, np.complex128, np.complex128),
+    (np.int16, np.complex128, np.float64),
+])
+def test_output_dtype_follows_input(K, D, dtype, subband_dtype, out_dtype):
+    rng = np.random.default_rng(1)
+    x = (100 * rng.standard_normal((2, 400))).astype(np.float64)
+    if np.dtype(dtype).kind == 'c':
+        x = x + 1j * (100 * rng.standard_normal((2, 400)))
+    x = x.astype(dtype)
+    analysis = PolyphaseAnalyzer(K=K, D=D)
+    synthesis = PolyphaseSynthesizer(K=K, D=D, real=np.dtype(dtype).kind != 'c')
+    y = analysis.process(x)
+    assert y.dtype == subband_dtype
+    out = synthesis.process(y)
+    assert out.dtype == out_dtype
+    assert synthesis.process(y[..., :0]).dtype == out_dtype
+
+    # Single precision tracks the double precision result
+    reference = PolyphaseAnalyzer(K=K, D=D).process(x.astype(np.result_type(x, np.float64)))
+    np.testing.assert_allclose(y, reference, rtol=0, atol=1e-4 * np.abs(reference).max())
+
+
+def test_complex_prototype_keeps_single_precision():
+    # A complex prototype (a band-shifted lowpass) with float32 input
+    h = np.ones(8) * np.exp(1j * np.pi / 8 * np.arange(8))
+    y = PolyphaseAnalyzer(K=8, h=h).process(np.ones(64, dtype=np.float32))
+    assert y.dtype == np.complex64
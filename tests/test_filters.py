@@ -0,0 +1,114 @@
+"""
+Moving-Average and CIC Filters
+==============================
+
+The streaming filters of utils/filters.py must give the same output
+whatever the block sizes, match direct convolution, agree between integer
+and floating-point inputs and keep NaN / inf local to the windows that
+contain them.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+from utils import filters
+
+
+def _blocks(process, x, sizes):
+    edges = np.cumsum([0] + list(sizes))
+    assert edges[-1] == x.shape[-1]
+    return np.concatenate([process(x[..., a:b]) for a, b in zip(edges[:-1], edges[1:])],
+                          axis=-1)
+
+
+def _cic_reference(x, R, N, M):
+    # N cascaded (R*M)-tap moving sums, then keep every R-th sample
+    y = x.astype(np.float64)
+    for _ in range(N):
+        y = np.convolve(y, np.ones(R * M))[:x.size]
+    return y[::R]
+
+
+SIZES = [0, 1, 7, 1000, 3, 4096 + 5, 2889]
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32, np.int16])
+def test_moving_average_blocks_match_one_shot(dtype):
+    x = (100 * np.random.default_rng(0).standard_normal((2, sum(SIZES)))).astype(dtype)
+    one_shot = filters.MovingAverage(33, normalize=False).process(x)
+    split = _blocks(filters.MovingAverage(33, normalize=False).process, x, SIZES)
+    np.testing.assert_allclose(split, one_shot, rtol=0, atol=1e-9)
+    reference = np.convolve(x[0].astype(np.float64), np.ones(33))[:x.shape[-1]]
+    np.testing.assert_allclose(one_shot[0], reference, rtol=1e-6 if dtype == np.float32 else 1e-12,
+                               atol=1e-9)
+
+
+def test_moving_average_integer_matches_float():
+    x = np.random.default_rng(1).integers(-1000, 1000, 20000)
+    exact = filters.moving_average(x, 64, normalize=False)
+    assert exact.dtype == np.int64
+    np.testing.assert_array_equal(exact, filters.moving_average(x.astype(float), 64,
+                                                                normalize=False))
+
+
+def test_moving_average_long_block_error_does_not_grow():
+    x = 1e4 + np.random.default_rng(2).standard_normal(10**7)
+    y = filters.moving_average(x, 16, normalize=False)
+    reference = np.convolve(x, np.ones(16))[:x.size]
+    assert np.max(np.abs(y - reference)) <= 1e-7
+
+
+@pytest.mark.parametrize('bad', [np.nan, np.inf])
+def test_moving_average_non_finite_stays_local(bad):
+    x = np.random.default_rng(3).standard_normal(1000)
+    x[300] = bad
+    ma = filters.MovingAverage(4, normalize=False)
+    y = _blocks(ma.process, x, [302, 698])   # the bad sample reaches the history
+    reference = np.convolve(x, np.ones(4))[:x.size]
+    np.testing.assert_array_equal(np.isnan(y), np.isnan(reference))
+    np.testing.assert_array_equal(np.isinf(y), np.isinf(reference))
+    np.testing.assert_allclose(y, reference, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.int32])
+def test_cic_decimator_blocks_match_reference(dtype):
+    R, N, M = 8, 3, 2
+    x = (50 * np.random.default_rng(4).standard_normal(sum(SIZES))).astype(dtype)
+    one_shot = filters.CICDecimator(R, N, M, normalize=False).process(x)
+    split = _blocks(filters.CICDecimator(R, N, M, normalize=False).process, x, SIZES)
+    np.testing.assert_allclose(split, one_shot, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(one_shot, _cic_reference(x, R, N, M), rtol=1e-12, atol=1e-6)
+
+
+def test_cic_decimator_integer_matches_float():
+    x = np.random.default_rng(5).integers(-2**15, 2**15, 50000).astype(np.int16)
+    exact = filters.CICDecimator(4, 4, normalize=False).process(x)
+    approx = filters.CICDecimator(4, 4, normalize=False).process(x.astype(np.float64))
+    assert exact.dtype == np.int64
+    np.testing.assert_allclose(approx, exact, rtol=1e-12, atol=1e-6)
+
+
+def test_cic_decimator_non_finite_stays_local():
+    x = np.random.default_rng(6).standard_normal(5000)
+    x[1000] = np.inf
+    y = filters.CICDecimator(4, 2, normalize=False).process(x)
+    assert np.isnan(y).sum() == 0
+    assert np.isfinite(y[:250]).all() and np.isfinite(y[252:]).all()
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.int32])
+def test_cic_interpolator_blocks_match_reference(dtype):
+    R, N = 4, 3
+    x = (50 * np.random.default_rng(7).standard_normal(sum(SIZES))).astype(dtype)
+    one_shot = filters.CICInterpolator(R, N, normalize=False).process(x)
+    split = _blocks(filters.CICInterpolator(R, N, normalize=False).process, x, SIZES)
+    np.testing.assert_allclose(split, one_shot, rtol=0, atol=1e-6)
+    up = np.zeros(R * x.size)
+    up[::R] = x
+    reference = up
+    for _ in range(N):
+        reference = np.convolve(reference, np.ones(R))[:up.size]
+    np.testing.assert_allclose(one_shot, reference, rtol=1e-12, atol=1e-6)
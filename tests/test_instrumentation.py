@@ -0,0 +1,175 @@
+"""
+DSP Instrumentation
+===================
+
+profiling() in utils/instrumentation.py must attribute calls to the
+innermost active registry, split time between nested instrumented calls
+and export the same numbers as JSON and as folded flame-graph stacks.
+
+A fake clock makes the recorded times exact.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import json
+import threading
+import types
+
+import numpy as np
+import pytest
+
+from utils import instrumentation
+from utils.instrumentation import Registry, instrument, profiling
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace perf_counter with a clock that only moves when told to."""
+    now = [0.0]
+    monkeypatch.setattr(instrumentation, 'time',
+                        types.SimpleNamespace(perf_counter=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def calls(clock):
+    """outer(x) takes 2 s itself and calls inner(x), 1 s each, twice."""
+
+    @instrument(name='inner')
+    def inner(x):
+        clock[0] += 1.0
+        return np.asarray(x, dtype=np.float64)
+
+    @instrument(name='outer')
+    def outer(x):
+        clock[0] += 2.0
+        inner(x)
+        return inner(x)
+
+    return types.SimpleNamespace(inner=inner, outer=outer)
+
+
+def test_disabled_records_nothing(calls):
+    stats = Registry()
+    calls.outer(np.zeros(8))
+    assert not instrumentation.is_enabled()
+    with profiling(registry=stats):
+        assert instrumentation.is_enabled()
+    assert stats.summary() == {}
+
+
+def test_nested_calls_aggregate(calls):
+    with profiling() as stats:
+        calls.outer(np.zeros(8))
+        calls.outer(np.zeros(8))
+    summary = stats.summary()
+    assert list(summary) == ['inner', 'outer']
+
+    inner, outer = summary['inner'], summary['outer']
+    assert inner['calls'] == 4 and outer['calls'] == 2
+    # outer's total includes its children
+    assert inner['total_seconds'] == 4.0 and outer['total_seconds'] == 8.0
+    assert outer['mean_seconds'] == outer['min_seconds'] == outer['max_seconds'] == 4.0
+    assert inner['samples'] == 32 and outer['samples'] == 16
+    assert inner['samples_per_second'] == 8.0
+    assert inner['bytes_allocated'] == 4 * 8 * 8
+    assert outer['bytes_allocated'] == 2 * 8 * 8
+
+
+def test_nested_contexts_use_innermost_registry(calls):
+    with profiling() as outer_stats:
+        calls.inner([1, 2, 3])
+        with profiling() as inner_stats:
+            calls.outer([1, 2, 3])
+            assert instrumentation._active is inner_stats
+        assert instrumentation._active is outer_stats
+        calls.inner([1, 2, 3])
+    assert instrumentation._active is None
+
+    assert outer_stats.summary()['inner']['calls'] == 2
+    assert 'outer' not in outer_stats.summary()
+    assert inner_stats.summary()['inner']['calls'] == 2
+    assert inner_stats.summary()['outer']['calls'] == 1
+
+
+def test_registry_accumulates_over_contexts(calls):
+    stats = Registry()
+    for _ in range(3):
+        with profiling(registry=stats):
+            calls.inner([0.0])
+    assert stats.summary()['inner']['calls'] == 3
+    stats.reset()
+    assert stats.summary() == {} and stats.to_folded() == ''
+
+
+def test_calls_from_other_threads_are_recorded(calls):
+    with profiling() as stats:
+        # One at a time, so the shared fake clock gives exact times
+        for _ in range(4):
+            t = threading.Thread(target=calls.inner, args=([0.0],))
+            t.start()
+            t.join()
+    assert stats.summary()['inner']['calls'] == 4
+    # Each thread has its own stack, so every call is a root call
+    assert stats.to_folded() == 'inner 4000000\n'
+
+
+def test_failed_call_unwinds_stack(clock):
+    @instrument(name='fails')
+    def fails(x):
+        clock[0] += 1.0
+        raise RuntimeError
+
+    @instrument(name='ok')
+    def ok(x):
+        clock[0] += 1.0
+        return x
+
+    with profiling() as stats:
+        with pytest.raises(RuntimeError):
+            fails([0.0])
+        ok([0.0])
+    # The failed call is not recorded and leaves no frame behind
+    assert stats.to_folded() == 'ok 1000000\n'
+
+
+def test_json_export(calls, tmp_path):
+    with profiling() as stats:
+        calls.outer(np.zeros(8))
+    path = tmp_path / 'profile.json'
+    stats.write_json(path)
+    text = path.read_text()
+    assert text.endswith('\n')
+    assert json.loads(text) == json.loads(stats.to_json()) == stats.summary()
+    assert set(json.loads(text)['outer']) == {
+        'calls', 'total_seconds', 'mean_seconds', 'min_seconds', 'max_seconds',
+        'samples', 'bytes_allocated', 'samples_per_second'}
+
+
+def test_folded_export(calls, tmp_path):
+    with profiling() as stats:
+        calls.outer(np.zeros(8))
+        calls.inner(np.zeros(8))
+    # Self times in microseconds, sorted by stack; root inner and nested
+    # inner are separate stacks
+    expected = 'inner 1000000\nouter 2000000\nouter;inner 2000000\n'
+    assert stats.to_folded() == expected
+
+    path = tmp_path / 'profile.folded'
+    stats.write_folded(path)
+    assert path.read_text() == expected
+    # Self times add up to the root calls' total time
+    total = sum(int(line.rsplit(' ', 1)[1]) for line in expected.splitlines())
+    assert total == 5000000
+
+
+def test_trace_memory_counts_allocations(clock):
+    @instrument(name='alloc')
+    def alloc(n):
+        clock[0] += 1.0
+        return np.ones(n).sum()     # returns no array
+
+    with profiling(trace_memory=True) as stats:
+        alloc(100000)
+    assert stats.summary()['alloc']['bytes_allocated'] >= 100000 * 8
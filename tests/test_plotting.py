@@ -0,0 +1,40 @@
+"""
+Plotting Helpers
+================
+
+render_options() in utils/plotting.py parses the flags shared by the
+example scripts and must reject a missing or invalid --workers value with
+a usage error instead of crashing.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import pytest
+
+from utils.plotting import render_options
+
+
+@pytest.fixture(autouse=True)
+def _no_headless_env(monkeypatch):
+    monkeypatch.delenv('DSP_HEADLESS', raising=False)
+
+
+@pytest.mark.parametrize('argv, expected', [
+    ([], {'show': True, 'workers': None}),
+    (['--headless'], {'show': False, 'workers': None}),
+    (['--workers', '4'], {'show': True, 'workers': 4}),
+    (['--workers=2', '--headless'], {'show': False, 'workers': 2}),
+    (['input.wav', '--workers', '3', '--verbose'], {'show': True, 'workers': 3}),
+])
+def test_flags(argv, expected):
+    assert render_options(argv) == expected
+
+
+@pytest.mark.parametrize('argv', [['--workers'], ['--headless', '--workers'],
+                                  ['--workers', 'many'], ['--workers', '0']])
+def test_bad_workers_is_a_usage_error(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        render_options(argv)
+    assert exit_info.value.code == 2
+    assert 'usage:' in capsys.readouterr().err
@@ -0,0 +1,76 @@
+"""
+Single-Precision Error Bounds
+=============================
+
+Every routine that keeps float32 input in float32 is computed twice from
+the same random inputs, once in float32 and once in float64. The largest
+difference relative to the peak of the float64 result must stay within
+the routine's bound.
+
+    python -m pytest tests
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+from utils import chirp_z, fast_convolution, filters, precision
+from utils import common_functions as cf
+
+
+SIZE = 100_000
+
+ZOOM_M = 4096
+ZOOM_BAND = (0.25, 0.25 + 2.0 * ZOOM_M / (1 << 19))   # fs = 2
+
+
+def _signal(dtype, rng, size=SIZE):
+    # The same float64 draw for every dtype (rng is re-seeded per run)
+    return rng.standard_normal(size).astype(dtype)
+
+
+def _convolution_accumulate(dtype, rng):
+    with precision.precision(accumulate=np.float64):
+        return cf.discrete_convolution(_signal(dtype, rng), _signal(dtype, rng, 64))
+
+
+# (name, compute(dtype, rng) -> result computed in dtype, bound)
+CHECKS = [
+    ('unit_step', lambda dtype, rng: cf.unit_step(range(SIZE), dtype=dtype), 0.0),
+    ('exponential_sequence',
+     lambda dtype, rng: cf.exponential_sequence(range(SIZE), 0.9999, dtype=dtype), 1e-6),
+    ('complex_exponential',
+     lambda dtype, rng: cf.complex_exponential(range(SIZE), 0.01, dtype=dtype), 1e-6),
+    ('sinusoidal_sequence',
+     lambda dtype, rng: cf.sinusoidal_sequence(range(SIZE), 2.0, 0.01, dtype=dtype), 1e-6),
+    ('db', lambda dtype, rng: cf.db(_signal(dtype, rng)), 1e-6),
+    ('normalize', lambda dtype, rng: cf.normalize(_signal(dtype, rng)), 1e-6),
+    ('discrete_convolution',
+     lambda dtype, rng: cf.discrete_convolution(_signal(dtype, rng),
+                                                _signal(dtype, rng, 64)), 1e-5),
+    ('discrete_convolution:accumulate', _convolution_accumulate, 1e-6),
+    ('discrete_convolution:boxcar',
+     lambda dtype, rng: cf.discrete_convolution(_signal(dtype, rng),
+                                                np.ones(1024, dtype=dtype)), 1e-6),
+    ('fft_convolve',
+     lambda dtype, rng: fast_convolution.fft_convolve(_signal(dtype, rng),
+                                                      _signal(dtype, rng, 1024)), 1e-5),
+    ('zoom_fft',
+     lambda dtype, rng: chirp_z.zoom_fft(_signal(dtype, rng), ZOOM_BAND, m=ZOOM_M), 1e-5),
+    ('moving_average',
+     lambda dtype, rng: filters.moving_average(_signal(dtype, rng), 256), 1e-6),
+    ('cic_decimator',
+     lambda dtype, rng: filters.CICDecimator(8, 4).process(_signal(dtype, rng)), 1e-6),
+]
+
+
+@pytest.mark.parametrize('compute, bound',
+                         [check[1:] for check in CHECKS],
+                         ids=[check[0] for check in CHECKS])
+def test_float32_error_bound(compute, bound):
+    approx = compute(np.dtype(np.float32), np.random.default_rng(0))
+    reference = compute(np.dtype(np.float64), np.random.default_rng(0))
+    assert approx.dtype in (np.float32, np.complex64)
+    assert precision.max_relative_error(approx, reference) <= bound
@@ -0,0 +1,148 @@
+"""
+Sparse and Run-Length Signals
+=============================
+
+SparseSignal and RunLengthSignal (utils/sparse_signals.py) against their
+dense NumPy counterparts: construction, time-index windows, block
+iteration and convolution.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+import pytest
+
+from utils import common_functions as cf
+from utils.sparse_signals import RunLengthSignal, SparseSignal
+
+
+N_RANGE = range(-20, 80)
+
+
+def _x(shape, dtype=np.float64, seed=0):
+    rng = np.random.default_rng(seed)
+    if np.dtype(dtype).kind in 'iu':
+        return rng.integers(-50, 50, shape).astype(dtype)
+    return rng.standard_normal(shape).astype(dtype)
+
+
+# ----------------------------------------------------------------------------
+# Construction against the dense generators
+# ----------------------------------------------------------------------------
+
+def test_impulses_match_unit_impulse():
+    for n0 in [0, -20, 79, [-3, 5, 40], [-100, 3, 200]]:
+        sig = SparseSignal.impulses(N_RANGE, n0=n0)
+        np.testing.assert_array_equal(np.asarray(sig), cf.unit_impulse(N_RANGE, n0=n0))
+        assert sig.n == N_RANGE
+
+
+@pytest.mark.parametrize('n1, n2', [(-5, 5), (-100, 3), (70, 200), (10, 9), (-20, 79)])
+def test_rect_matches_rect_pulse(n1, n2):
+    sig = RunLengthSignal.rect(N_RANGE, n1, n2)
+    np.testing.assert_array_equal(np.asarray(sig), cf.rect_pulse(N_RANGE, n1, n2))
+
+
+@pytest.mark.parametrize('n0', [-50, -20, 0, 79, 100])
+def test_step_matches_unit_step(n0):
+    sig = RunLengthSignal.step(N_RANGE, n0=n0, amplitude=2.5)
+    np.testing.assert_array_equal(np.asarray(sig), 2.5 * cf.unit_step(N_RANGE, n0=n0))
+
+
+def test_from_dense_round_trip():
+    x = np.array([0, 0, 3, 3, 3, 0, -1, -1, 2, 0, 0, 5], dtype=np.int32)
+    for cls in (SparseSignal, RunLengthSignal):
+        sig = cls.from_dense(x, start=-4)
+        assert sig.dtype == x.dtype and len(sig) == x.size and sig.n == range(-4, 8)
+        np.testing.assert_array_equal(np.asarray(sig), x)
+    assert SparseSignal.from_dense(x).nnz == 7
+    assert RunLengthSignal.from_dense(x).segments == 4
+
+
+def test_duplicate_impulses_and_overlapping_segments_add():
+    sparse = SparseSignal([3, 1, 3], [1.0, 2.0, 4.0], 6)
+    np.testing.assert_array_equal(np.asarray(sparse), [0, 2, 0, 5, 0, 0])
+    runs = RunLengthSignal([0, 2], [4, 6], [1.0, 10.0], 7)
+    np.testing.assert_array_equal(np.asarray(runs), [1, 1, 11, 11, 10, 10, 0])
+
+
+def test_invalid_positions_raise():
+    with pytest.raises(ValueError):
+        SparseSignal([10], [1.0], 10)
+    with pytest.raises(ValueError):
+        RunLengthSignal([2], [11], [1.0], 10)
+    with pytest.raises(ValueError):
+        RunLengthSignal.rect(range(0, 10, 2), 0, 4)
+
+
+# ----------------------------------------------------------------------------
+# Time-index windows and blocks
+# ----------------------------------------------------------------------------
+
+@pytest.mark.parametrize('start, stop', [(-20, 80), (-40, 0), (10, 30), (75, 120), (50, 50)])
+def test_to_dense_windows(start, stop):
+    dense = np.zeros(300)
+    sparse = SparseSignal.impulses(N_RANGE, n0=[-20, -3, 12, 79], values=[1, 2, 3, 4])
+    runs = RunLengthSignal.rect(N_RANGE, -3, 40, amplitude=2.0)
+    for sig in (sparse, runs):
+        dense[:] = 0
+        dense[100 + sig.start:100 + sig.start + len(sig)] = np.asarray(sig)
+        np.testing.assert_array_equal(sig.to_dense(start, stop),
+                                      dense[100 + start:100 + stop])
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 100, 1000])
+def test_blocks_concatenate_to_dense(block_size):
+    for sig in (SparseSignal.impulses(N_RANGE, n0=[0, 33, 79]),
+                RunLengthSignal.rect(N_RANGE, -10, 50)):
+        blocks = list(sig.blocks(block_size))
+        assert all(len(b) <= block_size for b in blocks)
+        np.testing.assert_array_equal(np.concatenate(blocks), np.asarray(sig))
+
+
+# ----------------------------------------------------------------------------
+# Convolution
+# ----------------------------------------------------------------------------
+
+SIGNALS = {
+    'impulses': lambda: SparseSignal.impulses(range(0, 500), n0=[0, 17, 250, 499],
+                                              values=[1.0, -2.0, 0.5, 3.0]),
+    'dense impulses': lambda: SparseSignal.from_dense(_x(40, seed=5)),
+    'rect': lambda: RunLengthSignal.rect(range(0, 500), 100, 299),
+    'rect at end': lambda: RunLengthSignal.rect(range(0, 500), 0, 9),
+    'step': lambda: RunLengthSignal.step(range(0, 6000), 10),
+    'runs': lambda: RunLengthSignal([0, 5, 400], [3, 300, 450], [1.0, -0.5, 2.0], 500),
+}
+
+
+@pytest.mark.parametrize('name', list(SIGNALS))
+@pytest.mark.parametrize('shape', [(1,), (9000,), (3, 700)])
+def test_convolve_matches_np_convolve(name, shape):
+    sig = SIGNALS[name]()
+    x = _x(shape)
+    y = sig.convolve(x)
+    reference = np.array([np.convolve(np.asarray(sig), row)
+                          for row in x.reshape(-1, shape[-1])]).reshape(
+                              shape[:-1] + (len(sig) + shape[-1] - 1,))
+    assert y.shape == reference.shape
+    np.testing.assert_allclose(y, reference, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('dtype', [np.int16, np.float32])
+def test_convolve_dtypes(dtype):
+    x = _x(2000, dtype)
+    for sig in (SparseSignal.impulses(range(0, 50), n0=[3, 20], values=2, dtype=dtype),
+                RunLengthSignal.rect(range(0, 50), 5, 30, amplitude=3, dtype=dtype)):
+        y = sig.convolve(x)
+        assert y.dtype == dtype
+        reference = np.convolve(np.asarray(sig).astype(np.float64), x.astype(np.float64))
+        np.testing.assert_allclose(y, reference, rtol=1e-6, atol=1e-6)
+
+
+def test_discrete_convolution_routes_either_operand():
+    x = _x(3000)
+    for sig in (SIGNALS['impulses'](), SIGNALS['runs']()):
+        reference = np.convolve(np.asarray(sig), x)
+        np.testing.assert_allclose(cf.discrete_convolution(x, sig), reference, atol=1e-9)
+        np.testing.assert_allclose(cf.discrete_convolution(sig, x), reference, atol=1e-9)
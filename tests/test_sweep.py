@@ -0,0 +1,154 @@
+"""
+Cached Parameter Sweeps
+=======================
+
+SweepRunner (utils/sweep.py): which points are computed and which are
+loaded, and when the cache key changes -- the source of a direct or
+indirect dependency, the precision policy or the backend.
+
+The compute functions live in a small package written to a temporary
+directory, which stands in for the repository root.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import importlib
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+from utils import backends, sweep
+from utils.precision import precision
+
+
+SOURCES = {
+    'sweepdemo/__init__.py': '',
+    'sweepdemo/deep.py': '''
+        SCALE = 2
+        ''',
+    'sweepdemo/helper.py': '''
+        from . import deep
+
+        def scaled(value):
+            return deep.SCALE * value
+        ''',
+    'sweepdemo/compute.py': '''
+        import numpy as np
+
+        from utils import precision
+        from .helper import scaled
+
+        CALLS = []
+
+        def compute(alpha, length=4):
+            CALLS.append((alpha, length))
+            return scaled(alpha) * np.ones(length, dtype=precision.real_dtype())
+        ''',
+}
+
+
+@pytest.fixture
+def demo(tmp_path, monkeypatch):
+    """The sweepdemo package under tmp_path, which is the repository root."""
+    for name, source in SOURCES.items():
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(textwrap.dedent(source))
+    monkeypatch.setattr(sweep, 'REPO_ROOT', tmp_path.resolve())
+    monkeypatch.syspath_prepend(str(tmp_path))
+    importlib.invalidate_caches()
+    yield importlib.import_module('sweepdemo.compute')
+    for name in [m for m in sys.modules if m == 'sweepdemo' or m.startswith('sweepdemo.')]:
+        del sys.modules[name]
+
+
+@pytest.fixture
+def runner(demo, tmp_path):
+    demo.CALLS.clear()
+    return sweep.SweepRunner(demo.compute, cache_dir=tmp_path / 'cache', workers=1)
+
+
+def test_grid_order():
+    assert sweep.grid(alpha=[0.5, 0.9], length=[8, 16]) == [
+        {'alpha': 0.5, 'length': 8}, {'alpha': 0.5, 'length': 16},
+        {'alpha': 0.9, 'length': 8}, {'alpha': 0.9, 'length': 16}]
+
+
+def test_only_new_points_are_computed(runner, demo):
+    first = runner.run(sweep.grid(alpha=[1.0, 2.0]))
+    assert (runner.computed, runner.cached) == (2, 0)
+    results = runner.run(sweep.grid(alpha=[1.0, 2.0, 3.0]))
+    assert (runner.computed, runner.cached) == (1, 2)
+    assert demo.CALLS == [(1.0, 4), (2.0, 4), (3.0, 4)]
+    np.testing.assert_array_equal(results[0], first[0])
+    np.testing.assert_array_equal(results[2], 6.0 * np.ones(4))
+
+
+def test_duplicate_points_are_computed_once(runner, demo):
+    results = runner.run([{'alpha': 1.0}, {'alpha': np.float64(1.0)}, {'alpha': 1.0}])
+    assert (runner.computed, runner.cached) == (1, 0)
+    assert len(demo.CALLS) == 1 and len(results) == 3
+
+
+def test_stale(runner):
+    runner.run([{'alpha': 1.0}])
+    assert runner.stale([{'alpha': 1.0}, {'alpha': 5.0}]) == [{'alpha': 5.0}]
+
+
+@pytest.mark.parametrize('module', ['compute', 'helper', 'deep'])
+def test_editing_a_dependency_invalidates(runner, demo, tmp_path, module):
+    point = {'alpha': 1.0}
+    key = runner.key(point)
+    assert runner.key(point) == key
+    path = tmp_path / 'sweepdemo' / f'{module}.py'
+    path.write_text(path.read_text() + '\n# edited\n')
+    assert runner.key(point) != key
+    runner.run([point])
+    assert runner.computed == 1
+
+
+def test_unrelated_file_does_not_invalidate(runner, tmp_path):
+    key = runner.key({'alpha': 1.0})
+    (tmp_path / 'sweepdemo' / 'unused.py').write_text('X = 1\n')
+    assert runner.key({'alpha': 1.0}) == key
+
+
+def test_precision_policy_changes_the_key(runner):
+    point = {'alpha': 1.0}
+    key = runner.key(point)
+    with precision(np.float32):
+        assert runner.key(point) != key
+        result, = runner.run([point])
+        assert runner.computed == 1 and result.dtype == np.float32
+    with precision(accumulate=np.float64):
+        assert runner.key(point) != key
+    result, = runner.run([point])
+    assert runner.computed == 1 and result.dtype == np.float64
+
+
+def test_backend_changes_the_key(runner):
+    point = {'alpha': 1.0}
+    policy = sweep.runtime_policy()
+    other = dict(policy, backend='numba' if policy['backend'] == 'numpy' else 'numpy')
+    assert runner.key(point, policy=other) != runner.key(point, policy=policy)
+    with backends.backend('numpy'):
+        assert sweep.runtime_policy()['backend'] == 'numpy'
+        assert runner.key(point) == runner.key(point, policy=dict(policy, backend='numpy'))
+
+
+def test_workers_apply_the_policy(demo, tmp_path):
+    runner = sweep.SweepRunner(demo.compute, cache_dir=tmp_path / 'cache', workers=2)
+    with precision(np.float32):
+        results = runner.run(sweep.grid(alpha=[1.0, 2.0, 3.0]))
+    assert runner.computed == 3
+    assert all(r.dtype == np.float32 for r in results)
+
+
+def test_parse_axis():
+    assert sweep._parse_axis('alpha=0.5,0.7') == ('alpha', [0.5, 0.7])
+    assert sweep._parse_axis('name=(1, 2)') == ('name', [(1, 2)])
+    with pytest.raises(ValueError):
+        sweep._parse_axis('alpha')
@@ -0,0 +1,98 @@
+"""
+DSP-in-Python Utilities
+=======================
+
+Shared helpers for the lesson examples.
+
+Importing the package is cheap: submodules (and NumPy, matplotlib, SciPy
+behind them) are only loaded when one of their names is first accessed.
+
+    >>> import utils
+    >>> n = np.arange(-5, 6)
+    >>> delta = utils.unit_impulse(n)          # loads utils.common_functions
+    >>> with utils.instrumentation.profiling() as stats:
+    ...     utils.db(delta)
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import importlib
+
+# Submodules available as attributes of the package
+_SUBMODULES = (
+    'backends',
+    'benchmarks',
+    'chirp_z',
+    'common_functions',
+    'correlation',
+    'fast_convolution',
+    'filterbank',
+    'filters',
+    'instrumentation',
+    'plotting',
+    'precision',
+    'sparse_signals',
+    'spectral',
+    'sweep',
+)
+
+# Public names re-exported from submodules: name -> submodule
+_EXPORTS = {
+    'unit_impulse': 'common_functions',
+    'unit_step': 'common_functions',
+    'rect_pulse': 'common_functions',
+    'exponential_sequence': 'common_functions',
+    'exponential_bank': 'common_functions',
+    'complex_exponential': 'common_functions',
+    'sinusoidal_sequence': 'common_functions',
+    'shift_signal': 'common_functions',
+    'downsample': 'common_functions',
+    'upsample': 'common_functions',
+    'db': 'common_functions',
+    'normalize': 'common_functions',
+    'discrete_convolution': 'common_functions',
+    'czt': 'chirp_z',
+    'zoom_fft': 'chirp_z',
+    'MatchedFilter': 'correlation',
+    'cross_correlate': 'correlation',
+    'Kernel': 'fast_convolution',
+    'circular_convolve': 'fast_convolution',
+    'fft_convolve': 'fast_convolution',
+    'PolyphaseAnalyzer': 'filterbank',
+    'PolyphaseSynthesizer': 'filterbank',
+    'MovingAverage': 'filters',
+    'moving_average': 'filters',
+    'CICDecimator': 'filters',
+    'CICInterpolator': 'filters',
+    'SparseSignal': 'sparse_signals',
+    'RunLengthSignal': 'sparse_signals',
+    'RunningAutocorrelation': 'spectral',
+    'WelchPSD': 'spectral',
+    'WelchCSD': 'spectral',
+    'SweepRunner': 'sweep',
+    'grid': 'sweep',
+    'get_backend': 'backends',
+    'set_backend': 'backends',
+    'get_default_dtype': 'precision',
+    'set_default_dtype': 'precision',
+    'instrument': 'instrumentation',
+    'profiling': 'instrumentation',
+}
+
+__all__ = list(_SUBMODULES) + list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    if name in _EXPORTS:
+        module = importlib.import_module('.' + _EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value  # later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
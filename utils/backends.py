@@ -0,0 +1,408 @@
+"""
+Compute Backends for Recursive Kernels
+======================================
+
+Recursions -- IIR sections, the recursive oscillator, cascaded
+integrators, adaptive filter updates -- run one sample after another and
+cannot be vectorized along time. This module runs them on one of two
+backends:
+
+* 'numba': the sample loops below, JIT-compiled on first use (and cached
+  on disk) when Numba is installed.
+* 'numpy': NumPy / SciPy only. IIR filtering and the oscillator use
+  scipy.signal.lfilter and the integrators np.cumsum, which are compiled
+  loops already; the LMS update falls back to a Python loop over samples,
+  vectorized over taps and channels.
+
+Both backends evaluate the same recursions in the same order: lfilter and
+the oscillator follow SciPy's transposed direct form II step by step, and
+integer integrators wrap around identically, so those results are equal
+on either backend. LMS sums its taps in a different order on each, so it
+agrees to rounding.
+
+The default backend is numba if it can be imported, else numpy; the
+DSP_BACKEND environment variable ('numpy', 'numba' or 'auto') overrides
+it at start-up:
+
+    >>> from utils import backends
+    >>> backends.get_backend()
+    'numba'
+    >>> with backends.backend('numpy'):
+    ...     y = backends.lfilter(b, a, x)       # scipy.signal.lfilter
+
+Numba is optional (see requirements.txt) and is imported only when a
+kernel first runs on it. Like the precision policy, the backend is a
+process-wide setting.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import functools
+import importlib.util
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from . import precision
+from .instrumentation import instrument
+
+
+BACKENDS = ('numpy', 'numba')
+
+_backend = os.environ.get('DSP_BACKEND') or None  # None = auto: numba if installed
+_kernels = {}    # loop function -> compiled kernel
+_lock = threading.Lock()
+
+
+def _numba():
+    """Import numba on first use, or return None if it is not installed."""
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba
+
+
+@functools.lru_cache(maxsize=None)
+def available_backends():
+    """Names of the backends that can run here ('numpy' always)."""
+    if importlib.util.find_spec('numba') is None:
+        return ('numpy',)
+    return BACKENDS
+
+
+def _check_backend(name):
+    if name is None or name == 'auto':
+        return None
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r}; use one of {BACKENDS} or 'auto'")
+    if name not in available_backends():
+        raise ValueError(f"backend {name!r} is not available ({name} is not installed)")
+    return name
+
+
+def get_backend():
+    """Return the name of the backend kernels run on ('numpy' or 'numba')."""
+    # _check_backend also validates a DSP_BACKEND value on first use
+    name = _check_backend(_backend)
+    if name is not None:
+        return name
+    return 'numba' if 'numba' in available_backends() else 'numpy'
+
+
+def set_backend(name):
+    """
+    Select the backend for recursive kernels.
+
+    Parameters:
+    -----------
+    name : str
+        'numpy', 'numba', or 'auto' (numba when installed)
+
+    Returns:
+    --------
+    previous : str
+        The previous setting ('auto' if none was made), e.g. to restore it
+    """
+    global _backend
+    with _lock:
+        previous, _backend = _backend, _check_backend(name)
+    return 'auto' if previous is None else previous
+
+
+@contextmanager
+def backend(name):
+    """
+    Context manager that selects a backend for its duration.
+
+    Examples:
+    ---------
+    >>> with backend('numpy'):
+    ...     y = lfilter(b, a, x)
+    """
+    previous = set_backend(name)
+    try:
+        yield
+    finally:
+        set_backend(previous)
+
+
+def _jit(loop):
+    """The numba-compiled version of a loop function (compiled once)."""
+    kernel = _kernels.get(loop)
+    if kernel is None:
+        kernel = _numba().njit(cache=True)(loop)
+        _kernels[loop] = kernel
+    return kernel
+
+
+def _row_shape(x):
+    return (int(np.prod(x.shape[:-1])), x.shape[-1])
+
+
+def _rows(x):
+    """View (..., N) as a C-contiguous (rows, N) array for the loops."""
+    return np.ascontiguousarray(x.reshape(_row_shape(x)))
+
+
+# ----------------------------------------------------------------------------
+# Sample loops (plain Python; compiled by numba)
+# ----------------------------------------------------------------------------
+
+def _lfilter_loop(b, a, x, z, y):
+    # Transposed direct form II, in scipy.signal.lfilter's operation order
+    order = z.shape[1]
+    for row in range(x.shape[0]):
+        for n in range(x.shape[1]):
+            xn = x[row, n]
+            yn = z[row, 0] + b[0] * xn
+            for i in range(order - 1):
+                z[row, i] = z[row, i + 1] + xn * b[i + 1] - yn * a[i + 1]
+            z[row, order - 1] = xn * b[order] - yn * a[order]
+            y[row, n] = yn
+
+
+def _integrate_loop(x, state, y):
+    # Cascaded integrators y_s[n] = y_s[n-1] + y_{s-1}[n], all stages per sample
+    for row in range(x.shape[0]):
+        for n in range(x.shape[1]):
+            v = x[row, n]
+            for s in range(state.shape[1]):
+                v = state[row, s] + v
+                state[row, s] = v
+            y[row, n] = v
+
+
+def _lms_loop(ext, d, w, mu, y, e):
+    # ext holds the L-1 previous inputs followed by the block
+    L = w.shape[1]
+    for row in range(d.shape[0]):
+        for n in range(d.shape[1]):
+            acc = 0 * w[row, 0]
+            for i in range(L):
+                acc += np.conj(w[row, i]) * ext[row, n + L - 1 - i]
+            err = d[row, n] - acc
+            y[row, n] = acc
+            e[row, n] = err
+            g = mu * np.conj(err)
+            for i in range(L):
+                w[row, i] += g * ext[row, n + L - 1 - i]
+
+
+# ----------------------------------------------------------------------------
+# Kernels
+# ----------------------------------------------------------------------------
+
+def _lfilter(b, a, x, zi):
+    """lfilter in the work dtype on the current backend; returns (y, zf)."""
+    if get_backend() == 'numpy':
+        from scipy.signal import lfilter as scipy_lfilter
+        return scipy_lfilter(b, a, x, zi=zi)
+    # C order, so that the loop writes through the (rows, N) view into y
+    y = np.empty(x.shape, dtype=x.dtype)
+    z = _rows(zi).copy()
+    _jit(_lfilter_loop)(b, a, _rows(x), z, y.reshape(_row_shape(y)))
+    return y, z.reshape(zi.shape)
+
+
+@instrument
+def lfilter(b, a, x, zi=None):
+    """
+    Filter along the last axis with an IIR section (as scipy.signal.lfilter).
+
+    a[0] y[n] = sum_k b[k] x[n-k] - sum_{k>=1} a[k] y[n-k]
+
+    Parameters:
+    -----------
+    b, a : array-like
+        Numerator and denominator coefficients (a[0] != 0)
+    x : array-like
+        Input, shape (..., N)
+    zi : array-like, optional
+        Initial state, shape (..., max(len(a), len(b)) - 1), e.g. the final
+        state of the previous block (default: zero state)
+
+    Returns:
+    --------
+    y : ndarray
+        Filtered signal, in the input precision (float32 input stays
+        float32; the recursion runs in float64)
+    zf : ndarray
+        Final state, in float64 (only when zi is given)
+
+    Examples:
+    ---------
+    >>> y, z = lfilter(b, a, block1, zi=np.zeros(2))
+    >>> y2, z = lfilter(b, a, block2, zi=z)     # continues seamlessly
+    """
+    b, a, x = np.atleast_1d(b), np.atleast_1d(a), np.asarray(x)
+    if a[0] == 0:
+        raise ValueError("a[0] must be non-zero")
+    work = np.result_type(b, a, x, np.float64)
+    out = precision.result_dtype(x)
+    if work.kind == 'c':
+        out = precision.complex_dtype(np.finfo(out).dtype)
+
+    order = max(len(a), len(b)) - 1
+    coeffs = np.zeros((2, order + 1), dtype=work)
+    coeffs[0, :len(b)], coeffs[1, :len(a)] = b, a
+    coeffs /= coeffs[1, 0]
+    state = np.zeros(x.shape[:-1] + (order,), dtype=work)
+    if zi is not None:
+        state[...] = zi
+
+    if order == 0:
+        y, zf = coeffs[0, 0] * x.astype(work), state
+    else:
+        y, zf = _lfilter(coeffs[0], coeffs[1], x.astype(work), state)
+    y = y.astype(out, copy=False)
+    return y if zi is None else (y, zf)
+
+
+@instrument
+def oscillator(N, A, omega, phi=0, dtype=None):
+    """
+    A cos(omega n + phi) for n = 0, ..., N-1 from the recursive oscillator.
+
+    y[n] = 2 cos(omega) y[n-1] - y[n-2]
+
+    costs one multiply-add per sample instead of a cosine. Rounding errors
+    accumulate slowly with n (about n * 1e-16 relative in float64), so for
+    very long signals sinusoidal_sequence (direct cosines) is more accurate.
+
+    Parameters:
+    -----------
+    N : int
+        Number of samples
+    A : float
+        Amplitude
+    omega : float
+        Frequency in radians per sample
+    phi : float
+        Phase in radians (default: 0)
+    dtype : dtype, optional
+        Output dtype (default: get_default_dtype()); the recursion runs in
+        float64
+
+    Returns:
+    --------
+    x : ndarray
+        Sinusoidal sequence, equal to sinusoidal_sequence(range(N), A,
+        omega, phi) up to the accumulated rounding
+    """
+    c = 2 * np.cos(omega)
+    y1, y2 = A * np.cos(phi - omega), A * np.cos(phi - 2 * omega)
+    # State of lfilter(0, [1, -c, 1]) after the samples y[-2], y[-1]
+    zi = np.array([c * y1 - y2, -y1])
+    y, _ = _lfilter(np.zeros(3), np.array([1.0, -c, 1.0]), np.zeros(int(N)), zi)
+    return y.astype(precision.real_dtype(dtype), copy=False)
+
+
+@instrument
+def integrate(x, state):
+    """
+    Run x through cascaded integrators y_s[n] = y_s[n-1] + y_{s-1}[n].
+
+    This is the high-rate section of a CIC filter. Integer inputs wrap
+    around in int64 identically on both backends.
+
+    Parameters:
+    -----------
+    x : ndarray
+        Input, shape (..., N)
+    state : ndarray
+        Last output of every stage, shape (..., stages), same dtype as x;
+        updated in place
+
+    Returns:
+    --------
+    y : ndarray
+        Output of the last stage, shape (..., N)
+    """
+    if get_backend() == 'numpy':
+        y = x.astype(state.dtype, copy=False)
+        for s in range(state.shape[-1]):
+            y = np.cumsum(y, axis=-1)
+            y += state[..., s:s + 1]
+            if y.shape[-1]:
+                state[..., s] = y[..., -1]
+        return y
+    rows = _rows(state)
+    y = np.empty(x.shape, dtype=state.dtype)
+    _jit(_integrate_loop)(_rows(x.astype(state.dtype, copy=False)), rows,
+                          y.reshape(_row_shape(y)))
+    state[...] = rows.reshape(state.shape)
+    return y
+
+
+@instrument
+def lms(x, d, w, mu, history=None):
+    """
+    Least-mean-squares adaptive FIR filter.
+
+    y[n] = w^H u[n],  e[n] = d[n] - y[n],  w <- w + mu u[n] conj(e[n])
+
+    with the regressor u[n] = [x[n], x[n-1], ..., x[n-L+1]].
+
+    Parameters:
+    -----------
+    x : array-like
+        Input, shape (..., N)
+    d : array-like
+        Desired signal, same shape as x
+    w : array-like
+        Initial weights, shape (L,) or (..., L)
+    mu : float
+        Step size
+    history : array-like, optional
+        The L-1 inputs preceding x, shape (..., L-1), e.g. the tail of the
+        previous block (default: zeros)
+
+    Returns:
+    --------
+    y : ndarray
+        Filter output
+    e : ndarray
+        Error d - y
+    w : ndarray
+        Final weights, shape (..., L)
+
+    Examples:
+    ---------
+    >>> y, e, w = lms(x, d, np.zeros(32), mu=0.01)
+    """
+    x, d = np.asarray(x), np.asarray(d)
+    if x.shape != d.shape:
+        raise ValueError("x and d must have the same shape")
+    work = np.result_type(x, d, w, np.float64)
+    L = np.shape(w)[-1]
+    if L < 1:
+        raise ValueError("w must have at least one tap")
+    w = np.array(np.broadcast_to(w, x.shape[:-1] + (L,)), dtype=work)
+    if history is None:
+        history = np.zeros(x.shape[:-1] + (L - 1,), dtype=work)
+    ext = np.concatenate((np.broadcast_to(history, x.shape[:-1] + (L - 1,)), x),
+                         axis=-1).astype(work)
+
+    if get_backend() == 'numpy' or x.shape[-1] == 0:
+        y = np.empty(x.shape, dtype=work)
+        e = np.empty(x.shape, dtype=work)
+        if x.shape[-1] == 0:
+            return y, e, w
+        # u[n] for every sample, newest first: ext[..., n + L - 1 - i]
+        u = np.lib.stride_tricks.sliding_window_view(ext, L, axis=-1)[..., ::-1]
+        for n in range(x.shape[-1]):
+            y[..., n] = np.sum(np.conj(w) * u[..., n, :], axis=-1)
+            e[..., n] = d[..., n] - y[..., n]
+            w += mu * np.conj(e[..., n, None]) * u[..., n, :]
+        return y, e, w
+
+    rows = _rows(w)
+    y = np.empty(x.shape, dtype=work)
+    e = np.empty(x.shape, dtype=work)
+    _jit(_lms_loop)(_rows(ext), _rows(d.astype(work, copy=False)), rows,
+                    work.type(mu), y.reshape(_row_shape(y)), e.reshape(_row_shape(e)))
+    return y, e, rows.reshape(w.shape)
@@ -0,0 +1,864 @@
+"""
+DSP Benchmark Suite
+===================
+
+Offline benchmarks for the routines in utils/common_functions.py and the
+other utils modules.
+
+Every case is timed across signal sizes, dtypes and channel counts.
+Results are written as JSON so they can be stored as a baseline and
+compared on later runs; any case slower than the baseline by more than a
+threshold is reported as a regression (and the process exits with
+status 1).
+
+The import time of the utils package and the lesson modules is measured
+in fresh interpreters with ``--imports``. An import that loads matplotlib
+or SciPy as a side effect also fails the run. The float32 error bounds
+are tests (tests/test_precision.py).
+
+Usage (from the repository root):
+
+    python -m utils.benchmarks
+    python -m utils.benchmarks --sizes 1e3 1e5 1e7 --dtypes float64 float32
+    python -m utils.benchmarks --output results.json
+    python -m utils.benchmarks --baseline results.json --threshold 0.25
+    python -m utils.benchmarks --imports-only     # startup cost guard
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from . import backends
+from . import chirp_z
+from . import common_functions as cf
+from . import correlation
+from . import fast_convolution
+from . import filterbank
+from . import filters
+from . import spectral
+from .sparse_signals import RunLengthSignal, SparseSignal
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+FULL_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+DEFAULT_DTYPES = ('float64', 'float32')
+DEFAULT_CHANNELS = (1, 4)
+
+# A benchmark case.
+#   name      : unique case name (usually the function name)
+#   setup     : setup(size, dtype, channels, rng) -> zero-argument callable
+#   dtypes    : dtypes the case is meaningful for (None = all requested)
+#   footprint : approximate number of sample-sized buffers the case keeps
+#               alive, used to skip cases that would not fit in memory
+Case = namedtuple('Case', ['name', 'setup', 'dtypes', 'footprint'])
+
+
+def _channels(x, channels):
+    """Stack `channels` copies of x into a (channels, N) array."""
+    return np.broadcast_to(x, (channels,) + x.shape).copy()
+
+
+def _per_channel(func, rows, *args, **kwargs):
+    """Build a callable that applies func to every row of a 2-D array."""
+    def run():
+        for row in rows:
+            func(row, *args, **kwargs)
+    return run
+
+
+def _repeat(func, channels, *args, **kwargs):
+    """Build a callable that calls func once per channel."""
+    def run():
+        for _ in range(channels):
+            func(*args, **kwargs)
+    return run
+
+
+# ----------------------------------------------------------------------------
+# Case definitions
+# ----------------------------------------------------------------------------
+
+def _setup_unit_impulse(size, dtype, channels, rng):
+    n = np.arange(size)
+    return _repeat(cf.unit_impulse, channels, n, n0=[0, size // 2], dtype=dtype)
+
+
+def _setup_unit_impulse_range(size, dtype, channels, rng):
+    return _repeat(cf.unit_impulse, channels, range(size), n0=[0, size // 2], dtype=dtype)
+
+
+def _setup_unit_step(size, dtype, channels, rng):
+    n = np.arange(size)
+    return _repeat(cf.unit_step, channels, n, n0=size // 2, dtype=dtype)
+
+
+def _setup_unit_step_range(size, dtype, channels, rng):
+    return _repeat(cf.unit_step, channels, range(size), n0=size // 2, dtype=dtype)
+
+
+def _setup_rect_pulse(size, dtype, channels, rng):
+    n = np.arange(size)
+    return _repeat(cf.rect_pulse, channels, n, size // 4, size // 2, dtype=dtype)
+
+
+def _setup_rect_pulse_range(size, dtype, channels, rng):
+    return _repeat(cf.rect_pulse, channels, range(size), size // 4, size // 2, dtype=dtype)
+
+
+def _setup_exponential_sequence(size, dtype, channels, rng):
+    n = np.arange(size)
+    return _repeat(cf.exponential_sequence, channels, n, 0.999, n0=size // 8, dtype=dtype)
+
+
+def _setup_exponential_sequence_range(size, dtype, channels, rng):
+    return _repeat(cf.exponential_sequence, channels, range(size), 0.999,
+                   n0=size // 8, dtype=dtype)
+
+
+def _setup_exponential_sequence_log(size, dtype, channels, rng):
+    return _repeat(cf.exponential_sequence, channels, range(size), 0.999,
+                   n0=size // 8, dtype=dtype, method='log')
+
+
+def _setup_exponential_sequence_power(size, dtype, channels, rng):
+    return _repeat(cf.exponential_sequence, channels, range(size), 0.999,
+                   n0=size // 8, dtype=dtype, method='power')
+
+
+def _setup_exponential_bank(size, dtype, channels, rng):
+    # One damped complex mode per channel
+    a = 0.9999 * np.exp(1j * np.linspace(0.01, 3.0, channels))
+    return lambda: cf.exponential_bank(range(size), a, dtype=dtype)
+
+
+def _setup_complex_exponential(size, dtype, channels, rng):
+    n = np.arange(size)
+    return _repeat(cf.complex_exponential, channels, n, 2 * np.pi / 8, dtype=dtype)
+
+
+def _setup_sinusoidal_sequence(size, dtype, channels, rng):
+    n = np.arange(size)
+    return _repeat(cf.sinusoidal_sequence, channels, n, 1.0, 2 * np.pi / 8, dtype=dtype)
+
+
+def _setup_shift_signal(size, dtype, channels, rng):
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(cf.shift_signal, x, 3)
+
+
+def _setup_downsample(size, dtype, channels, rng):
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(cf.downsample, x, 4)
+
+
+def _setup_upsample(size, dtype, channels, rng):
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(cf.upsample, x, 4)
+
+
+def _setup_db(size, dtype, channels, rng):
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(cf.db, x)
+
+
+def _setup_normalize(size, dtype, channels, rng):
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(cf.normalize, x)
+
+
+def _setup_discrete_convolution(size, dtype, channels, rng):
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    h = rng.standard_normal(32).astype(dtype)
+    return _per_channel(cf.discrete_convolution, x, h)
+
+
+def _setup_discrete_convolution_impulses(size, dtype, channels, rng):
+    # Short pulse convolved with a sparse train of 16 events
+    x = _channels(rng.standard_normal(256).astype(dtype), channels)
+    train = SparseSignal.impulses(range(size), rng.integers(0, size, 16), dtype=dtype)
+    return _per_channel(cf.discrete_convolution, x, train)
+
+
+def _setup_discrete_convolution_rect(size, dtype, channels, rng):
+    # Signal convolved with a 1024-sample rect (moving sum)
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    rect = RunLengthSignal.rect(range(1024), 0, 1023, dtype=dtype)
+    return _per_channel(cf.discrete_convolution, x, rect)
+
+
+def _setup_discrete_convolution_boxcar(size, dtype, channels, rng):
+    # Dense 1024-tap boxcar kernel, detected and routed to running sums
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(cf.discrete_convolution, x, np.ones(1024, dtype=dtype))
+
+
+def _setup_np_convolve_boxcar(size, dtype, channels, rng):
+    # Reference: the same boxcar through np.convolve
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(np.convolve, x, np.ones(1024, dtype=dtype))
+
+
+def _setup_fft_convolve(size, dtype, channels, rng):
+    # 1024-tap kernel; the spectrum is cached in the Kernel after the first run
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    kernel = fast_convolution.Kernel(rng.standard_normal(1024).astype(dtype))
+    return lambda: fast_convolution.fft_convolve(x, kernel)
+
+
+def _setup_np_convolve_long(size, dtype, channels, rng):
+    # Reference: the same 1024-tap kernel through np.convolve
+    x = _channels(rng.standard_normal(size).astype(dtype), channels)
+    return _per_channel(np.convolve, x, rng.standard_normal(1024).astype(dtype))
+
+
+def _frames(size, dtype, channels, rng, frame=1024):
+    """(channels * size // frame, frame) array of independent frames."""
+    frames = max(1, channels * size // frame)
+    return rng.standard_normal((frames, frame)).astype(dtype)
+
+
+def _setup_circular_convolve_frames(size, dtype, channels, rng):
+    # Many 1024-sample frames filtered with the same cached kernel
+    x = _frames(size, dtype, channels, rng)
+    kernel = fast_convolution.Kernel(rng.standard_normal(1024).astype(dtype))
+    return lambda: fast_convolution.circular_convolve(x, kernel)
+
+
+def _setup_circular_convolve_frames_uncached(size, dtype, channels, rng):
+    # Same, transforming the kernel again for every frame
+    x = _frames(size, dtype, channels, rng)
+    h = rng.standard_normal(1024).astype(dtype)
+    return _per_channel(fast_convolution.circular_convolve, x, h)
+
+
+# 64-band, 2x oversampled channelizer with the default 8-taps-per-band prototype
+BANK_K, BANK_D = 64, 32
+
+
+def _setup_polyphase_analyzer(size, dtype, channels, rng):
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    bank = filterbank.PolyphaseAnalyzer(BANK_K, BANK_D)
+    return lambda: bank.process(x)
+
+
+def _fft_per_frame(x, h, K, D):
+    """Reference channelizer: one L-point FFT of every windowed frame."""
+    import scipy.fft
+    L = -(-len(h) // K) * K
+    h_rev = np.zeros(L)
+    h_rev[:len(h)] = h
+    h_rev = h_rev[::-1]
+    ext = np.concatenate((np.zeros(x.shape[:-1] + (L - 1,)), x), axis=-1)
+    frames = np.lib.stride_tricks.sliding_window_view(ext, L, axis=-1)[..., ::D, :]
+    # Bin p*P of the L-point transform is the centre of subband p
+    return scipy.fft.ifft((frames * h_rev)[..., ::-1], axis=-1)[..., ::L // K] * L
+
+
+def _setup_channelizer_fft_per_frame(size, dtype, channels, rng):
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    h = filterbank.prototype_filters(BANK_K, BANK_D)[0]
+    return lambda: _fft_per_frame(x, h, BANK_K, BANK_D)
+
+
+def _setup_polyphase_synthesizer(size, dtype, channels, rng):
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    y = filterbank.PolyphaseAnalyzer(BANK_K, BANK_D).process(x)
+    bank = filterbank.PolyphaseSynthesizer(BANK_K, BANK_D, real=True)
+    return lambda: bank.process(y)
+
+
+def _blocks(x, block=65536):
+    """Split a (channels, N) signal into streaming blocks along time."""
+    return [x[..., i:i + block] for i in range(0, x.shape[-1], block)]
+
+
+def _setup_running_autocorrelation(size, dtype, channels, rng):
+    blocks = _blocks(rng.standard_normal((channels, size)).astype(dtype))
+
+    def run():
+        acf = spectral.RunningAutocorrelation(64)
+        for block in blocks:
+            acf.process(block)
+    return run
+
+
+def _setup_welch_psd(size, dtype, channels, rng):
+    blocks = _blocks(rng.standard_normal((channels, size)).astype(dtype))
+
+    def run():
+        psd = spectral.WelchPSD(nperseg=1024)
+        for block in blocks:
+            psd.process(block)
+    return run
+
+
+def _setup_scipy_welch(size, dtype, channels, rng):
+    # Reference: scipy.signal.welch on the whole recording
+    from scipy.signal import welch
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    return lambda: welch(x, nperseg=1024, detrend=False)
+
+
+def _setup_welch_csd(size, dtype, channels, rng):
+    x = _blocks(rng.standard_normal((channels, size)).astype(dtype))
+    y = _blocks(rng.standard_normal((channels, size)).astype(dtype))
+
+    def run():
+        csd = spectral.WelchCSD(nperseg=1024)
+        for xb, yb in zip(x, y):
+            csd.process(xb, yb)
+    return run
+
+
+# Bank of 8 templates of 256 samples, e.g. preambles to search for
+MATCH_T, MATCH_M = 8, 256
+
+
+def _setup_matched_filter(size, dtype, channels, rng):
+    blocks = _blocks(rng.standard_normal((channels, size)).astype(dtype))
+    templates = rng.standard_normal((MATCH_T, MATCH_M)).astype(dtype)
+
+    def run():
+        mf = correlation.MatchedFilter(templates)
+        for block in blocks:
+            mf.process(block)
+    return run
+
+
+def _setup_matched_filter_top_k(size, dtype, channels, rng):
+    # Normalized correlation, keeping only the 4 best peaks per template
+    blocks = _blocks(rng.standard_normal((channels, size)).astype(dtype))
+    templates = rng.standard_normal((MATCH_T, MATCH_M)).astype(dtype)
+
+    def run():
+        mf = correlation.MatchedFilter(templates, normalize=True, top_k=4)
+        for block in blocks:
+            mf.update(block)
+        mf.peaks()
+    return run
+
+
+def _setup_np_correlate(size, dtype, channels, rng):
+    # Reference: np.correlate of every channel with every template
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    templates = rng.standard_normal((MATCH_T, MATCH_M)).astype(dtype)
+    return lambda: [np.correlate(row, t, mode='valid') for row in x for t in templates]
+
+
+# Zoom onto 1/64 of the band with 4096 bins: the resolution of a 512k-point FFT
+ZOOM_M, ZOOM_NFFT = 4096, 1 << 19
+ZOOM_BAND = (0.25, 0.25 + 2.0 * ZOOM_M / ZOOM_NFFT)   # fs = 2
+
+
+def _setup_zoom_fft(size, dtype, channels, rng):
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    return lambda: chirp_z.zoom_fft(x, ZOOM_BAND, m=ZOOM_M)
+
+
+def _setup_fft_zero_padded(size, dtype, channels, rng):
+    # Reference: the same bins picked from one zero-padded FFT
+    import scipy.fft
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    nfft = -(-size // ZOOM_NFFT) * ZOOM_NFFT
+    step = nfft // ZOOM_NFFT
+    first = round(ZOOM_BAND[0] / 2 * nfft)
+    return lambda: scipy.fft.rfft(x, nfft)[..., first:first + ZOOM_M * step:step]
+
+
+# 8th-order Butterworth lowpass as one IIR section
+IIR_ORDER = 8
+# The NumPy LMS loop runs at Python speed: longer signals are skipped
+LMS_TAPS, LMS_NUMPY_MAX = 32, 100_000
+
+
+def _on_backend(name, run):
+    """Run `run` on backend `name`, or None (skipped) if it is not installed."""
+    if name not in backends.available_backends():
+        return None
+
+    def timed():
+        with backends.backend(name):
+            return run()
+    return timed
+
+
+def _setup_lfilter(name):
+    def setup(size, dtype, channels, rng):
+        from scipy.signal import butter
+        b, a = butter(IIR_ORDER, 0.1)
+        x = rng.standard_normal((channels, size)).astype(dtype)
+        return _on_backend(name, lambda: backends.lfilter(b, a, x))
+    return setup
+
+
+def _setup_oscillator(name):
+    def setup(size, dtype, channels, rng):
+        return _on_backend(name, lambda: [backends.oscillator(size, 1.0, 0.01 * (c + 1),
+                                                              dtype=dtype)
+                                          for c in range(channels)])
+    return setup
+
+
+def _setup_lms(name):
+    def setup(size, dtype, channels, rng):
+        if name == 'numpy' and size > LMS_NUMPY_MAX:
+            return None
+        x = rng.standard_normal((channels, size)).astype(dtype)
+        d = fast_convolution.fft_convolve(x, rng.standard_normal(LMS_TAPS))[..., :size]
+        return _on_backend(name, lambda: backends.lms(x, d, np.zeros(LMS_TAPS), 0.005))
+    return setup
+
+
+def _setup_moving_average(size, dtype, channels, rng):
+    x = rng.standard_normal((channels, size)).astype(dtype)
+    ma = filters.MovingAverage(64)
+    return lambda: ma.process(x)
+
+
+def _setup_cic_decimator(size, dtype, channels, rng):
+    # 16-bit samples, exact integer integrator/comb path
+    x = rng.integers(-2**15, 2**15, (channels, size), dtype=np.int16)
+    cic = filters.CICDecimator(R=8, N=4)
+    return lambda: cic.process(x)
+
+
+def _setup_cic_interpolator(size, dtype, channels, rng):
+    x = rng.standard_normal((channels, size // 8)).astype(dtype)
+    cic = filters.CICInterpolator(R=8, N=4)
+    return lambda: cic.process(x)
+
+
+# Generators are timed both with an index array and with a range (the
+# contiguous fast path that builds no index array).
+CASES = [
+    Case('unit_impulse', _setup_unit_impulse, None, 3),
+    Case('unit_impulse:range', _setup_unit_impulse_range, None, 1),
+    Case('unit_step', _setup_unit_step, None, 3),
+    Case('unit_step:range', _setup_unit_step_range, None, 1),
+    Case('rect_pulse', _setup_rect_pulse, None, 4),
+    Case('rect_pulse:range', _setup_rect_pulse_range, None, 1),
+    Case('exponential_sequence', _setup_exponential_sequence, None, 6),
+    Case('exponential_sequence:range', _setup_exponential_sequence_range, None, 1),
+    Case('exponential_sequence:log', _setup_exponential_sequence_log, None, 3),
+    Case('exponential_sequence:power', _setup_exponential_sequence_power, None, 2),
+    Case('exponential_bank', _setup_exponential_bank, None, 2),
+    Case('complex_exponential', _setup_complex_exponential, None, 6),
+    Case('sinusoidal_sequence', _setup_sinusoidal_sequence, None, 4),
+    Case('shift_signal', _setup_shift_signal, None, 3),
+    Case('downsample', _setup_downsample, None, 2),
+    Case('upsample', _setup_upsample, None, 6),
+    Case('db', _setup_db, None, 4),
+    Case('normalize', _setup_normalize, None, 4),
+    Case('discrete_convolution', _setup_discrete_convolution, None, 4),
+    Case('discrete_convolution:impulses', _setup_discrete_convolution_impulses, None, 2),
+    Case('discrete_convolution:rect', _setup_discrete_convolution_rect, None, 8),
+    Case('discrete_convolution:boxcar', _setup_discrete_convolution_boxcar, None, 8),
+    Case('np.convolve:boxcar', _setup_np_convolve_boxcar, None, 4),
+    Case('fft_convolve', _setup_fft_convolve, None, 8),
+    Case('np.convolve:long', _setup_np_convolve_long, None, 3),
+    Case('circular_convolve:frames', _setup_circular_convolve_frames, None, 6),
+    Case('circular_convolve:uncached',
+         _setup_circular_convolve_frames_uncached, None, 4),
+    Case('polyphase_analyzer', _setup_polyphase_analyzer, None, 12),
+    Case('channelizer:fft-per-frame', _setup_channelizer_fft_per_frame, None, 80),
+    Case('polyphase_synthesizer', _setup_polyphase_synthesizer, None, 16),
+    Case('running_autocorrelation', _setup_running_autocorrelation, None, 2),
+    Case('welch_psd', _setup_welch_psd, None, 2),
+    Case('scipy.signal.welch', _setup_scipy_welch, None, 6),
+    Case('welch_csd', _setup_welch_csd, None, 3),
+    Case('matched_filter', _setup_matched_filter, None, 24),
+    Case('matched_filter:top_k', _setup_matched_filter_top_k, None, 8),
+    Case('np.correlate', _setup_np_correlate, None, 10),
+    Case('zoom_fft', _setup_zoom_fft, None, 8),
+    Case('fft:zero-padded', _setup_fft_zero_padded, None, 8),
+    Case('lfilter:numpy', _setup_lfilter('numpy'), None, 4),
+    Case('lfilter:numba', _setup_lfilter('numba'), None, 4),
+    Case('oscillator:numpy', _setup_oscillator('numpy'), None, 3),
+    Case('oscillator:numba', _setup_oscillator('numba'), None, 3),
+    Case('lms:numpy', _setup_lms('numpy'), None, 8),
+    Case('lms:numba', _setup_lms('numba'), None, 8),
+    Case('moving_average', _setup_moving_average, None, 6),
+    Case('cic_decimator', _setup_cic_decimator, ('float64',), 8),
+    Case('cic_decimator:numpy',
+         lambda *args: _on_backend('numpy', _setup_cic_decimator(*args)), ('float64',), 8),
+    Case('cic_interpolator', _setup_cic_interpolator, None, 8),
+]
+
+
+# ----------------------------------------------------------------------------
+# Timing
+# ----------------------------------------------------------------------------
+
+def time_callable(func, min_time=0.2, repeat=5):
+    """
+    Time a zero-argument callable.
+
+    The number of calls per measurement is chosen so that one measurement
+    takes at least `min_time` seconds; the best of `repeat` measurements is
+    returned as seconds per call.
+
+    Parameters:
+    -----------
+    func : callable
+        Function to time (called with no arguments)
+    min_time : float
+        Minimum duration of one measurement in seconds (default: 0.2)
+    repeat : int
+        Number of measurements (default: 5)
+
+    Returns:
+    --------
+    seconds : float
+        Best time per call in seconds
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    number = max(1, int(min_time / elapsed)) if elapsed > 0 else 1000
+    if elapsed >= min_time:
+        # Slow case: the warm-up call already is a measurement
+        repeat = max(1, min(repeat, int(5 * min_time / elapsed)))
+
+    best = elapsed
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_benchmarks(cases=None, sizes=DEFAULT_SIZES, dtypes=DEFAULT_DTYPES,
+                   channels=DEFAULT_CHANNELS, min_time=0.2, repeat=5,
+                   max_bytes=2 * 1024**3, seed=0, verbose=True):
+    """
+    Run benchmark cases over every (size, dtype, channels) combination.
+
+    Parameters:
+    -----------
+    cases : list of Case, optional
+        Cases to run (default: all of CASES)
+    sizes : sequence of int
+        Signal lengths in samples
+    dtypes : sequence of str
+        Sample dtypes (e.g. 'float64', 'float32')
+    channels : sequence of int
+        Channel counts
+    min_time : float
+        Minimum duration of one timing measurement in seconds
+    repeat : int
+        Number of timing measurements per case
+    max_bytes : int
+        Cases whose estimated memory footprint exceeds this are skipped
+    seed : int
+        Seed for the random test signals
+    verbose : bool
+        Print progress to stdout
+
+    Returns:
+    --------
+    results : list of dict
+        One record per combination with keys name, size, dtype, channels,
+        seconds, samples_per_second (or skipped)
+    """
+    cases = CASES if cases is None else cases
+    rng = np.random.default_rng(seed)
+    results = []
+
+    for case in cases:
+        case_dtypes = [d for d in dtypes if case.dtypes is None or d in case.dtypes]
+        if not case_dtypes:
+            case_dtypes = list(case.dtypes)[:1]
+        for dtype in case_dtypes:
+            for size in sizes:
+                for nch in channels:
+                    record = {'name': case.name, 'size': int(size),
+                              'dtype': dtype, 'channels': int(nch)}
+                    itemsize = np.dtype(dtype).itemsize
+                    footprint = case.footprint * itemsize * size * nch
+                    func = None
+                    if footprint > max_bytes:
+                        record['skipped'] = 'estimated %d bytes exceeds limit' % footprint
+                    else:
+                        func = case.setup(int(size), dtype, int(nch), rng)
+                        if func is None:
+                            record['skipped'] = 'not available for this case'
+                    if func is not None:
+                        seconds = time_callable(func, min_time=min_time, repeat=repeat)
+                        del func
+                        record['seconds'] = seconds
+                        record['samples_per_second'] = size * nch / seconds
+                    results.append(record)
+                    if verbose:
+                        _print_record(record)
+    return results
+
+
+def _print_record(record):
+    label = '%-28s n=%-10d %-8s ch=%-3d' % (
+        record['name'], record['size'], record['dtype'], record['channels'])
+    if 'skipped' in record:
+        print(f"{label} skipped ({record['skipped']})")
+    else:
+        print(f"{label} {record['seconds'] * 1e3:10.4f} ms "
+              f"{record['samples_per_second'] / 1e6:10.2f} Msamples/s")
+
+
+# ----------------------------------------------------------------------------
+# Import time
+# ----------------------------------------------------------------------------
+
+# Modules whose startup cost is guarded. Importing them must stay cheap:
+# none of the HEAVY_MODULES may be loaded as a side effect.
+IMPORT_MODULES = (
+    'utils',
+    'utils.backends',
+    'utils.chirp_z',
+    'utils.common_functions',
+    'utils.correlation',
+    'utils.fast_convolution',
+    'utils.filterbank',
+    'utils.filters',
+    'utils.instrumentation',
+    'utils.plotting',
+    'utils.precision',
+    'utils.sparse_signals',
+    'utils.spectral',
+    'utils.sweep',
+    'lessons.lesson_01.examples.signal_types',
+    'lessons.lesson_01.examples.signal_operations',
+    'lessons.lesson_01.examples.complex_exponentials',
+    'lessons.lesson_03.examples.convolution_basics',
+)
+HEAVY_MODULES = ('matplotlib', 'scipy')
+
+_IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(elapsed, ','.join(heavy))
+"""
+
+
+def measure_import_time(module, repeat=5):
+    """
+    Measure the cost of importing a module in a fresh interpreter.
+
+    Parameters:
+    -----------
+    module : str
+        Dotted module name, importable from the repository root
+    repeat : int
+        Number of fresh interpreters to start (default: 5)
+
+    Returns:
+    --------
+    seconds : float
+        Best import time in seconds
+    heavy : list of str
+        HEAVY_MODULES that were loaded as a side effect of the import
+    """
+    script = _IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    best, heavy = float('inf'), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', script], cwd=REPO_ROOT,
+                             check=True, capture_output=True, text=True).stdout
+        seconds, loaded = out.split()[0], out.split()[1:]
+        best = min(best, float(seconds))
+        heavy = loaded[0].split(',') if loaded else []
+    return best, heavy
+
+
+def run_import_benchmarks(modules=IMPORT_MODULES, repeat=5, verbose=True):
+    """
+    Measure the import time of every guarded module.
+
+    Returns:
+    --------
+    results : list of dict
+        Records named 'import:<module>' in the same format as
+        run_benchmarks, plus the list of heavy modules that were loaded
+    """
+    results = []
+    for module in modules:
+        seconds, heavy = measure_import_time(module, repeat=repeat)
+        record = {'name': 'import:' + module, 'size': 0, 'dtype': '-',
+                  'channels': 1, 'seconds': seconds, 'samples_per_second': 0.0,
+                  'heavy_modules': heavy}
+        results.append(record)
+        if verbose:
+            note = f"  loads {', '.join(heavy)}" if heavy else ''
+            print(f"{record['name']:<58} {seconds * 1e3:10.2f} ms{note}")
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Baseline comparison
+# ----------------------------------------------------------------------------
+
+def _key(record):
+    return (record['name'], record['size'], record['dtype'], record['channels'])
+
+
+def environment():
+    """Describe the machine and library versions the benchmark ran on."""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+
+def save_results(results, path):
+    """Write benchmark results (with environment metadata) to a JSON file."""
+    report = {'environment': environment(), 'results': results}
+    Path(path).write_text(json.dumps(report, indent=2) + '\n')
+
+
+def load_results(path):
+    """Read benchmark results written by save_results."""
+    return json.loads(Path(path).read_text())['results']
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    Compare benchmark results against a baseline.
+
+    Parameters:
+    -----------
+    results : list of dict
+        Current results from run_benchmarks
+    baseline : list of dict
+        Baseline results (e.g. from load_results)
+    threshold : float
+        Allowed relative slowdown before a case counts as a regression
+        (default: 0.2, i.e. 20% slower)
+
+    Returns:
+    --------
+    comparison : list of dict
+        One record per case present in both runs, with the baseline and
+        current time, their ratio and a `regression` flag
+    """
+    reference = {_key(r): r for r in baseline if 'seconds' in r}
+    comparison = []
+    for record in results:
+        base = reference.get(_key(record))
+        if base is None or 'seconds' not in record:
+            continue
+        ratio = record['seconds'] / base['seconds']
+        comparison.append({
+            'name': record['name'], 'size': record['size'],
+            'dtype': record['dtype'], 'channels': record['channels'],
+            'baseline_seconds': base['seconds'], 'seconds': record['seconds'],
+            'ratio': ratio, 'regression': ratio > 1 + threshold,
+        })
+    return comparison
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', metavar='NAME',
+                        help='cases to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=float, metavar='N',
+                        help='signal lengths, e.g. 1e3 1e6 (default: 1e3..1e6)')
+    parser.add_argument('--full', action='store_true',
+                        help='run the full size range 1e3..1e8')
+    parser.add_argument('--dtypes', nargs='+', default=list(DEFAULT_DTYPES))
+    parser.add_argument('--channels', nargs='+', type=int, default=list(DEFAULT_CHANNELS))
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum seconds per timing measurement')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-bytes', type=float, default=2 * 1024**3,
+                        help='skip cases with a larger estimated footprint')
+    parser.add_argument('--output', metavar='PATH', help='write results as JSON')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='compare against results stored in PATH')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown flagged as a regression')
+    parser.add_argument('--imports', action='store_true',
+                        help='also measure module import times')
+    parser.add_argument('--imports-only', action='store_true',
+                        help='only measure module import times')
+    parser.add_argument('--list', action='store_true', help='list cases and exit')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit status."""
+    args = _parse_args(argv)
+
+    if args.list:
+        for case in CASES:
+            print(case.name)
+        return 0
+
+    cases = CASES
+    if args.cases:
+        unknown = set(args.cases) - {c.name for c in CASES}
+        if unknown:
+            print(f"Unknown case(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+        cases = [c for c in CASES if c.name in args.cases]
+
+    if args.sizes:
+        sizes = [int(s) for s in args.sizes]
+    else:
+        sizes = FULL_SIZES if args.full else DEFAULT_SIZES
+
+    results = []
+    if not args.imports_only:
+        results += run_benchmarks(cases, sizes=sizes, dtypes=args.dtypes,
+                                  channels=args.channels, min_time=args.min_time,
+                                  repeat=args.repeat, max_bytes=args.max_bytes)
+
+    status = 0
+    if args.imports or args.imports_only:
+        imports = run_import_benchmarks(repeat=args.repeat)
+        results += imports
+        for record in imports:
+            if record['heavy_modules']:
+                print(f"STARTUP {record['name']} imports "
+                      f"{', '.join(record['heavy_modules'])} at module load")
+                status = 1
+
+    if args.output:
+        save_results(results, args.output)
+        print(f"\nResults saved as '{args.output}'")
+
+    if args.baseline:
+        comparison = compare(results, load_results(args.baseline), args.threshold)
+        regressions = [c for c in comparison if c['regression']]
+        print(f"\nCompared {len(comparison)} case(s) against '{args.baseline}'")
+        for c in regressions:
+            print('REGRESSION %-28s n=%-10d %-8s ch=%-3d %.2fx slower' % (
+                c['name'], c['size'], c['dtype'], c['channels'], c['ratio']))
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
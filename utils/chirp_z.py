@@ -0,0 +1,268 @@
+"""
+Chirp-z Transform and Zoom FFT
+==============================
+
+Spectrum samples on an arbitrary arc or band, without a huge FFT
+(Lesson 12).
+
+The chirp-z transform (CZT) evaluates the z-transform of an N-sample
+signal at M points z_k = A W^-k:
+
+    X[k] = sum_n x[n] A^-n W^(nk),   k = 0, ..., M-1
+
+With nk = (n^2 + k^2 - (k - n)^2) / 2 this becomes a convolution with the
+chirp W^(-m^2/2) (Bluestein's algorithm), computed with FFTs of size
+>= N + M - 1 whatever the spacing of the points.
+
+The zoom FFT is the CZT on the unit circle: M bins spread over a band
+[f1, f2). Resolving a narrow band finely with a plain FFT means zero
+padding the signal to fs / resolution samples; the zoom FFT costs about
+three FFTs of N + M - 1 samples instead, which is much cheaper as long as
+the signal is shorter than the zero-padded FFT would be.
+
+The chirps are generated with complex_exponential, and everything that
+depends only on (N, M, band) -- the chirps and the spectrum of the
+convolution kernel -- is kept in a CZTPlan. Plans are cached, so
+analysing many frames or channels of the same size repeats only the
+signal's FFTs:
+
+    >>> X = zoom_fft(x, [990, 1010], m=2048, fs=48000)   # x: (channels, N)
+    >>> f = zoom_frequencies([990, 1010], m=2048, fs=48000)
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import functools
+
+import numpy as np
+
+from . import precision
+from .common_functions import complex_exponential
+from .fast_convolution import Kernel, circular_convolve
+from .instrumentation import instrument
+
+
+# Number of (N, M, band) plans kept by get_plan
+PLAN_CACHE_SIZE = 32
+
+
+def _scipy_fft():
+    """Import scipy.fft on first use (importing utils stays cheap)."""
+    import scipy.fft
+    return scipy.fft
+
+
+def _angle(z):
+    """omega with z = e^(-j omega); real when z is on the unit circle."""
+    if abs(abs(z) - 1) < 1e-12:
+        # A rounding-sized |z| - 1 would grow like k^2 in the chirp
+        return -np.angle(z)
+    return 1j * np.log(z)
+
+
+class CZTPlan:
+    """
+    Precomputed chirps and kernel spectrum for an N-point input, M-point CZT.
+
+    Parameters:
+    -----------
+    n : int
+        Input length N
+    m : int
+        Number of output points M
+    w : complex
+        Ratio between consecutive points, z_k = a w^-k
+    a : complex
+        Starting point z_0
+
+    Examples:
+    ---------
+    >>> plan = get_plan(1024, 256, np.exp(-2j * np.pi / 4096), 1.0)
+    >>> X = plan(frames)       # frames: (..., 1024)
+    """
+
+    def __init__(self, n, m, w, a):
+        if n < 1 or m < 1:
+            raise ValueError("n and m must be at least 1")
+        if w == 0 or a == 0:
+            raise ValueError("w and a must be non-zero")
+        self.n, self.m = int(n), int(m)
+        self.w, self.a = complex(w), complex(a)
+        self.nfft = _scipy_fft().next_fast_len(self.n + self.m - 1)
+
+        # Powers as exponentials: w = e^(-j omega), a = e^(j theta), with
+        # complex omega, theta when the points leave the unit circle
+        omega, theta = _angle(self.w), -_angle(self.a)
+        k = np.arange(max(self.n, self.m), dtype=float)
+        chirp = complex_exponential(k * k / 2, -omega, dtype=np.float64)  # w^(k^2/2)
+        self._pre = complex_exponential(k[:self.n], -theta, dtype=np.float64) * chirp[:self.n]
+        self._post = chirp[:self.m].copy()
+
+        # w^(-i^2/2) for i = -(N-1) .. M-1, arranged for a circular convolution
+        v = np.zeros(self.nfft, dtype=complex)
+        v[:self.m] = 1 / chirp[:self.m]
+        v[self.nfft - self.n + 1:] = 1 / chirp[1:self.n][::-1]
+        self._chirp = v
+        self._tables = {}  # complex dtype -> (pre, kernel, post)
+
+    def __repr__(self):
+        return f"CZTPlan(n={self.n}, m={self.m}, w={self.w}, a={self.a})"
+
+    def points(self):
+        """The M points z_k = a w^-k where the z-transform is evaluated."""
+        return self.a * self.w ** -np.arange(self.m)
+
+    def tables(self, dtype=np.complex128):
+        """(pre, kernel, post) in the given complex precision, built on first use."""
+        dtype = np.dtype(dtype)
+        tables = self._tables.get(dtype)
+        if tables is None:
+            tables = (self._pre.astype(dtype), Kernel(self._chirp.astype(dtype), cache_size=1),
+                      self._post.astype(dtype))
+            self._tables[dtype] = tables
+        return tables
+
+    def __call__(self, x, workers=None):
+        """
+        Transform x along its last axis.
+
+        Parameters:
+        -----------
+        x : array-like
+            Input, shape (..., N); leading dimensions are transformed in
+            one batch
+        workers : int, optional
+            Number of threads for scipy.fft (default: 1)
+
+        Returns:
+        --------
+        X : ndarray
+            Complex transform, shape (..., M) (complex64 for single
+            precision inputs)
+        """
+        x = np.asarray(x)
+        if x.shape[-1] != self.n:
+            raise ValueError(f"expected {self.n} samples along the last axis")
+        # complex64 tables for single precision inputs
+        pre, kernel, post = self.tables(
+            precision.complex_dtype(np.finfo(precision.result_dtype(x)).dtype))
+        y = circular_convolve(x * pre, kernel, n=self.nfft, workers=workers)
+        return y[..., :self.m] * post
+
+
+@functools.lru_cache(maxsize=PLAN_CACHE_SIZE)
+def get_plan(n, m, w, a):
+    """Return the (cached) CZTPlan for these sizes and points."""
+    return CZTPlan(n, m, w, a)
+
+
+def _band(fn, m, fs, endpoint):
+    """Start f1 and bin spacing of an m-point zoom over fn = f2 or [f1, f2]."""
+    f1, f2 = (0.0, fn) if np.ndim(fn) == 0 else fn
+    if m < 1:
+        raise ValueError("m must be at least 1")
+    step = (f2 - f1) / max(1, m - 1 if endpoint else m)
+    return float(f1), float(step), float(fs)
+
+
+def zoom_frequencies(fn, m, fs=2.0, endpoint=False):
+    """
+    Frequencies of the zoom_fft bins.
+
+    Parameters:
+    -----------
+    fn, m, fs, endpoint :
+        As for zoom_fft
+
+    Returns:
+    --------
+    f : ndarray
+        m frequencies from f1, spaced (f2 - f1) / m (or / (m - 1) with
+        endpoint=True)
+    """
+    f1, step, _ = _band(fn, m, fs, endpoint)
+    return f1 + step * np.arange(m)
+
+
+@instrument
+def czt(x, m=None, w=None, a=1.0, axis=-1, workers=None):
+    """
+    Chirp-z transform along one axis.
+
+    X[k] = sum_n x[n] a^-n w^(nk),  k = 0, ..., m-1
+
+    Parameters:
+    -----------
+    x : array-like
+        Input signal(s)
+    m : int, optional
+        Number of output points (default: the input length)
+    w : complex, optional
+        Ratio between points (default: e^(-j 2 pi / m), which gives the
+        m-point DFT)
+    a : complex
+        Starting point (default: 1)
+    axis : int
+        Axis to transform (default: -1)
+    workers : int, optional
+        Number of threads for scipy.fft (default: 1)
+
+    Returns:
+    --------
+    X : ndarray
+        Transform, with the length of `axis` replaced by m
+
+    Examples:
+    ---------
+    >>> X = czt(x)                                 # == np.fft.fft(x)
+    >>> X = czt(x, m=64, w=0.995 * np.exp(-0.01j)) # a spiral inside |z| = 1
+    """
+    x = np.moveaxis(np.asarray(x), axis, -1)
+    m = x.shape[-1] if m is None else int(m)
+    w = np.exp(-2j * np.pi / m) if w is None else w
+    X = get_plan(x.shape[-1], m, complex(w), complex(a))(x, workers=workers)
+    return np.moveaxis(X, -1, axis)
+
+
+@instrument
+def zoom_fft(x, fn, m=None, fs=2.0, endpoint=False, axis=-1, workers=None):
+    """
+    DFT of x on m bins spread over the band fn only.
+
+    Equivalent to sampling the spectrum of a zero-padded FFT with bin
+    spacing (f2 - f1) / m, at the cost of one FFT of about N + m samples.
+
+    Parameters:
+    -----------
+    x : array-like
+        Input signal(s)
+    fn : float or (float, float)
+        Band [f1, f2), or f2 for the band [0, f2)
+    m : int, optional
+        Number of bins (default: the input length)
+    fs : float
+        Sampling frequency (default: 2, so frequencies are in units of pi
+        rad/sample)
+    endpoint : bool
+        Include f2 as the last bin (default: False)
+    axis : int
+        Axis to transform (default: -1)
+    workers : int, optional
+        Number of threads for scipy.fft (default: 1)
+
+    Returns:
+    --------
+    X : ndarray
+        Spectrum at zoom_frequencies(fn, m, fs, endpoint)
+
+    Examples:
+    ---------
+    >>> X = zoom_fft(x, [990, 1010], m=2048, fs=48000)   # 0.01 Hz bins
+    """
+    x = np.asarray(x)
+    m = x.shape[axis] if m is None else int(m)
+    f1, step, fs = _band(fn, m, fs, endpoint)
+    w = np.exp(-2j * np.pi * step / fs)
+    a = np.exp(2j * np.pi * f1 / fs)
+    return czt(x, m, w, a, axis=axis, workers=workers)
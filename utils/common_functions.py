@@ -3,6 +3,18 @@ Common DSP Utility Functions
 =============================
 
 This module contains utility functions used across multiple DSP lessons.
+It is the single implementation of the signal generators used by the
+lesson examples. Every generator takes an explicit `dtype` (e.g. float32
+or complex64), and the index-based ones accept a `range` so contiguous
+time axes are filled without building an index array. Without a dtype
+the library default of utils/precision.py is used (float64 unless
+changed), and the processing functions keep float32 / complex64 inputs in
+single precision.
+
+Every function is instrumented (see utils/instrumentation.py): wrap calls in
+``profiling()`` to collect timing and throughput statistics.
+
+Run the basic checks with ``python -m utils.common_functions``.
 
 Author: DSP-in-Python Repository
 License: MIT
@@ -10,17 +22,51 @@ License: MIT
 
 import numpy as np
 
+from . import precision
+from .instrumentation import instrument
+from .sparse_signals import RunLengthSignal, SparseSignal
+
+
+def _contiguous_range(n, check_arrays=False):
+    """
+    Return (start, length) if n is a step-1 range, else None.
+
+    With check_arrays=True, 1-D integer arrays holding consecutive indices
+    are recognised too (at the cost of one pass over the array).
+    """
+    if isinstance(n, range) and n.step == 1:
+        return n.start, len(n)
+    if (check_arrays and isinstance(n, np.ndarray) and n.ndim == 1 and n.size > 1
+            and n.dtype.kind in 'iu' and n[-1] - n[0] == n.size - 1
+            and np.all(np.diff(n) == 1)):
+        return int(n[0]), n.size
+    return None
+
+
+def _real_dtype(dtype):
+    """Output dtype for a real-valued signal (default: the library default)."""
+    return precision.real_dtype(dtype)
+
 
-def unit_impulse(n, n0=0):
+def _complex_dtype(dtype):
+    """Complex dtype with the precision of dtype (float32 -> complex64)."""
+    return precision.complex_dtype(dtype)
+
+
+@instrument
+def unit_impulse(n, n0=0, dtype=None):
     """
     Generate a unit impulse (delta function).
     
     Parameters:
     -----------
-    n : array-like
-        Time indices
+    n : array-like or range
+        Time indices. A step-1 range is handled without building an
+        index array.
     n0 : int or array-like
         Position(s) of the impulse(s) (default: 0)
+    dtype : dtype, optional
+        Output dtype, e.g. np.float32 (default: get_default_dtype())
     
     Returns:
     --------
@@ -32,29 +78,42 @@ def unit_impulse(n, n0=0):
     >>> n = np.arange(-5, 6)
     >>> delta = unit_impulse(n, n0=0)
     >>> delta = unit_impulse(n, n0=[0, 3])  # Multiple impulses
+    >>> delta = unit_impulse(range(-5, 6), dtype=np.float32)
     """
-    n = np.asarray(n)
-    delta = np.zeros_like(n, dtype=float)
-    
     if np.isscalar(n0):
         n0 = [n0]
     
+    span = _contiguous_range(n)
+    if span is not None:
+        start, length = span
+        delta = np.zeros(length, dtype=_real_dtype(dtype))
+        for pos in n0:
+            if start <= pos < start + length:
+                delta[pos - start] = 1
+        return delta
+    
+    n = np.asarray(n)
+    delta = np.zeros(n.shape, dtype=_real_dtype(dtype))
     for pos in n0:
-        delta[n == pos] = 1.0
+        delta[n == pos] = 1
     
     return delta
 
 
-def unit_step(n, n0=0):
+@instrument
+def unit_step(n, n0=0, dtype=None):
     """
     Generate a unit step function.
     
     Parameters:
     -----------
-    n : array-like
-        Time indices
+    n : array-like or range
+        Time indices. A step-1 range is handled without building an
+        index array.
     n0 : int
         Starting position of the step (default: 0)
+    dtype : dtype, optional
+        Output dtype, e.g. np.float32 (default: get_default_dtype())
     
     Returns:
     --------
@@ -66,21 +125,31 @@ def unit_step(n, n0=0):
     >>> n = np.arange(-5, 6)
     >>> u = unit_step(n, n0=0)
     """
-    return np.where(n >= n0, 1.0, 0.0)
+    span = _contiguous_range(n)
+    if span is not None:
+        start, length = span
+        u = np.zeros(length, dtype=_real_dtype(dtype))
+        u[max(0, n0 - start):] = 1
+        return u
+    return (np.asarray(n) >= n0).astype(_real_dtype(dtype))
 
 
-def rect_pulse(n, n1, n2):
+@instrument
+def rect_pulse(n, n1, n2, dtype=None):
     """
     Generate a rectangular pulse between n1 and n2 (inclusive).
     
     Parameters:
     -----------
-    n : array-like
-        Time indices
+    n : array-like or range
+        Time indices. A step-1 range is handled without building an
+        index array.
     n1 : int
         Start of pulse
     n2 : int
         End of pulse
+    dtype : dtype, optional
+        Output dtype, e.g. np.float32 (default: get_default_dtype())
     
     Returns:
     --------
@@ -92,21 +161,96 @@ def rect_pulse(n, n1, n2):
     >>> n = np.arange(-5, 6)
     >>> x = rect_pulse(n, -2, 2)
     """
-    return np.where((n >= n1) & (n <= n2), 1.0, 0.0)
+    span = _contiguous_range(n)
+    if span is not None:
+        start, length = span
+        x = np.zeros(length, dtype=_real_dtype(dtype))
+        x[max(0, n1 - start):max(0, n2 - start + 1)] = 1
+        return x
+    n = np.asarray(n)
+    return ((n >= n1) & (n <= n2)).astype(_real_dtype(dtype))
+
 
+def _power_series(a, e0, out, method='chunked', chunk=None):
+    """
+    Fill out[..., k] = a**(e0 + k) for every base in `a`.
 
-def exponential_sequence(n, a, n0=0):
+    Parameters:
+    -----------
+    a : scalar or ndarray
+        Base(s); out has shape a.shape + (length,)
+    e0 : int
+        Exponent of the first sample
+    out : ndarray
+        Output array (its dtype sets the output precision)
+    method : str
+        'power'   - evaluate pow for every sample (reference)
+        'log'     - log-domain exp(k*log(a)); the sign of negative real
+                    bases is applied separately
+        'chunked' - a**k for one chunk of C samples, rescaled for every
+                    chunk by an exactly evaluated a**(e0 + j*C). Costs one
+                    multiply per sample and the error does not grow along
+                    the sequence.
+    chunk : int, optional
+        Chunk length for method='chunked' (default: about sqrt(length))
+    """
+    a = np.asarray(a)[..., None]
+    length = out.shape[-1]
+    if length == 0:
+        return out
+    
+    if method == 'power':
+        out[...] = a ** np.arange(e0, e0 + length)
+    elif method == 'log':
+        k = np.arange(e0, e0 + length)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if np.iscomplexobj(a):
+                out[...] = np.exp(k * np.log(a))
+            else:
+                out[...] = np.exp(k * np.log(np.abs(a)))
+                out[...] *= np.where((a < 0) & (k % 2 == 1), -1, 1)
+        out[..., k == 0] = 1  # a**0 == 1, also for a == 0
+    elif method == 'chunked':
+        C = chunk or max(64, int(np.sqrt(length)))
+        C = min(C, length)
+        B = -(-length // C)  # number of chunks
+        head = (a ** np.arange(C)).astype(out.dtype)
+        scale = (a ** (e0 + C * np.arange(B))).astype(out.dtype)
+        full = length // C
+        # Splitting the last axis of out into (chunk, offset) gives a view
+        blocks = out[..., :full * C].reshape(out.shape[:-1] + (full, C))
+        np.multiply(scale[..., :full, None], head[..., None, :], out=blocks)
+        if full < B:
+            rest = length - full * C
+            out[..., full * C:] = scale[..., full:] * head[..., :rest]
+    else:
+        raise ValueError(f"unknown method {method!r}; "
+                         "use 'chunked', 'log' or 'power'")
+    return out
+
+
+@instrument
+def exponential_sequence(n, a, n0=0, dtype=None, method='chunked'):
     """
     Generate an exponential sequence: x[n] = a^(n-n0) for n >= n0
     
     Parameters:
     -----------
-    n : array-like
-        Time indices
+    n : array-like or range
+        Time indices. For a step-1 range (or an array of consecutive
+        integers) no mask is built and `method` selects the fast path.
     a : float or complex
         Base of the exponential
     n0 : int
         Starting position (default: 0)
+    dtype : dtype, optional
+        Output precision, e.g. np.float32; complex bases give the matching
+        complex dtype (default: get_default_dtype() or its complex type)
+    method : str
+        How contiguous ranges are evaluated (default: 'chunked'):
+        'chunked' rescales one exactly computed chunk (fastest, error does
+        not grow with n), 'log' uses exp((n-n0)*log(a)), 'power' evaluates
+        a**(n-n0) for every sample
     
     Returns:
     --------
@@ -117,15 +261,79 @@ def exponential_sequence(n, a, n0=0):
     ---------
     >>> n = np.arange(0, 10)
     >>> x = exponential_sequence(n, 0.8)
+    >>> x = exponential_sequence(range(10**6), 0.9999 * np.exp(0.01j))
     """
+    dtype = _complex_dtype(dtype) if np.iscomplexobj(a) else _real_dtype(dtype)
+    
+    span = _contiguous_range(n, check_arrays=True)
+    if span is not None:
+        start, length = span
+        x = np.zeros(length, dtype=dtype)
+        k0 = min(max(0, n0 - start), length)
+        _power_series(a, start + k0 - n0, x[k0:], method=method)
+        return x
+    
     n = np.asarray(n)
-    x = np.zeros_like(n, dtype=complex if np.iscomplexobj(a) else float)
+    x = np.zeros(n.shape, dtype=dtype)
     mask = n >= n0
     x[mask] = a ** (n[mask] - n0)
     return x
 
 
-def complex_exponential(n, omega, phi=0):
+@instrument
+def exponential_bank(n, a, n0=0, dtype=None, method='chunked'):
+    """
+    Generate many exponential sequences at once: x[i, n] = a[i]^(n-n0) u[n-n0]
+    
+    Useful for modal synthesis, where every mode is a damped complex
+    exponential a[i] = r[i]*e^(j*omega[i]).
+    
+    Parameters:
+    -----------
+    n : array-like or range
+        Time indices
+    a : array-like
+        Bases, one per output row (real or complex)
+    n0 : int
+        Starting position (default: 0)
+    dtype : dtype, optional
+        Output precision (default: get_default_dtype() or its complex type)
+    method : str
+        Evaluation method for contiguous ranges, see exponential_sequence
+        (default: 'chunked')
+    
+    Returns:
+    --------
+    x : ndarray, shape (len(a), len(n))
+        One exponential sequence per base
+    
+    Examples:
+    ---------
+    >>> r = np.array([0.999, 0.995, 0.99])
+    >>> omega = np.array([0.1, 0.25, 0.7])
+    >>> modes = exponential_bank(range(48000), r * np.exp(1j * omega))
+    >>> y = modes.real.sum(axis=0)
+    """
+    a = np.asarray(a)
+    dtype = _complex_dtype(dtype) if np.iscomplexobj(a) else _real_dtype(dtype)
+    
+    span = _contiguous_range(n, check_arrays=True)
+    if span is not None:
+        start, length = span
+        x = np.zeros(a.shape + (length,), dtype=dtype)
+        k0 = min(max(0, n0 - start), length)
+        _power_series(a, start + k0 - n0, x[..., k0:], method=method)
+        return x
+    
+    n = np.asarray(n)
+    x = np.zeros(a.shape + n.shape, dtype=dtype)
+    mask = n >= n0
+    x[..., mask] = a[..., None] ** (n[mask] - n0)
+    return x
+
+
+@instrument
+def complex_exponential(n, omega, phi=0, dtype=None):
     """
     Generate a complex exponential: e^(j(omega*n + phi))
     
@@ -137,6 +345,10 @@ def complex_exponential(n, omega, phi=0):
         Frequency in radians per sample
     phi : float
         Phase offset in radians (default: 0)
+    dtype : dtype, optional
+        Output precision, e.g. np.complex64 or np.float32 (default: the
+        complex type of get_default_dtype()). The phase is always computed
+        in float64.
     
     Returns:
     --------
@@ -148,10 +360,19 @@ def complex_exponential(n, omega, phi=0):
     >>> n = np.arange(0, 16)
     >>> z = complex_exponential(n, 2*np.pi/8)
     """
-    return np.exp(1j * (omega * np.asarray(n) + phi))
+    phase = omega * np.asarray(n) + phi
+    if np.iscomplexobj(phase):
+        return np.exp(1j * phase).astype(_complex_dtype(dtype), copy=False)
+    # Writing cos/sin straight into the output avoids the complex temporaries
+    # of np.exp(1j * phase)
+    z = np.empty(phase.shape, dtype=_complex_dtype(dtype))
+    np.cos(phase, out=z.real)
+    np.sin(phase, out=z.imag)
+    return z
 
 
-def sinusoidal_sequence(n, A, omega, phi=0):
+@instrument
+def sinusoidal_sequence(n, A, omega, phi=0, dtype=None):
     """
     Generate a sinusoidal sequence: x[n] = A*cos(omega*n + phi)
     
@@ -165,6 +386,9 @@ def sinusoidal_sequence(n, A, omega, phi=0):
         Frequency in radians per sample
     phi : float
         Phase in radians (default: 0)
+    dtype : dtype, optional
+        Output dtype, e.g. np.float32 (default: get_default_dtype()). The
+        phase is always computed in float64.
     
     Returns:
     --------
@@ -176,9 +400,15 @@ def sinusoidal_sequence(n, A, omega, phi=0):
     >>> n = np.arange(0, 16)
     >>> x = sinusoidal_sequence(n, 1.0, 2*np.pi/8)
     """
-    return A * np.cos(omega * np.asarray(n) + phi)
+    phase = omega * np.asarray(n) + phi
+    dtype = _complex_dtype(dtype) if np.iscomplexobj(A) else _real_dtype(dtype)
+    x = np.empty(phase.shape, dtype=dtype)
+    np.cos(phase, out=x)
+    x *= A
+    return x
 
 
+@instrument
 def shift_signal(x, k):
     """
     Shift a signal by k samples (circular shift for finite-length signals).
@@ -203,6 +433,7 @@ def shift_signal(x, k):
     return np.roll(x, k)
 
 
+@instrument
 def downsample(x, M):
     """
     Downsample a signal by factor M (keep every M-th sample).
@@ -227,6 +458,7 @@ def downsample(x, M):
     return np.asarray(x)[::M]
 
 
+@instrument
 def upsample(x, L):
     """
     Upsample a signal by factor L (insert L-1 zeros between samples).
@@ -254,6 +486,7 @@ def upsample(x, L):
     return y
 
 
+@instrument
 def db(x, power=False):
     """
     Convert amplitude or power to decibels.
@@ -278,9 +511,12 @@ def db(x, power=False):
     """
     x = np.asarray(x)
     factor = 10 if power else 20
-    return factor * np.log10(np.abs(x) + 1e-20)  # Add small value to avoid log(0)
+    # float32 / complex64 stay in single precision; 1e-20 is still > 0 there
+    mag = np.abs(x).astype(precision.result_dtype(x.real), copy=False)
+    return factor * np.log10(mag + mag.dtype.type(1e-20))  # Add small value to avoid log(0)
 
 
+@instrument
 def normalize(x):
     """
     Normalize a signal to have maximum absolute value of 1.
@@ -304,7 +540,80 @@ def normalize(x):
     max_val = np.max(np.abs(x))
     if max_val == 0:
         return x
-    return x / max_val
+    return (x / max_val).astype(precision.result_dtype(x), copy=False)
+
+
+# Constant (boxcar) kernels at least this long are convolved with running
+# sums instead of np.convolve
+BOXCAR_MIN_LENGTH = 16
+
+
+def _is_boxcar(h):
+    """True if h is a long 1-D kernel whose taps are all equal and nonzero."""
+    return (h.ndim == 1 and h.size >= BOXCAR_MIN_LENGTH and h[0] != 0
+            and bool(np.all(h == h[0])))
+
+
+@instrument
+def discrete_convolution(x, h):
+    """
+    Compute discrete convolution: y[n] = x[n] * h[n]
+    
+    Sparse and run-length signals (see utils/sparse_signals.py) take fast
+    paths: an impulse train becomes a scatter-add of shifted copies and a
+    rectangular pulse a difference of running sums. Dense boxcar kernels
+    (all taps equal, e.g. h = np.ones(M)) of at least BOXCAR_MIN_LENGTH
+    taps are detected and computed as O(N) moving sums as well: exactly
+    for integer inputs, and to rounding for floating-point inputs, whose
+    running sums restart every block. Floating-point inputs containing
+    NaN or inf are convolved directly, as np.convolve does.
+    
+    The result has the promoted dtype of x and h (float32 inputs stay
+    float32; integer inputs give exact integer results). With a wider
+    accumulation dtype set in utils/precision.py, floating-point sums are
+    computed in that precision and rounded once at the end.
+    
+    Parameters:
+    -----------
+    x : array-like, SparseSignal or RunLengthSignal
+        First signal
+    h : array-like, SparseSignal or RunLengthSignal
+        Second signal (often impulse response)
+    
+    Returns:
+    --------
+    y : ndarray
+        Convolved signal (length = len(x) + len(h) - 1)
+    
+    Examples:
+    ---------
+    >>> x = np.array([1, 1, 1, 1])
+    >>> y = discrete_convolution(x, [1, 1, 1])  # [1, 2, 3, 3, 2, 1]
+    >>> pulse = RunLengthSignal.rect(range(0, 1000), 0, 499)
+    >>> y = discrete_convolution(np.random.randn(10**6), pulse)
+    """
+    compact = (SparseSignal, RunLengthSignal)
+    if isinstance(h, compact) and not isinstance(x, compact):
+        return h.convolve(x)
+    if isinstance(x, compact) and not isinstance(h, compact):
+        return x.convolve(h)
+    if isinstance(h, compact):
+        # Both compact: expand x and keep the fast path of h
+        return h.convolve(np.asarray(x))
+    
+    x = np.asarray(x)
+    h = np.asarray(h)
+    if x.ndim == 1 and x.size >= BOXCAR_MIN_LENGTH:
+        # Check the shorter operand (the kernel, usually): it is cheap
+        a, b = (x, h) if h.size <= x.size else (h, x)
+        if _is_boxcar(b):
+            return RunLengthSignal([0], [b.size], b[0], b.size, dtype=b.dtype).convolve(a)
+    
+    out = np.result_type(x, h)
+    acc = precision.accumulator_dtype(out)
+    if acc != out:
+        return np.convolve(x.astype(acc), h.astype(acc), mode='full').astype(out)
+    return np.convolve(x, h, mode='full')
 
 
 if __name__ == "__main__":
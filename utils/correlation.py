@@ -0,0 +1,296 @@
+"""
+Cross-Correlation and Matched Filtering
+=======================================
+
+FFT-based cross-correlation of a stream against one or many templates,
+for preamble and pulse detection.
+
+Correlating with a template t is convolving with its time-reversed
+conjugate, so the work is done by fft_convolve with a cached Kernel
+(utils/fast_convolution.py) instead of np.convolve:
+
+    c[n] = sum_m x[n + m] conj(t[m])      (window starting at sample n)
+
+The normalized cross-correlation divides by the energies of the template
+and of the signal window. The window energies come from running sums, so
+they cost O(1) per sample whatever the template length, and |ncc| <= 1.
+The sums restart every RUNNING_SUM_BLOCK samples, and a quiet window
+whose running-sum difference cancelled (e.g. right after loud samples) is
+summed again directly.
+
+A MatchedFilter is streaming: it keeps the last M - 1 samples, so window
+starts continue across blocks. ``update`` keeps only the k strongest
+local peaks per template and never holds more than one chunk of the
+correlation in memory:
+
+    >>> mf = MatchedFilter(preambles, normalize=True)   # (templates, M)
+    >>> for block in stream:
+    ...     mf.update(block)
+    >>> index, value = mf.peaks(k=5)                    # (templates, 5) each
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+
+from .fast_convolution import Kernel, fft_convolve
+from .instrumentation import instrument
+from .sparse_signals import RUNNING_SUM_BLOCK
+
+
+# update() correlates at most this many samples at a time
+CHUNK_SIZE = 1 << 16
+
+# Window energies are summed again directly when their running-sum
+# difference is below this fraction of the running sum
+_CANCELLATION = 1e-6
+
+
+def _sliding_sums(v, M):
+    """
+    Sums of every length-M window of v along the last axis, from running
+    sums restarted every RUNNING_SUM_BLOCK windows (as sparse_signals does).
+
+    Returns the sums and the magnitude of the running sum each one was
+    taken from, which bounds its cancellation error.
+    """
+    count = v.shape[-1] - M + 1
+    block = max(RUNNING_SUM_BLOCK, 2 * M)
+    blocks = -(-count // block)
+    vp = np.zeros(v.shape[:-1] + (blocks * block + M - 1,), dtype=v.dtype)
+    vp[..., :v.shape[-1]] = v
+    windows = np.lib.stride_tricks.sliding_window_view(
+        vp, block + M - 1, axis=-1)[..., ::block, :]
+    C = np.zeros(windows.shape[:-1] + (block + M,), dtype=v.dtype)
+    np.cumsum(windows, axis=-1, out=C[..., 1:])
+    shape = v.shape[:-1] + (blocks * block,)
+    sums = (C[..., M:] - C[..., :block]).reshape(shape)[..., :count]
+    scale = np.abs(C[..., M:]).reshape(shape)[..., :count]
+    return sums, scale
+
+
+class MatchedFilter:
+    """
+    Streaming cross-correlation against a batch of templates.
+
+    Parameters:
+    -----------
+    templates : array-like
+        One template, shape (M,), or a batch of equal-length templates,
+        shape (T, M)
+    normalize : bool
+        Return the normalized cross-correlation (default: False)
+    zero_mean : bool
+        With normalize=True, remove the mean of the template and of every
+        signal window first (Pearson correlation) (default: False)
+    top_k : int
+        Number of peaks per template tracked by update() (default: 1)
+
+    Examples:
+    ---------
+    >>> mf = MatchedFilter(np.ones(16))
+    >>> c = mf.process(x)          # c[n] = sum(x[n:n + 16])
+    """
+
+    def __init__(self, templates, normalize=False, zero_mean=False, top_k=1):
+        t = np.asarray(templates)
+        self._single = t.ndim == 1
+        t = np.atleast_2d(t)
+        if t.ndim != 2 or t.shape[-1] == 0:
+            raise ValueError("templates must have shape (M,) or (T, M)")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        if normalize and zero_mean:
+            t = t - t.mean(axis=-1, keepdims=True)
+        self.templates = t
+        self.M = t.shape[-1]
+        self.normalize = normalize
+        self.zero_mean = zero_mean
+        self.top_k = int(top_k)
+        norms = np.sqrt(np.sum(np.abs(t) ** 2, axis=-1))[:, None]
+        # A template with no energy (e.g. constant with zero_mean) matches nothing
+        self._norms = np.where(norms > 0, norms, np.inf)
+        # Correlation with t == convolution with conj(t) reversed
+        self.kernel = Kernel(np.conj(t[:, ::-1]))
+        self.reset()
+
+    def reset(self):
+        """Forget the stream, the sample count and the tracked peaks."""
+        self.position = 0       # global start index of the next output
+        self._history = None    # last M - 1 samples
+        self._edge = None       # last two |outputs|, to find local maxima
+        self._peak_index = None
+        self._peak_value = None
+
+    def _correlate(self, x):
+        """Correlate the next block; returns outputs for new window starts."""
+        x = np.asarray(x)
+        if self._history is None:
+            self._history = x[..., :0]
+        ext = np.concatenate((self._history, x), axis=-1)
+        self._history = ext[..., max(0, ext.shape[-1] - (self.M - 1)):].copy()
+        count = ext.shape[-1] - self.M + 1
+        if count <= 0:
+            return np.zeros(x.shape[:-1] + (len(self.templates), 0))
+
+        c = fft_convolve(ext[..., None, :], self.kernel, mode='valid')
+        if self.normalize:
+            scale = self._window_norms(ext)[..., None, :] * self._norms
+            c /= scale.astype(np.finfo(c.dtype).dtype, copy=False)
+        self.position += count
+        return c
+
+    def _window_norms(self, ext):
+        """sqrt of the energy of every length-M window, from running sums."""
+        M = self.M
+        energy, scale = _sliding_sums(np.abs(ext.astype(np.result_type(ext, np.float64))) ** 2, M)
+        # A quiet window after loud samples cancels in the running sum:
+        # sum the windows that lost most of their digits again directly
+        suspect = np.nonzero(energy < _CANCELLATION * scale)
+        windows = np.lib.stride_tricks.sliding_window_view(ext, M, axis=-1)
+        if suspect[0].size:
+            energy[suspect] = np.sum(np.abs(windows[suspect].astype(energy.dtype)) ** 2, axis=-1)
+        power = energy
+        if self.zero_mean:
+            total, _ = _sliding_sums(ext.astype(np.result_type(ext, np.float64)), M)
+            if suspect[0].size:
+                total[suspect] = np.sum(windows[suspect].astype(total.dtype), axis=-1)
+            power = power - np.abs(total) ** 2 / M
+        norms = np.sqrt(np.maximum(power, 0))
+        # Silent windows correlate with nothing: divide by inf, not 0
+        norms[norms <= 1e-12 * max(1.0, norms.max(initial=0.0))] = np.inf
+        return norms
+
+    def _squeeze(self, a):
+        return a[..., 0, :] if self._single else a
+
+    @instrument(name='MatchedFilter.process')
+    def process(self, x):
+        """
+        Correlate the next block of samples.
+
+        Parameters:
+        -----------
+        x : array-like
+            Input block, shape (..., N)
+
+        Returns:
+        --------
+        c : ndarray
+            Correlation for every window that is complete in this block,
+            shape (..., T, count) (or (..., count) for a single template).
+            The first output is the window starting at sample index
+            ``position`` as it was before the call.
+        """
+        return self._squeeze(self._correlate(x))
+
+    @instrument(name='MatchedFilter.update')
+    def update(self, x):
+        """
+        Correlate the next block, keeping only the strongest peaks.
+
+        The block is processed in chunks of CHUNK_SIZE samples and only
+        the top_k local maxima of |c| per template are kept.
+
+        Returns:
+        --------
+        self : MatchedFilter
+        """
+        x = np.asarray(x)
+        for i in range(0, max(x.shape[-1], 1), CHUNK_SIZE):
+            start = self.position
+            mag = np.abs(self._correlate(x[..., i:i + CHUNK_SIZE]))
+            self._track_peaks(mag, start)
+        return self
+
+    def _track_peaks(self, mag, start):
+        if self._edge is None:
+            self._edge = np.zeros(mag.shape[:-1] + (2,))
+            self._peak_index = np.full(mag.shape[:-1] + (self.top_k,), -1, dtype=np.int64)
+            self._peak_value = np.full(mag.shape[:-1] + (self.top_k,), -np.inf)
+        if mag.shape[-1] == 0:
+            return
+
+        # The last output of a chunk is judged once its right neighbour is known
+        ext = np.concatenate((self._edge, mag), axis=-1)
+        self._edge = ext[..., -2:].copy()
+        centre = ext[..., 1:-1]
+        peak = (centre > ext[..., :-2]) & (centre >= ext[..., 2:])
+        # Non-peaks score -1 - |c|: below every peak, yet still distinct
+        # values (argpartition slows down badly on long runs of ties)
+        score = np.where(peak, centre, -1.0 - centre)
+        self._merge_peaks(score, start - 1)
+
+    def _merge_peaks(self, score, first_index):
+        """Merge candidate peaks (first at global index first_index) into the top k."""
+        k = min(self.top_k, score.shape[-1])
+        idx = np.argpartition(score, -k, axis=-1)[..., -k:]
+        value = np.take_along_axis(score, idx, -1)
+        values = np.concatenate((self._peak_value, np.where(value >= 0, value, -np.inf)), -1)
+        indices = np.concatenate((self._peak_index, idx + first_index), -1)
+        best = np.argpartition(values, -self.top_k, axis=-1)[..., -self.top_k:]
+        self._peak_value = np.take_along_axis(values, best, -1)
+        self._peak_index = np.take_along_axis(indices, best, -1)
+
+    def peaks(self, k=None):
+        """
+        Return the strongest local maxima of |c| seen so far.
+
+        Parameters:
+        -----------
+        k : int, optional
+            Number of peaks (at most top_k) (default: top_k)
+
+        Returns:
+        --------
+        index : ndarray
+            Window start indices, strongest first, shape (..., T, k) (or
+            (..., k) for a single template); -1 where fewer peaks exist
+        value : ndarray
+            |c| at those indices (-inf where fewer peaks exist)
+        """
+        if self._edge is None:
+            raise ValueError("no samples processed yet")
+        k = self.top_k if k is None else min(int(k), self.top_k)
+        index, value = self._peak_index, self._peak_value
+        # The very last output has no right neighbour yet: judge it as a peak
+        last = self._edge[..., 1:]
+        candidate = np.where(last > self._edge[..., :1], last, -np.inf)
+        values = np.concatenate((value, candidate), -1)
+        indices = np.concatenate((index, np.full(candidate.shape, self.position - 1)), -1)
+        indices = np.where(values > -np.inf, indices, -1)
+        order = np.argsort(-values, axis=-1, kind='stable')[..., :k]
+        return (self._squeeze(np.take_along_axis(indices, order, -1)),
+                self._squeeze(np.take_along_axis(values, order, -1)))
+
+
+@instrument
+def cross_correlate(x, templates, normalize=False, zero_mean=False):
+    """
+    Cross-correlate a signal with one or many templates using FFTs.
+
+    For 1-D inputs the result equals np.correlate(x, t, mode='valid').
+
+    Parameters:
+    -----------
+    x : array-like
+        Signal, shape (..., N)
+    templates : array-like
+        Template(s), shape (M,) or (T, M)
+    normalize : bool
+        Normalized cross-correlation, |c| <= 1 (default: False)
+    zero_mean : bool
+        Remove the template and window means first (default: False)
+
+    Returns:
+    --------
+    c : ndarray
+        Shape (..., N - M + 1), or (..., T, N - M + 1) for a batch
+
+    Examples:
+    ---------
+    >>> c = cross_correlate(x, preamble, normalize=True)
+    >>> start = np.argmax(np.abs(c))
+    """
+    return MatchedFilter(templates, normalize=normalize, zero_mean=zero_mean).process(x)
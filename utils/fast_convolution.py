@@ -0,0 +1,332 @@
+"""
+FFT Convolution with Reusable Kernels
+=====================================
+
+Circular and linear convolution through the DFT (Lessons 9-10).
+
+Filtering many frames with the same impulse response h used to transform
+h again on every call. A ``Kernel`` wraps h once and caches its spectrum
+for every FFT size it is used with, so only the signal is transformed:
+
+    >>> k = Kernel(h)
+    >>> for frame in frames:
+    ...     y = fft_convolve(frame, k)      # H is computed once, then reused
+
+All functions work along the last axis. Signals and kernels may carry
+leading dimensions (e.g. (channels, N) or a bank of kernels (K, M)) that
+broadcast against each other, so a whole batch of frames is filtered with
+one FFT call.
+
+SciPy's FFT (scipy.fft) is loaded on first use, not on import.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import precision
+from .instrumentation import instrument
+
+
+# Number of FFT sizes whose kernel spectra a Kernel keeps by default
+DEFAULT_CACHE_SIZE = 8
+
+
+def _scipy_fft():
+    """Import scipy.fft on first use (importing utils stays cheap)."""
+    import scipy.fft
+    return scipy.fft
+
+
+def _fold(a, n):
+    """
+    Wrap a sequence longer than n onto n samples (time-domain aliasing).
+
+    An n-point DFT cannot tell a[k] from a[k + n], so this is what an
+    n-point circular convolution sees of a longer sequence.
+    """
+    length = a.shape[-1]
+    if length <= n:
+        return a
+    blocks = -(-length // n)
+    padded = np.zeros(a.shape[:-1] + (blocks * n,), dtype=a.dtype)
+    padded[..., :length] = a
+    return padded.reshape(a.shape[:-1] + (blocks, n)).sum(axis=-2)
+
+
+class Kernel:
+    """
+    A convolution kernel with cached DFT spectra.
+
+    The spectrum for each FFT size is computed on first use and kept in a
+    least-recently-used cache of `cache_size` entries. A Kernel may be
+    shared between threads; pickling it (e.g. to send it to worker
+    processes) transfers only h, and each process rebuilds its own cache.
+
+    Parameters:
+    -----------
+    h : array-like
+        Impulse response, shape (M,) or (..., M) for a bank of kernels
+    cache_size : int
+        Number of FFT sizes to keep spectra for (default: DEFAULT_CACHE_SIZE)
+
+    Examples:
+    ---------
+    >>> k = Kernel(np.ones(64) / 64)
+    >>> y = fft_convolve(x, k)
+    >>> z = circular_convolve(frame, k, n=1024)
+    """
+
+    def __init__(self, h, cache_size=DEFAULT_CACHE_SIZE):
+        if cache_size < 1:
+            raise ValueError("cache_size must be at least 1")
+        h = np.array(h)
+        if h.ndim == 0 or h.shape[-1] == 0:
+            raise ValueError("h must have at least one sample")
+        h.flags.writeable = False  # cached spectra must stay valid
+        self.h = h
+        self.cache_size = int(cache_size)
+        self._init_cache()
+
+    def _init_cache(self):
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.h.shape[-1]
+
+    def __repr__(self):
+        return f"Kernel(shape={self.h.shape}, dtype={self.h.dtype})"
+
+    def __getstate__(self):
+        # Locks cannot be pickled, and the spectra are cheap to rebuild
+        return {'h': self.h, 'cache_size': self.cache_size}
+
+    def __setstate__(self, state):
+        self.h = np.array(state['h'])
+        self.h.flags.writeable = False
+        self.cache_size = state['cache_size']
+        self._init_cache()
+
+    @property
+    def is_complex(self):
+        return self.h.dtype.kind == 'c'
+
+    def spectrum(self, nfft, real=True, dtype=None):
+        """
+        Return the nfft-point DFT of h, computing and caching it if needed.
+
+        Parameters:
+        -----------
+        nfft : int
+            DFT size; a longer h is folded (aliased) onto nfft samples
+        real : bool
+            Return the one-sided spectrum (rfft, nfft // 2 + 1 bins) for use
+            with real signals (default: True). Ignored for complex kernels,
+            which always give the full spectrum.
+        dtype : dtype, optional
+            Real precision to transform in, e.g. np.float32 for a complex64
+            spectrum (default: the precision of h, see utils/precision.py)
+
+        Returns:
+        --------
+        H : ndarray
+            Read-only spectrum, shape (..., nfft // 2 + 1) or (..., nfft)
+        """
+        real = real and not self.is_complex
+        if dtype is None:
+            dtype = precision.result_dtype(self.h)
+        key = (int(nfft), real, np.finfo(dtype).dtype)
+        with self._lock:
+            H = self._cache.get(key)
+            if H is not None:
+                self._cache.move_to_end(key)
+                return H
+
+        # Transform outside the lock so other threads are not held up
+        fft = _scipy_fft()
+        work = precision.complex_dtype(key[2]) if self.is_complex else key[2]
+        h = _fold(self.h, key[0]).astype(work, copy=False)
+        H = fft.rfft(h, key[0]) if real else fft.fft(h, key[0])
+        H.flags.writeable = False
+
+        with self._lock:
+            self._cache[key] = H
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return H
+
+    def cached_sizes(self):
+        """Return the cached (nfft, real, dtype) keys, least recently used first."""
+        with self._lock:
+            return list(self._cache)
+
+    def clear_cache(self):
+        """Drop all cached spectra."""
+        with self._lock:
+            self._cache.clear()
+
+
+def as_kernel(h):
+    """Return h unchanged if it is a Kernel, otherwise wrap it in one."""
+    return h if isinstance(h, Kernel) else Kernel(h)
+
+
+def _transform(x, kernel, nfft, workers):
+    """Multiply the nfft-point spectra of x and the kernel and invert."""
+    fft = _scipy_fft()
+    real = x.dtype.kind != 'c' and not kernel.is_complex
+    # float32 inputs are transformed in single precision unless the
+    # precision policy asks for wider accumulation
+    out = precision.result_dtype(x, kernel.h)
+    work = np.finfo(precision.accumulator_dtype(out)).dtype
+    x = x.astype(np.result_type(x, work), copy=False)
+    H = kernel.spectrum(nfft, real=real, dtype=work)
+    if real:
+        y = fft.irfft(fft.rfft(x, nfft, workers=workers) * H, nfft,
+                      workers=workers)
+    else:
+        y = fft.ifft(fft.fft(x, nfft, workers=workers) * H, nfft, workers=workers)
+    return y.astype(out, copy=False)
+
+
+@instrument
+def circular_convolve(x, h, n=None, workers=None):
+    """
+    N-point circular convolution along the last axis.
+
+    y[n] = sum_k x[k] h[(n - k) mod N],  n = 0, ..., N-1
+
+    Sequences longer than N are folded onto N samples first, as an N-point
+    DFT would see them. With a Kernel, the spectrum of h is cached.
+
+    Parameters:
+    -----------
+    x : array-like
+        Input signal(s), shape (..., N_x)
+    h : array-like or Kernel
+        Impulse response(s), shape (..., M)
+    n : int, optional
+        Length N of the circular convolution (default: max(N_x, M))
+    workers : int, optional
+        Number of threads for scipy.fft (default: 1)
+
+    Returns:
+    --------
+    y : ndarray
+        Circular convolution, shape (..., N)
+
+    Examples:
+    ---------
+    >>> circular_convolve([1, 2, 3, 4], [1, 1])   # [5, 3, 5, 7]
+    """
+    x = np.asarray(x)
+    kernel = as_kernel(h)
+    if n is None:
+        n = max(x.shape[-1], len(kernel))
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    return _transform(_fold(x, n), kernel, n, workers)
+
+
+def _block_fft_size(M):
+    """FFT size for overlap-add with an M-tap kernel (a few kernels long)."""
+    return _scipy_fft().next_fast_len(max(4 * M, 256), real=True)
+
+
+@instrument
+def fft_convolve(x, h, mode='full', workers=None):
+    """
+    Linear convolution along the last axis using FFTs.
+
+    Gives the same result as np.convolve (up to rounding) in
+    O(N log M) time. Short signals are convolved with one FFT of size
+    >= N + M - 1; long signals are split into blocks and overlap-added, so
+    the FFT size (and the cached kernel spectrum) depends only on M.
+
+    Parameters:
+    -----------
+    x : array-like
+        Input signal(s), shape (..., N)
+    h : array-like or Kernel
+        Impulse response(s), shape (..., M). Pass a Kernel to reuse its
+        spectrum across calls.
+    mode : str
+        'full' (N + M - 1 samples), 'same' (N samples, centered as
+        np.convolve) or 'valid' (max(N, M) - min(N, M) + 1 samples)
+        (default: 'full')
+    workers : int, optional
+        Number of threads for scipy.fft (default: 1)
+
+    Returns:
+    --------
+    y : ndarray
+        Convolution, floating point even for integer inputs (float32 /
+        complex64 inputs stay in single precision)
+
+    Examples:
+    ---------
+    >>> k = Kernel(np.hanning(129))
+    >>> y = fft_convolve(x, k)            # kernel spectrum computed once
+    >>> y2 = fft_convolve(x2, k)          # ... and reused here
+    """
+    if mode not in ('full', 'same', 'valid'):
+        raise ValueError("mode must be 'full', 'same' or 'valid'")
+    x = np.asarray(x)
+    kernel = as_kernel(h)
+    N, M = x.shape[-1], len(kernel)
+    if N == 0:
+        raise ValueError("x must have at least one sample")
+    full = N + M - 1
+
+    nfft = _block_fft_size(M)
+    if full <= 2 * nfft:
+        fft = _scipy_fft()
+        size = fft.next_fast_len(full, real=True)
+        y = _transform(x, kernel, size, workers)[..., :full]
+    else:
+        y = _overlap_add(x, kernel, nfft, workers)[..., :full]
+
+    if mode == 'full':
+        return y
+    if mode == 'same':
+        length, start = max(N, M), (min(N, M) - 1) // 2
+    else:
+        length, start = max(N, M) - min(N, M) + 1, min(N, M) - 1
+    return y[..., start:start + length]
+
+
+def _overlap_add(x, kernel, nfft, workers):
+    """Overlap-add convolution of a long x with blocks of nfft - M + 1 samples."""
+    N, M = x.shape[-1], len(kernel)
+    L = nfft - M + 1           # new samples per block (L > M - 1)
+    blocks = -(-N // L)
+
+    xb = np.zeros(x.shape[:-1] + (blocks * L,), dtype=x.dtype)
+    xb[..., :N] = x
+    xb = xb.reshape(x.shape[:-1] + (blocks, L))
+    # Broadcast a bank of kernels (..., M) over the block axis
+    yb = _transform(xb, _BlockView(kernel), nfft, workers)
+
+    out = np.zeros(yb.shape[:-2] + ((blocks + 1) * L,), dtype=yb.dtype)
+    o = out.reshape(yb.shape[:-2] + (blocks + 1, L))
+    o[..., :blocks, :] = yb[..., :L]
+    o[..., 1:, :M - 1] += yb[..., L:]
+    return out
+
+
+class _BlockView:
+    """Present a Kernel's spectra with an extra block axis for broadcasting."""
+
+    def __init__(self, kernel):
+        self.kernel = kernel
+        self.h = kernel.h
+        self.is_complex = kernel.is_complex
+
+    def spectrum(self, nfft, real=True, dtype=None):
+        return self.kernel.spectrum(nfft, real=real, dtype=dtype)[..., None, :]
@@ -0,0 +1,349 @@
+"""
+Polyphase DFT Filter Banks
+==========================
+
+Uniform DFT analysis and synthesis filter banks (channelizers, Lesson 15).
+
+The analysis bank splits a wideband signal into K subbands. Subband k is
+the signal filtered by the prototype lowpass h modulated to 2*pi*k/K and
+downsampled by D, with the downsample() convention of keeping samples
+n = 0, D, 2D, ...:
+
+    y_k[m] = sum_l h[l] e^{j 2 pi k l / K} x[mD - l]
+
+Splitting h into its K polyphase components turns the K filters into one
+weighted sum of L = P*K samples and a single K-point FFT per output frame,
+so a block costs O((N / D) * (L + K log K)) instead of K full-rate
+convolutions.
+
+The synthesis bank upsamples every subband by D (zero insertion, as
+upsample() does), filters it with the modulated synthesis prototype g and
+sums the bands, again with one K-point FFT per frame followed by an
+overlap-add.
+
+* D = K is the critically sampled bank. Its default prototypes are the
+  rectangular block-DFT pair, which reconstructs the input exactly.
+* D < K (K a multiple of D) is the oversampled bank. Its default
+  prototypes are windowed-sinc lowpass filters: analysis cutoff pi/K and
+  synthesis cutoff pi/D. Reconstruction is near-perfect (errors around
+  the filters' stopband level, about -70 dB) and the bands overlap
+  smoothly.
+
+Both banks are streaming: each ``process`` call continues where the
+previous one stopped. Leading dimensions of the input are channels; the
+analysis output has shape (..., K, frames).
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+
+from . import precision
+from .instrumentation import instrument
+
+
+# Frames are processed in chunks so temporaries stay near this many samples
+CHUNK_SAMPLES = 1 << 20
+
+
+def _scipy_fft():
+    """Import scipy.fft on first use (importing utils stays cheap)."""
+    import scipy.fft
+    return scipy.fft
+
+
+def _check_rates(K, D):
+    K = int(K)
+    D = K if D is None else int(D)
+    if K < 1 or D < 1:
+        raise ValueError("K and D must be at least 1")
+    if K % D:
+        raise ValueError("K must be a multiple of D")
+    return K, D
+
+
+def _pad_to(h, multiple):
+    """Zero-pad h at the end to a multiple of `multiple` samples."""
+    h = np.asarray(h)
+    if h.ndim != 1 or h.size == 0:
+        raise ValueError("prototype filters must be non-empty 1-D arrays")
+    length = -(-h.size // multiple) * multiple
+    padded = np.zeros(length, dtype=precision.result_dtype(h))
+    padded[:h.size] = h
+    return padded
+
+
+def _working_taps(taps, dtype):
+    """taps in the precision of dtype, so float32 input keeps single precision."""
+    real = np.finfo(dtype).dtype
+    return taps.astype(precision.complex_dtype(real) if taps.dtype.kind == 'c' else real)
+
+
+def prototype_filters(K, D=None, taps_per_band=8, window=('kaiser', 8.0)):
+    """
+    Design default analysis/synthesis prototypes for a K-band DFT bank.
+
+    Parameters:
+    -----------
+    K : int
+        Number of subbands
+    D : int, optional
+        Decimation factor (default: K, critically sampled)
+    taps_per_band : int
+        Filter length in multiples of K for oversampled banks (default: 8)
+    window : str or tuple
+        scipy.signal.firwin window for oversampled banks
+        (default: ('kaiser', 8.0), about 80 dB of stopband attenuation)
+
+    Returns:
+    --------
+    h : ndarray
+        Analysis prototype
+    g : ndarray
+        Synthesis prototype
+
+    Notes:
+    ------
+    For D = K, h is a K-sample rectangle and g the same rectangle delayed
+    by one sample, which gives perfect reconstruction with a delay of K.
+    For D < K, h and g are windowed-sinc filters of taps_per_band * K + 1
+    taps with cutoffs pi/K and pi/D (g is a centered impulse for D = 1);
+    the odd length makes the total delay taps_per_band * K, a multiple of
+    K. With the defaults the reconstruction error is below 1e-3 of the
+    signal peak.
+    """
+    K, D = _check_rates(K, D)
+    if D == K:
+        return np.ones(K), np.concatenate(([0.0], np.ones(K)))
+    from scipy.signal import firwin
+    taps = taps_per_band * K + 1
+    h = firwin(taps, 1.0 / K, window=window)
+    if D == 1:
+        g = np.zeros(taps)
+        g[taps // 2] = 1.0
+    else:
+        g = firwin(taps, 1.0 / D, window=window)
+    return h, g
+
+
+class PolyphaseAnalyzer:
+    """
+    Streaming polyphase DFT analysis bank (channelizer).
+
+    Parameters:
+    -----------
+    K : int
+        Number of subbands
+    D : int, optional
+        Decimation factor; K must be a multiple of D (default: K)
+    h : array-like, optional
+        Analysis prototype lowpass (default: prototype_filters(K, D)[0])
+    taps_per_band : int
+        Length of the default prototype in multiples of K (default: 8)
+
+    Examples:
+    ---------
+    >>> bank = PolyphaseAnalyzer(K=64, D=32)
+    >>> y = bank.process(x)          # x: (channels, N) -> (channels, 64, N/32)
+    >>> y2 = bank.process(x_next)    # continues seamlessly
+    """
+
+    def __init__(self, K, D=None, h=None, taps_per_band=8):
+        self.K, self.D = _check_rates(K, D)
+        if h is None:
+            h = prototype_filters(self.K, self.D, taps_per_band)[0]
+        self.h = np.asarray(h)
+        # Reversed so that a window of input samples lines up with h[l] x[t - l]
+        self._h_rev = _pad_to(self.h, self.K)[::-1].copy()
+        self.L = self._h_rev.size
+        self._twiddle = np.exp(-2j * np.pi * np.arange(self.K) / self.K)
+        self._tables = {}  # working dtype -> (polyphase taps, twiddle)
+        self.reset()
+
+    def reset(self):
+        """Clear the input history and restart the frame phase."""
+        self._history = None
+        self._phase = 0  # input samples to skip before the next frame
+
+    @instrument(name='PolyphaseAnalyzer.process')
+    def process(self, x):
+        """
+        Split the next block of samples into subbands.
+
+        Parameters:
+        -----------
+        x : array-like
+            Input block, shape (..., N), real or complex
+
+        Returns:
+        --------
+        y : ndarray
+            Complex subband signals, shape (..., K, frames), where frames
+            is the number of input samples n with n = 0 mod D in this block
+            (complex64 for single precision inputs)
+        """
+        x = np.asarray(x)
+        h_poly, twiddle = self._taps(precision.result_dtype(x))
+        dtype = precision.result_dtype(x, h_poly)
+        K, L, N = self.K, self.L, x.shape[-1]
+        if self._history is None:
+            self._history = np.zeros(x.shape[:-1] + (L - 1,), dtype=dtype)
+
+        ext = np.concatenate((self._history, x.astype(dtype, copy=False)), axis=-1)
+        first, D = self._phase, self.D
+        count = len(range(first, N, D))
+        self._phase = (first - N) % D
+        self._history = ext[..., N:].copy()
+
+        # One channel at a time keeps the frame windows in cache
+        rows = ext.reshape(-1, ext.shape[-1])
+        u = np.empty((rows.shape[0], count, K), dtype=np.result_type(dtype, np.complex64))
+        if count == 0:
+            return np.swapaxes(u.reshape(x.shape[:-1] + (0, K)), -1, -2)
+        chunk = max(1, CHUNK_SAMPLES // L)
+        for row, out in zip(rows, u):
+            # Window t ends at input sample t: row[t : t + L] = x[t-L+1 .. t]
+            windows = np.lib.stride_tricks.sliding_window_view(row, L)
+            for i in range(0, count, chunk):
+                start = first + i * D
+                frames = windows[start:min(N, start + chunk * D):D]
+                # Weight and sum the polyphase components: s[q] collects the
+                # taps l = L-1-j with j = q (mod K), i.e. l = K-1-q (mod K)
+                s = np.einsum('mpk,pk->mk', frames.reshape(-1, L // K, K), h_poly)
+                out[i:i + chunk] = self._dft(s, twiddle)
+        return np.swapaxes(u.reshape(x.shape[:-1] + (count, K)), -1, -2)
+
+    def _taps(self, dtype):
+        """Polyphase taps and twiddle factors in the precision of dtype."""
+        dtype = np.dtype(dtype)
+        tables = self._tables.get(dtype)
+        if tables is None:
+            h_poly = _working_taps(self._h_rev, dtype).reshape(self.L // self.K, self.K)
+            twiddle = _working_taps(self._twiddle, dtype)
+            tables = self._tables[dtype] = (h_poly, twiddle)
+        return tables
+
+    def _dft(self, s, twiddle):
+        """u[k] = sum_r s[K-1-r] e^{j 2 pi k r / K} = e^{-j 2 pi k / K} FFT(s)[k]."""
+        fft = _scipy_fft()
+        if s.dtype.kind == 'c':
+            return fft.fft(s, axis=-1) * twiddle
+        # Real input: half-length transform, the rest is its conjugate mirror
+        K = self.K
+        half = fft.rfft(s, axis=-1)
+        full = np.empty(s.shape[:-1] + (K,), dtype=half.dtype)
+        full[..., :half.shape[-1]] = half
+        full[..., half.shape[-1]:] = np.conj(half[..., 1:(K + 1) // 2][..., ::-1])
+        full *= twiddle
+        return full
+
+
+class PolyphaseSynthesizer:
+    """
+    Streaming polyphase DFT synthesis bank.
+
+    Reconstructs a signal from the subbands produced by PolyphaseAnalyzer.
+    The output is scaled so that analysis followed by synthesis returns the
+    input delayed by `delay` samples.
+
+    Parameters:
+    -----------
+    K : int
+        Number of subbands
+    D : int, optional
+        Interpolation factor; K must be a multiple of D (default: K)
+    g : array-like, optional
+        Synthesis prototype (default: prototype_filters(K, D)[1])
+    h : array-like, optional
+        Analysis prototype the subbands were made with, used for the gain
+        and delay (default: prototype_filters(K, D)[0])
+    taps_per_band : int
+        Length of the default prototypes in multiples of K (default: 8)
+    real : bool
+        Return the real part of the output, for real input signals
+        (default: False)
+
+    Examples:
+    ---------
+    >>> analysis = PolyphaseAnalyzer(K=64, D=32)
+    >>> synthesis = PolyphaseSynthesizer(K=64, D=32, real=True)
+    >>> x_hat = synthesis.process(analysis.process(x))
+    >>> # x_hat[n] ~ x[n - synthesis.delay]
+    """
+
+    def __init__(self, K, D=None, g=None, h=None, taps_per_band=8, real=False):
+        self.K, self.D = _check_rates(K, D)
+        if g is None or h is None:
+            h0, g0 = prototype_filters(self.K, self.D, taps_per_band)
+            h = h0 if h is None else h
+            g = g0 if g is None else g
+        self.g = np.asarray(g)
+        self.real = real
+
+        # Distortion-free response of the bank: the taps of c = h * g at
+        # multiples of K; the largest one sets the delay
+        c_K = np.convolve(np.asarray(h), self.g)[::self.K]
+        if not np.any(c_K):
+            raise ValueError("h and g do not form a reconstructing pair")
+        self.delay = self.K * int(np.argmax(np.abs(c_K)))
+        self.scale = self.D / (self.K * np.sum(c_K))
+
+        self._g = _pad_to(self.g, self.K) * self.scale
+        self.L = self._g.size
+        self.reset()
+
+    def reset(self):
+        """Clear the overlap-add state."""
+        self._tail = None
+
+    @instrument(name='PolyphaseSynthesizer.process')
+    def process(self, y):
+        """
+        Combine the next block of subband frames into output samples.
+
+        Parameters:
+        -----------
+        y : array-like
+            Subband signals, shape (..., K, frames)
+
+        Returns:
+        --------
+        x : ndarray
+            Output block, shape (..., frames * D) (single precision for
+            complex64 subbands)
+        """
+        y = np.asarray(y)
+        if y.ndim < 2 or y.shape[-2] != self.K:
+            raise ValueError(f"expected subbands of shape (..., {self.K}, frames)")
+        g = _working_taps(self._g, precision.result_dtype(y))
+        frames = y.shape[-1]
+        if frames == 0:
+            # e.g. the analyzer's output for a block shorter than D
+            out = np.zeros(y.shape[:-2] + (0,), dtype=np.result_type(y, g))
+            return out.real if self.real and out.dtype.kind == 'c' else out
+        channels = int(np.prod(y.shape[:-2]))
+        chunk = max(1, CHUNK_SAMPLES // (self.L * max(1, channels)))
+        blocks = [self._synthesize(y[..., i:i + chunk], g)
+                  for i in range(0, frames, chunk)]
+        out = np.concatenate(blocks, axis=-1) if len(blocks) > 1 else blocks[0]
+        return out.real if self.real and out.dtype.kind == 'c' else out
+
+    def _synthesize(self, y, g):
+        K, D, L = self.K, self.D, self.L
+        M, Q = y.shape[-1], L // D
+        # v_m[r] = sum_k y_k[m] e^{j 2 pi k r / K}, one K-point FFT per frame
+        v = _scipy_fft().ifft(np.swapaxes(y, -1, -2), axis=-1) * K
+        if self.real and g.dtype.kind != 'c':
+            v = v.real  # Re(v g) = Re(v) g: overlap-add real samples only
+        # Frame m contributes g[l] v_m[l mod K] at output samples mD + l
+        segments = v[..., None, :] * g.reshape(L // K, K)
+        segments = segments.reshape(v.shape[:-1] + (Q, D))
+
+        out = np.zeros(v.shape[:-2] + (M + Q - 1, D), dtype=segments.dtype)
+        for q in range(Q):
+            out[..., q:q + M, :] += segments[..., q, :]
+        if self._tail is not None:
+            out[..., :Q - 1, :] += self._tail
+        self._tail = out[..., M:, :].copy()
+        return out[..., :M, :].reshape(v.shape[:-2] + (M * D,))
@@ -0,0 +1,336 @@
+"""
+Moving-Average and CIC Filters
+==============================
+
+O(N) filters for rectangular (boxcar) impulse responses.
+
+Convolving with h = [1, 1, ..., 1] (M taps) is a moving sum, which a
+running sum computes with one add and one subtract per sample instead of M
+multiply-adds. Cascading N moving sums and changing the rate gives the
+cascaded integrator-comb (CIC) decimators and interpolators used in
+multirate front ends (Lessons 14-15).
+
+All filters work along the last axis (shape (..., N), e.g. (channels, N))
+and are streaming: each ``process`` call continues where the previous one
+stopped, so a long signal can be fed block by block with the same result as
+one call on the whole signal.
+
+Integer inputs are accumulated exactly in int64. The CIC filters then use
+the classic integrator/comb structure, whose wrap-around arithmetic is
+exact as long as the output fits in 64 bits. Floating-point inputs use
+non-recursive running sums that are restarted on every block and every
+RUNNING_SUM_BLOCK samples within a block (utils/sparse_signals.py), so
+rounding errors do not build up over long streams or long blocks, and a
+NaN or inf only affects the outputs whose window contains it. The sums
+are always accumulated in float64; float32 / complex64 inputs give
+outputs in the same single precision. Do not mix integer and
+floating-point blocks in one stream.
+
+``discrete_convolution`` routes long boxcar kernels to the same running-sum
+algorithm automatically.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+
+from . import backends, precision
+from .instrumentation import instrument
+from .sparse_signals import _window_sums
+
+
+def _is_integer(x):
+    return x.dtype.kind in 'biu'
+
+
+def _accumulator_dtype(x):
+    """int64 for integer input, float64 (or complex128) otherwise."""
+    if _is_integer(x):
+        return np.dtype(np.int64)
+    return np.result_type(x.dtype, np.float64)
+
+
+def _output_dtype(x, normalize):
+    """Exact int64 for unnormalized integer input, else the input precision."""
+    if _is_integer(x) and not normalize:
+        return np.dtype(np.int64)
+    return precision.result_dtype(x)
+
+
+class MovingAverage:
+    """
+    Streaming causal moving average (or moving sum) of length M.
+
+    y[n] = (1/M) * (x[n] + x[n-1] + ... + x[n-M+1])
+
+    Parameters:
+    -----------
+    M : int
+        Window length in samples
+    normalize : bool
+        Divide by M (default: True). With normalize=False the filter is a
+        moving sum, and integer inputs give exact integer outputs.
+
+    Examples:
+    ---------
+    >>> ma = MovingAverage(64)
+    >>> y1 = ma.process(x[:4096])
+    >>> y2 = ma.process(x[4096:])   # continues seamlessly
+    """
+
+    def __init__(self, M, normalize=True):
+        if M < 1:
+            raise ValueError("M must be at least 1")
+        self.M = int(M)
+        self.normalize = normalize
+        self.reset()
+
+    def reset(self):
+        """Clear the filter history (as if all past inputs were zero)."""
+        self._history = None
+
+    @instrument(name='MovingAverage.process')
+    def process(self, x):
+        """
+        Filter the next block of samples.
+
+        Parameters:
+        -----------
+        x : array-like
+            Input block, shape (..., N)
+
+        Returns:
+        --------
+        y : ndarray
+            Output block, same shape as x
+        """
+        x = np.asarray(x)
+        y = self._sum(x)
+        if self.normalize:
+            y = y / self.M
+        return y.astype(_output_dtype(x, self.normalize), copy=False)
+
+    def _sum(self, x):
+        """Moving sum of the next block in the accumulator precision."""
+        acc = _accumulator_dtype(x)
+        M = self.M
+        if self._history is None:
+            self._history = np.zeros(x.shape[:-1] + (M - 1,), dtype=acc)
+
+        N = x.shape[-1]
+        ext = np.concatenate((self._history, x.astype(acc, copy=False)), axis=-1)
+        self._history = ext[..., N:].copy()
+        # Output n is the sum of ext[n:n + M], i.e. full-convolution index n + M - 1
+        return _window_sums(ext, M, acc)[..., M - 1:M - 1 + N]
+
+
+@instrument
+def moving_average(x, M, normalize=True):
+    """
+    Causal moving average of length M along the last axis.
+
+    Same as np.convolve(x, np.ones(M) / M)[:len(x)], computed in O(N).
+
+    Parameters:
+    -----------
+    x : array-like
+        Input signal, shape (..., N)
+    M : int
+        Window length
+    normalize : bool
+        Divide by M (default: True); False gives a moving sum
+
+    Returns:
+    --------
+    y : ndarray
+        Filtered signal, same shape as x
+
+    Examples:
+    ---------
+    >>> x = np.array([1, 2, 3, 4, 5])
+    >>> y = moving_average(x, 3)   # [1/3, 1, 2, 3, 4]
+    """
+    return MovingAverage(M, normalize=normalize).process(x)
+
+
+class _Comb:
+    """Streaming comb y[m] = x[m] - x[m-M] (low-rate section of a CIC)."""
+
+    def __init__(self, M):
+        self.M = M
+        self.history = None
+
+    def process(self, x):
+        if self.history is None:
+            self.history = np.zeros(x.shape[:-1] + (self.M,), dtype=x.dtype)
+        ext = np.concatenate((self.history, x), axis=-1)
+        self.history = ext[..., ext.shape[-1] - self.M:].copy()
+        return ext[..., self.M:] - ext[..., :-self.M]
+
+
+class _Integrators:
+    """
+    N cascaded streaming integrators y[n] = y[n-1] + x[n] (high-rate
+    section of a CIC), run by the recursive kernel of utils/backends.py.
+    """
+
+    def __init__(self, N):
+        self.N = N
+        self.state = None
+
+    def process(self, x):
+        if self.state is None:
+            self.state = np.zeros(x.shape[:-1] + (self.N,), dtype=x.dtype)
+        return backends.integrate(x, self.state)
+
+
+class CICDecimator:
+    """
+    Streaming CIC decimator: N stages of (R*M)-sample moving sums followed
+    by downsampling by R (keeping samples n = 0, R, 2R, ... as downsample()
+    does).
+
+    H(z) = ((1 - z^(-R*M)) / (1 - z^(-1)))^N, DC gain (R*M)^N
+
+    Parameters:
+    -----------
+    R : int
+        Decimation factor
+    N : int
+        Number of integrator/comb stages (default: 3)
+    M : int
+        Differential delay of the combs (default: 1)
+    normalize : bool
+        Divide by the DC gain (default: True). With normalize=False,
+        integer inputs give exact int64 outputs.
+
+    Examples:
+    ---------
+    >>> cic = CICDecimator(R=8, N=4)
+    >>> y = cic.process(x_int16_block)
+    """
+
+    def __init__(self, R, N=3, M=1, normalize=True):
+        if R < 1 or N < 1 or M < 1:
+            raise ValueError("R, N and M must be at least 1")
+        self.R, self.N, self.M = int(R), int(N), int(M)
+        self.normalize = normalize
+        self.gain = (self.R * self.M) ** self.N
+        self.reset()
+
+    def reset(self):
+        """Clear all filter state."""
+        self._phase = 0  # input samples to skip before the next output
+        self._integrators = _Integrators(self.N)
+        self._combs = [_Comb(self.M) for _ in range(self.N)]
+        self._sums = [MovingAverage(self.R * self.M, normalize=False)
+                      for _ in range(self.N)]
+
+    def _keep(self, y):
+        """Downsample a block by R, continuing the phase of previous blocks."""
+        kept = y[..., self._phase::self.R]
+        self._phase = (self._phase - y.shape[-1]) % self.R
+        return kept
+
+    @instrument(name='CICDecimator.process')
+    def process(self, x):
+        """
+        Filter and decimate the next block of samples.
+
+        Parameters:
+        -----------
+        x : array-like
+            Input block, shape (..., N_in)
+
+        Returns:
+        --------
+        y : ndarray
+            Decimated output, shape (..., number of kept samples)
+        """
+        x = np.asarray(x)
+        if _is_integer(x):
+            # Integrators at the input rate, combs at the output rate;
+            # int64 wrap-around cancels exactly in the combs
+            y = self._keep(self._integrators.process(x.astype(np.int64)))
+            for stage in self._combs:
+                y = stage.process(y)
+        else:
+            y = x
+            for stage in self._sums:
+                y = stage._sum(y)
+            y = self._keep(y)
+        if self.normalize:
+            y = y / self.gain
+        return y.astype(_output_dtype(x, self.normalize), copy=False)
+
+
+class CICInterpolator:
+    """
+    Streaming CIC interpolator: upsampling by R (zero insertion, as
+    upsample() does) followed by N stages of (R*M)-sample moving sums.
+
+    DC gain of the output is (R*M)^N / R.
+
+    Parameters:
+    -----------
+    R : int
+        Interpolation factor
+    N : int
+        Number of comb/integrator stages (default: 3)
+    M : int
+        Differential delay of the combs (default: 1)
+    normalize : bool
+        Divide by the DC gain (default: True). With normalize=False,
+        integer inputs give exact int64 outputs.
+    """
+
+    def __init__(self, R, N=3, M=1, normalize=True):
+        if R < 1 or N < 1 or M < 1:
+            raise ValueError("R, N and M must be at least 1")
+        self.R, self.N, self.M = int(R), int(N), int(M)
+        self.normalize = normalize
+        self.gain = (self.R * self.M) ** self.N / self.R
+        self.reset()
+
+    def reset(self):
+        """Clear all filter state."""
+        self._combs = [_Comb(self.M) for _ in range(self.N)]
+        self._integrators = _Integrators(self.N)
+        self._sums = [MovingAverage(self.R * self.M, normalize=False)
+                      for _ in range(self.N)]
+
+    def _upsample(self, x):
+        y = np.zeros(x.shape[:-1] + (x.shape[-1] * self.R,), dtype=x.dtype)
+        y[..., ::self.R] = x
+        return y
+
+    @instrument(name='CICInterpolator.process')
+    def process(self, x):
+        """
+        Interpolate and filter the next block of samples.
+
+        Parameters:
+        -----------
+        x : array-like
+            Input block, shape (..., N_in)
+
+        Returns:
+        --------
+        y : ndarray
+            Output block, shape (..., R * N_in)
+        """
+        x = np.asarray(x)
+        if _is_integer(x):
+            # Combs at the input rate, integrators at the output rate
+            y = x.astype(np.int64)
+            for stage in self._combs:
+                y = stage.process(y)
+            y = self._integrators.process(self._upsample(y))
+        else:
+            y = self._upsample(x.astype(_accumulator_dtype(x), copy=False))
+            for stage in self._sums:
+                y = stage._sum(y)
+        if self.normalize:
+            y = y / self.gain
+        return y.astype(_output_dtype(x, self.normalize), copy=False)
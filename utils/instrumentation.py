@@ -0,0 +1,301 @@
+"""
+DSP Instrumentation
+===================
+
+Opt-in profiling hooks for the DSP routines in this package.
+
+Functions decorated with ``@instrument`` record per-call wall time, the
+number of samples processed, the bytes allocated and the resulting
+throughput, but only while a ``profiling()`` context is active. Outside of
+it the decorator costs a single flag check per call.
+
+Examples:
+---------
+>>> from utils import common_functions as cf
+>>> from utils.instrumentation import profiling
+>>> with profiling() as stats:
+...     x = cf.exponential_sequence(np.arange(10**6), 0.999)
+...     y = cf.db(x)
+>>> stats.summary()['db']['calls']
+1
+>>> stats.write_json('profile.json')
+>>> stats.write_folded('profile.folded')   # flamegraph.pl / speedscope input
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+
+# The registry currently collecting statistics (None = instrumentation off).
+# Kept as a plain module global so the disabled check is as cheap as possible.
+_active = None
+_active_lock = threading.Lock()
+
+# Per-thread call stacks, used to attribute self time for flame graphs.
+_local = threading.local()
+
+
+class CallStats:
+    """Accumulated statistics for one instrumented function."""
+
+    __slots__ = ('calls', 'total_time', 'min_time', 'max_time',
+                 'samples', 'bytes_allocated')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.min_time = float('inf')
+        self.max_time = 0.0
+        self.samples = 0
+        self.bytes_allocated = 0
+
+    def add(self, elapsed, samples, nbytes):
+        self.calls += 1
+        self.total_time += elapsed
+        self.min_time = min(self.min_time, elapsed)
+        self.max_time = max(self.max_time, elapsed)
+        self.samples += samples
+        self.bytes_allocated += nbytes
+
+    def as_dict(self):
+        """Return the statistics as a JSON-serialisable dictionary."""
+        return {
+            'calls': self.calls,
+            'total_seconds': self.total_time,
+            'mean_seconds': self.total_time / self.calls if self.calls else 0.0,
+            'min_seconds': self.min_time if self.calls else 0.0,
+            'max_seconds': self.max_time,
+            'samples': self.samples,
+            'bytes_allocated': self.bytes_allocated,
+            'samples_per_second': (self.samples / self.total_time
+                                   if self.total_time > 0 else 0.0),
+        }
+
+
+class Registry:
+    """
+    Thread-safe collection of call statistics and flame-graph stacks.
+
+    A Registry is returned by ``profiling()``; it can be inspected while
+    the context is active and after it has exited.
+
+    Parameters:
+    -----------
+    trace_memory : bool
+        If True, bytes allocated are measured with tracemalloc (peak traced
+        memory during the call, NumPy buffers included; a nested
+        instrumented call restarts the peak of its caller). If False, only
+        the size of the returned arrays is counted, which is much cheaper.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self._stats = {}
+        self._stacks = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, stack, elapsed, self_time, samples, nbytes):
+        """Add one call of `name` (made from call `stack`) to the registry."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = CallStats()
+            stats.add(elapsed, samples, nbytes)
+            self._stacks[stack] = self._stacks.get(stack, 0.0) + self_time
+
+    def reset(self):
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._stats.clear()
+            self._stacks.clear()
+
+    def summary(self):
+        """
+        Summarise the recorded calls.
+
+        Returns:
+        --------
+        summary : dict
+            Maps each function name to a dict with calls, total/mean/min/max
+            seconds, samples, bytes_allocated and samples_per_second
+        """
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._stats.items())}
+
+    def to_json(self, indent=2):
+        """Return the summary as a JSON string."""
+        return json.dumps(self.summary(), indent=indent)
+
+    def write_json(self, path):
+        """Write the summary as JSON to `path`."""
+        Path(path).write_text(self.to_json() + '\n')
+
+    def to_folded(self):
+        """
+        Return the call stacks in "folded" flame-graph format.
+
+        Each line is ``outer;inner;leaf <microseconds>`` giving the self time
+        spent in that stack, as consumed by flamegraph.pl, inferno and
+        speedscope.
+        """
+        with self._lock:
+            items = sorted(self._stacks.items())
+        return ''.join('%s %d\n' % (stack, round(t * 1e6)) for stack, t in items)
+
+    def write_folded(self, path):
+        """Write the folded flame-graph stacks to `path`."""
+        Path(path).write_text(self.to_folded())
+
+
+def _count_samples(args, kwargs):
+    """Number of samples in the first array-like argument."""
+    for value in args + tuple(kwargs.values()):
+        if isinstance(value, np.ndarray):
+            return value.size
+        if isinstance(value, (list, tuple, range)):
+            return len(value)
+    return 0
+
+
+def _result_bytes(result):
+    """Size in bytes of the array(s) returned by a call."""
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, tuple):
+        return sum(r.nbytes for r in result if isinstance(r, np.ndarray))
+    return 0
+
+
+def instrument(func=None, *, name=None):
+    """
+    Decorator that records timing statistics for a DSP routine.
+
+    When no ``profiling()`` context is active the wrapped function is called
+    directly after a single global check.
+
+    Parameters:
+    -----------
+    func : callable
+        Function to instrument
+    name : str, optional
+        Name used in reports (default: the function's qualified name)
+
+    Returns:
+    --------
+    wrapper : callable
+        Instrumented function
+
+    Examples:
+    ---------
+    >>> @instrument
+    ... def moving_sum(x, M):
+    ...     return np.convolve(x, np.ones(M))
+    """
+    if func is None:
+        return functools.partial(instrument, name=name)
+
+    label = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        registry = _active
+        if registry is None:
+            return func(*args, **kwargs)
+        return _call(registry, label, func, args, kwargs)
+
+    return wrapper
+
+
+def _call(registry, label, func, args, kwargs):
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    # Each frame is [name, time spent in instrumented children]
+    frame = [label, 0.0]
+    stack.append(frame)
+
+    if registry.trace_memory:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        path = ';'.join(f[0] for f in stack)
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+
+    if registry.trace_memory:
+        nbytes = max(0, tracemalloc.get_traced_memory()[1] - before)
+    else:
+        nbytes = _result_bytes(result)
+
+    registry.record(label, path, elapsed, max(0.0, elapsed - frame[1]),
+                    _count_samples(args, kwargs), nbytes)
+    return result
+
+
+def is_enabled():
+    """Return True if a profiling() context is currently active."""
+    return _active is not None
+
+
+@contextmanager
+def profiling(trace_memory=False, registry=None):
+    """
+    Context manager that enables instrumentation for its duration.
+
+    Contexts may be nested; the innermost registry receives the calls and
+    the previous one is restored on exit. Calls made from other threads
+    while the context is active are recorded as well.
+
+    Parameters:
+    -----------
+    trace_memory : bool
+        Measure allocations with tracemalloc instead of counting the size of
+        returned arrays (default: False). Slower, but includes temporaries.
+    registry : Registry, optional
+        Registry to collect into, e.g. to accumulate over several contexts
+        (default: a new Registry)
+
+    Yields:
+    -------
+    registry : Registry
+        The registry holding the collected statistics
+
+    Examples:
+    ---------
+    >>> with profiling() as stats:
+    ...     y = db(x)
+    >>> print(stats.to_json())
+    """
+    global _active
+    if registry is None:
+        registry = Registry(trace_memory=trace_memory)
+    started_tracing = registry.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    with _active_lock:
+        previous = _active
+        _active = registry
+    try:
+        yield registry
+    finally:
+        with _active_lock:
+            _active = previous
+        if started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
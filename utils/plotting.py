@@ -0,0 +1,286 @@
+"""
+Plotting Helpers for the Lesson Examples
+========================================
+
+Fast, optionally headless figure rendering for the example scripts.
+
+* matplotlib is imported lazily, and a non-interactive backend (Agg) is
+  selected first when running headless (``--headless`` or DSP_HEADLESS=1).
+* ``stem`` draws short signals with ``Axes.stem`` exactly as before, long
+  signals as a single LineCollection, and signals with millions of samples
+  as a min/max envelope so the plot cost no longer grows with the length.
+* ``render_figures`` builds and saves a batch of figures, in parallel
+  worker processes when running headless.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# Signals up to this length are drawn with Axes.stem (markers and all)
+STEM_LIMIT = 200
+# Up to this length a LineCollection stem also gets small markers
+MARKER_LIMIT = 2000
+# Longer signals are reduced to this many min/max envelope bins
+ENVELOPE_BINS = 4000
+
+_headless = False
+
+
+def headless_requested(argv=None):
+    """
+    Return True if headless rendering was requested.
+
+    Headless mode is requested with the ``--headless`` command-line flag or
+    by setting the DSP_HEADLESS environment variable to a non-empty value
+    other than '0'.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    return '--headless' in argv or os.environ.get('DSP_HEADLESS', '0') not in ('', '0')
+
+
+def render_options(argv=None):
+    """
+    Parse the rendering flags shared by the example scripts.
+
+    Recognised flags are ``--headless`` (save figures without opening a
+    window) and ``--workers N`` (number of rendering processes). A missing
+    or invalid ``--workers`` value exits with a usage message; arguments
+    the examples do not know are ignored.
+
+    Returns:
+    --------
+    options : dict
+        Keyword arguments ``show`` and ``workers`` for an example's main()
+    """
+    import argparse
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = argparse.ArgumentParser(description="Render the example's figures.")
+    parser.add_argument('--headless', action='store_true',
+                        help='save figures without opening a window')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='number of rendering processes')
+    options, _ = parser.parse_known_args(argv)
+    if options.workers is not None and options.workers < 1:
+        parser.error("--workers must be at least 1")
+    return {'show': not headless_requested(argv), 'workers': options.workers}
+
+
+def use_headless():
+    """Select the non-interactive Agg backend for all following figures."""
+    global _headless
+    _headless = True
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def get_pyplot():
+    """
+    Import and return matplotlib.pyplot.
+
+    The import happens on first use, so scripts that only compute (or are
+    imported for their helper functions) never pay for it. If headless mode
+    was requested, the Agg backend is selected before pyplot is loaded.
+    """
+    if 'matplotlib.pyplot' not in sys.modules and (_headless or headless_requested()):
+        use_headless()
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def minmax_envelope(n, x, bins=ENVELOPE_BINS):
+    """
+    Reduce a long signal to per-bin minimum and maximum values.
+
+    Plotting the envelope preserves every peak of the signal while drawing a
+    fixed number of segments, however many samples there are.
+
+    Parameters:
+    -----------
+    n : array-like
+        Time indices
+    x : array-like
+        Signal values (real)
+    bins : int
+        Number of output bins (default: ENVELOPE_BINS)
+
+    Returns:
+    --------
+    n_bins : ndarray
+        Time index at the start of each bin
+    x_min : ndarray
+        Minimum of x within each bin
+    x_max : ndarray
+        Maximum of x within each bin
+
+    Examples:
+    ---------
+    >>> n = np.arange(10**7)
+    >>> n_bins, lo, hi = minmax_envelope(n, np.cos(0.001 * n), bins=1000)
+    """
+    n = np.asarray(n)
+    x = np.asarray(x)
+    if len(x) <= bins:
+        return n, x, x
+    edges = np.linspace(0, len(x), bins, endpoint=False).astype(np.intp)
+    edges = np.unique(edges)
+    return n[edges], np.minimum.reduceat(x, edges), np.maximum.reduceat(x, edges)
+
+
+def _fmt_color(fmt, default):
+    """Extract the color part of a matplotlib format string such as 'C1-'."""
+    if not fmt:
+        return default
+    if fmt[0] == 'C' and fmt[1:2].isdigit():
+        return fmt[:2]
+    if fmt[0] in 'bgrcmykw':
+        return fmt[0]
+    return default
+
+
+def stem(ax, n, x, linefmt='C0-', markerfmt=None, basefmt=' ', label=None,
+         bins=ENVELOPE_BINS):
+    """
+    Draw a stem plot, scaling to very long signals.
+
+    Signals of up to STEM_LIMIT samples are drawn with ``ax.stem`` so short
+    lesson figures look exactly as before. Longer signals are drawn as one
+    LineCollection (markers are dropped above MARKER_LIMIT), and signals
+    longer than `bins` samples are first reduced with ``minmax_envelope``.
+
+    Parameters:
+    -----------
+    ax : matplotlib.axes.Axes
+        Axes to draw into
+    n : array-like
+        Time indices
+    x : array-like
+        Signal values
+    linefmt : str
+        Format of the stem lines (default: 'C0-')
+    markerfmt : str, optional
+        Format of the markers (default: the line color with 'o')
+    basefmt : str
+        Format of the baseline; ' ' draws none (default: ' ')
+    label : str, optional
+        Legend label
+    bins : int
+        Envelope size for very long signals (default: ENVELOPE_BINS)
+
+    Returns:
+    --------
+    artist : matplotlib artist
+        The StemContainer or LineCollection that was drawn
+    """
+    n = np.asarray(n)
+    x = np.asarray(x)
+    color = _fmt_color(linefmt, 'C0')
+    if markerfmt is None:
+        markerfmt = color + 'o'
+
+    if len(x) <= STEM_LIMIT:
+        return ax.stem(n, x, linefmt=linefmt, markerfmt=markerfmt,
+                       basefmt=basefmt, label=label)
+
+    from matplotlib.collections import LineCollection
+
+    if len(x) > bins:
+        n_plot, lo, hi = minmax_envelope(n, x, bins)
+        lo = np.minimum(lo, 0)
+        hi = np.maximum(hi, 0)
+    else:
+        n_plot, lo, hi = n, np.minimum(x, 0), np.maximum(x, 0)
+
+    segments = np.empty((len(n_plot), 2, 2))
+    segments[:, 0, 0] = n_plot
+    segments[:, 1, 0] = n_plot
+    segments[:, 0, 1] = lo
+    segments[:, 1, 1] = hi
+    lines = LineCollection(segments, colors=color, linewidths=1.0, label=label)
+    ax.add_collection(lines, autolim=True)
+
+    if len(x) <= MARKER_LIMIT:
+        ax.plot(n, x, linestyle='none', marker=markerfmt[-1:] or 'o',
+                color=_fmt_color(markerfmt, color), markersize=3)
+    if basefmt.strip():
+        ax.axhline(0, color=_fmt_color(basefmt, 'C3'), linewidth=1)
+    ax.autoscale_view()
+    return lines
+
+
+def save_figure(fig, output_path, dpi=150, close=False):
+    """
+    Save a figure and report where it went.
+
+    Parameters:
+    -----------
+    fig : matplotlib.figure.Figure
+        Figure to save
+    output_path : str or Path
+        Destination file
+    dpi : int
+        Resolution (default: 150)
+    close : bool
+        Close the figure afterwards to release its memory (default: False)
+    """
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    if close:
+        get_pyplot().close(fig)
+
+
+def _render_job(job):
+    builder, kwargs, output_path, dpi = job
+    fig = builder(**kwargs)
+    save_figure(fig, output_path, dpi=dpi, close=True)
+    return str(output_path)
+
+
+def render_figures(jobs, show=False, workers=None, dpi=150):
+    """
+    Build and save a batch of figures.
+
+    Parameters:
+    -----------
+    jobs : list of (builder, kwargs, output_path)
+        `builder(**kwargs)` must return a matplotlib Figure. Builders must
+        be module-level functions so they can be sent to worker processes.
+    show : bool
+        If True, render in this process and open the figures in a window
+        once all are saved. If False, render headless (default: False).
+    workers : int, optional
+        Number of worker processes for headless rendering (default: one
+        per CPU, capped at the number of jobs; 1 renders in-process)
+    dpi : int
+        Resolution of the saved figures (default: 150)
+
+    Returns:
+    --------
+    paths : list of str
+        The saved figure paths, in job order
+    """
+    jobs = [(builder, kwargs, path, dpi) for builder, kwargs, path in jobs]
+
+    if show:
+        plt = get_pyplot()
+        paths = []
+        for builder, kwargs, path, dpi in jobs:
+            save_figure(builder(**kwargs), path, dpi=dpi)
+            paths.append(str(path))
+        plt.show()
+        return paths
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    if workers == 1:
+        use_headless()
+        return [_render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_headless) as pool:
+        return list(pool.map(_render_job, jobs))
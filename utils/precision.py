@@ -0,0 +1,181 @@
+"""
+Precision Policy
+================
+
+Library-wide choice of floating-point precision.
+
+Every generator and processing routine in utils takes a per-call `dtype`
+(or keeps the precision of its input). When no dtype is given, the
+library default below is used; it is float64 unless changed, so existing
+code keeps its results. Switching it to float32 halves the memory traffic
+of every signal, e.g. for float32 audio:
+
+    >>> from utils import precision
+    >>> with precision.precision(np.float32):
+    ...     x = unit_step(range(10**6))      # float32
+    ...     y = discrete_convolution(x, h)   # stays float32 (h float32)
+
+Processing routines follow their inputs: float32 (complex64) in gives
+float32 (complex64) out, and only integer inputs fall back to the default.
+
+Sums over many samples lose accuracy in single precision. Running sums
+(moving averages, CIC filters, rect convolution) therefore always
+accumulate in float64. For the remaining routines (convolution, FFT
+convolution) a wider accumulation precision can be requested with
+``accumulate``; results are still returned in the output precision.
+
+The policy is process-wide, like the instrumentation switch: set it once
+at start-up or around a block of code, not concurrently from threads.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# Precisions the default may be set to
+SUPPORTED_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+_default_dtype = np.dtype(np.float64)
+_accumulate_dtype = None  # None = accumulate in the output precision
+_lock = threading.Lock()
+
+
+def _check_real(dtype):
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'c':
+        dtype = np.finfo(dtype).dtype  # complex64 -> float32
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"unsupported precision {dtype}; "
+                         "use float32 or float64")
+    return dtype
+
+
+def get_default_dtype():
+    """Return the default real dtype used when no dtype is given."""
+    return _default_dtype
+
+
+def set_default_dtype(dtype):
+    """
+    Set the default real dtype (float32 or float64).
+
+    A complex dtype selects its real precision (complex64 -> float32).
+
+    Returns:
+    --------
+    previous : np.dtype
+        The previous default, e.g. to restore it later
+    """
+    global _default_dtype
+    with _lock:
+        previous, _default_dtype = _default_dtype, _check_real(dtype)
+    return previous
+
+
+def get_accumulate_dtype():
+    """Return the accumulation dtype, or None to accumulate in the output dtype."""
+    return _accumulate_dtype
+
+
+def set_accumulate_dtype(dtype):
+    """
+    Set the precision that convolution sums are accumulated in.
+
+    Parameters:
+    -----------
+    dtype : dtype or None
+        float64 to accumulate single-precision work in double precision,
+        or None to accumulate in the output precision (fastest)
+
+    Returns:
+    --------
+    previous : np.dtype or None
+        The previous setting
+    """
+    global _accumulate_dtype
+    with _lock:
+        previous = _accumulate_dtype
+        _accumulate_dtype = None if dtype is None else _check_real(dtype)
+    return previous
+
+
+_UNCHANGED = object()
+
+
+@contextmanager
+def precision(dtype=None, accumulate=_UNCHANGED):
+    """
+    Context manager that sets the precision policy for its duration.
+
+    Parameters:
+    -----------
+    dtype : dtype, optional
+        Default real dtype inside the context (default: unchanged)
+    accumulate : dtype or None, optional
+        Accumulation dtype inside the context (default: unchanged)
+
+    Examples:
+    ---------
+    >>> with precision(np.float32, accumulate=np.float64):
+    ...     y = discrete_convolution(x32, h32)   # float32, summed in float64
+    """
+    previous_dtype = set_default_dtype(dtype) if dtype is not None else None
+    previous_acc = (set_accumulate_dtype(accumulate)
+                    if accumulate is not _UNCHANGED else _UNCHANGED)
+    try:
+        yield
+    finally:
+        if previous_dtype is not None:
+            set_default_dtype(previous_dtype)
+        if previous_acc is not _UNCHANGED:
+            set_accumulate_dtype(previous_acc)
+
+
+def real_dtype(dtype=None):
+    """Output dtype for a generated real signal: dtype, or the default."""
+    return _default_dtype if dtype is None else np.dtype(dtype)
+
+
+def complex_dtype(dtype=None):
+    """Complex dtype with the precision of real_dtype(dtype) (float32 -> complex64)."""
+    return np.result_type(real_dtype(dtype), np.complex64)
+
+
+def result_dtype(*arrays):
+    """
+    Floating-point output dtype for processing the given arrays or dtypes.
+
+    Floating and complex inputs keep their (promoted) precision; integer
+    and boolean inputs give the default dtype.
+    """
+    dtype = np.result_type(*arrays)
+    if dtype.kind in 'fc':
+        return dtype
+    return _default_dtype
+
+
+def accumulator_dtype(dtype):
+    """Dtype to accumulate sums in for an output of the given dtype."""
+    dtype = np.dtype(dtype)
+    if _accumulate_dtype is None or dtype.kind not in 'fc':
+        return dtype
+    return np.result_type(dtype, _accumulate_dtype)
+
+
+def max_relative_error(approx, reference):
+    """
+    Largest error of `approx` relative to the peak magnitude of `reference`.
+
+    Used to bound single-precision results against float64 references.
+    """
+    approx = np.asarray(approx)
+    reference = np.asarray(reference)
+    scale = np.max(np.abs(reference)) if reference.size else 0.0
+    if scale == 0:
+        return float(np.max(np.abs(approx), initial=0.0))
+    return float(np.max(np.abs(approx.astype(reference.dtype) - reference)) / scale)
@@ -0,0 +1,458 @@
+"""
+Sparse and Run-Length Signals
+=============================
+
+Compact representations for event-like signals that are mostly zero or
+piecewise constant, such as impulse trains, rectangular pulses and steps.
+
+* SparseSignal    - nonzero samples stored as (index, value) pairs
+* RunLengthSignal - constant segments stored as (start, stop, value)
+
+Both cover the time indices n = start, ..., start + length - 1, convert to
+NumPy arrays on demand (``np.asarray(sig)``, ``to_dense`` or block by block
+with ``blocks``) and provide fast convolution with a dense signal:
+
+* convolving with an impulse train is a scatter-add of shifted copies,
+  costing O(nnz * N) instead of O(length * N)
+* convolving with a rect is a difference of running sums, costing O(N) per
+  segment however long the segment is
+
+Floating-point running sums restart every RUNNING_SUM_BLOCK samples, so
+their rounding error does not grow with the signal length.
+
+``discrete_convolution`` in utils/common_functions.py routes to these
+automatically.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+
+from . import precision
+from .instrumentation import instrument
+
+
+def _time_axis(n):
+    """Return (start, length) for a range or an array of consecutive indices."""
+    if isinstance(n, range):
+        if n.step != 1:
+            raise ValueError("time indices must have step 1")
+        return n.start, len(n)
+    n = np.asarray(n)
+    if n.ndim != 1 or (n.size > 1 and np.any(np.diff(n) != 1)):
+        raise ValueError("time indices must be consecutive integers")
+    return (int(n[0]) if n.size else 0), n.size
+
+
+def _accumulator_dtype(dtype):
+    """Dtype used for running sums: int64 for integers, float64 or wider otherwise."""
+    if dtype.kind in 'biu':
+        return np.dtype(np.int64)
+    return np.result_type(dtype, np.float64)
+
+
+# Floating-point running sums restart every this many outputs (or every
+# two window lengths, if longer)
+RUNNING_SUM_BLOCK = 4096
+
+
+def _window_sums(x, width, acc):
+    """
+    Full convolution of x with `width` ones along the last axis, in acc.
+
+    y[m] = x[m - width + 1] + ... + x[m] is a difference of running sums.
+    Integers use one running sum over the whole signal, which is exact
+    (int64 wrap-around cancels in the difference). Floating-point running
+    sums restart every block, so the cancellation error is proportional
+    to the block and the window, not to the length of the signal; inputs
+    containing NaN or inf are summed directly, as np.convolve does.
+    """
+    if acc.kind in 'fc' and not np.isfinite(x).all():
+        # A running sum would turn one inf into NaN for the rest of its
+        # block (inf - inf): add the window directly instead
+        return np.apply_along_axis(np.convolve, -1, np.asarray(x, dtype=acc),
+                                   np.ones(width, dtype=acc))
+    N = x.shape[-1]
+    size = N + width - 1
+    if N == 0:
+        return np.zeros(x.shape[:-1] + (size,), dtype=acc)
+    block = size if acc.kind in 'biu' else max(RUNNING_SUM_BLOCK, 2 * width)
+    count = -(-size // block)
+    # x with width - 1 leading zeros, padded to whole blocks
+    xp = np.zeros(x.shape[:-1] + (count * block + width - 1,), dtype=acc)
+    xp[..., width - 1:width - 1 + N] = x
+    # Block k needs xp[k*block : (k+1)*block + width - 1]
+    windows = np.lib.stride_tricks.sliding_window_view(
+        xp, block + width - 1, axis=-1)[..., ::block, :]
+    C = np.zeros(windows.shape[:-1] + (block + width,), dtype=acc)
+    np.cumsum(windows, axis=-1, out=C[..., 1:])
+    y = C[..., width:] - C[..., :block]
+    return y.reshape(x.shape[:-1] + (count * block,))[..., :size]
+
+
+class SparseSignal:
+    """
+    Signal that is zero except at a few samples.
+
+    Parameters:
+    -----------
+    indices : array-like of int
+        Positions of the nonzero samples, relative to the first sample
+        (0 <= index < length)
+    values : scalar or array-like
+        Sample values (a scalar is used for every index)
+    length : int
+        Total number of samples
+    start : int
+        Time index of the first sample (default: 0)
+    dtype : dtype, optional
+        Sample dtype (default: that of `values`, at least
+        get_default_dtype() for Python scalars)
+
+    Examples:
+    ---------
+    >>> n = range(0, 10**7)
+    >>> train = SparseSignal.impulses(n, n0=[0, 2500, 90000])
+    >>> train.nnz
+    3
+    >>> y = train.convolve(h)    # same as np.convolve(np.asarray(train), h)
+    """
+
+    def __init__(self, indices, values, length, start=0, dtype=None):
+        indices = np.asarray(indices, dtype=np.int64).ravel()
+        if dtype is None:
+            if np.isscalar(values):
+                dtype = np.result_type(values, precision.get_default_dtype())
+            else:
+                dtype = np.asarray(values).dtype
+        values = np.broadcast_to(np.asarray(values, dtype=dtype), indices.shape)
+
+        if indices.size and (indices.min() < 0 or indices.max() >= length):
+            raise ValueError("indices must lie in [0, length)")
+
+        # Keep indices sorted and unique (duplicate indices are summed)
+        unique, inverse = np.unique(indices, return_inverse=True)
+        summed = np.zeros(unique.shape, dtype=dtype)
+        np.add.at(summed, inverse, values)
+
+        self.indices = unique
+        self.values = summed
+        self.length = int(length)
+        self.start = int(start)
+
+    @classmethod
+    def impulses(cls, n, n0=0, values=1.0, dtype=None):
+        """
+        Sparse counterpart of unit_impulse(n, n0).
+
+        Parameters:
+        -----------
+        n : range or array-like
+            Consecutive time indices
+        n0 : int or array-like
+            Position(s) of the impulse(s) (default: 0)
+        values : scalar or array-like
+            Impulse amplitude(s) (default: 1.0)
+        dtype : dtype, optional
+            Sample dtype (default: get_default_dtype())
+        """
+        start, length = _time_axis(n)
+        n0 = np.atleast_1d(np.asarray(n0, dtype=np.int64))
+        values = np.broadcast_to(np.asarray(values), n0.shape)
+        inside = (n0 >= start) & (n0 < start + length)
+        return cls(n0[inside] - start, values[inside], length, start,
+                   dtype=precision.real_dtype(dtype))
+
+    @classmethod
+    def from_dense(cls, x, start=0):
+        """Build a SparseSignal from the nonzero samples of a 1-D array."""
+        x = np.asarray(x)
+        indices = np.flatnonzero(x)
+        return cls(indices, x[indices], len(x), start, dtype=x.dtype)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def nnz(self):
+        """Number of nonzero samples."""
+        return self.indices.size
+
+    @property
+    def n(self):
+        """Time indices covered by the signal."""
+        return range(self.start, self.start + self.length)
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return (f"SparseSignal(nnz={self.nnz}, length={self.length}, "
+                f"start={self.start}, dtype={self.dtype})")
+
+    def __array__(self, dtype=None, copy=None):
+        x = self.to_dense()
+        return x if dtype is None else x.astype(dtype, copy=False)
+
+    def to_dense(self, start=None, stop=None):
+        """
+        Convert (part of) the signal to a dense array.
+
+        Parameters:
+        -----------
+        start, stop : int, optional
+            Time index range [start, stop) to return (default: the whole
+            signal). Samples outside the signal are zero.
+
+        Returns:
+        --------
+        x : ndarray
+            Dense samples for n = start, ..., stop - 1
+        """
+        start = self.start if start is None else start
+        stop = self.start + self.length if stop is None else stop
+        x = np.zeros(max(0, stop - start), dtype=self.dtype)
+        lo, hi = np.searchsorted(self.indices, [start - self.start, stop - self.start])
+        x[self.indices[lo:hi] + self.start - start] = self.values[lo:hi]
+        return x
+
+    def blocks(self, block_size):
+        """
+        Iterate over the signal as consecutive dense blocks.
+
+        Only one block is materialised at a time, so very long signals can
+        be streamed through dense processing stages.
+
+        Yields:
+        -------
+        block : ndarray
+            Dense block of at most `block_size` samples
+        """
+        stop = self.start + self.length
+        for first in range(self.start, stop, block_size):
+            yield self.to_dense(first, min(first + block_size, stop))
+
+    @instrument(name='SparseSignal.convolve')
+    def convolve(self, x):
+        """
+        Full linear convolution with a dense signal by scatter-add.
+
+        Equivalent to np.convolve(np.asarray(self), x) (along the last axis
+        of x for multichannel input), but costs O(nnz * len(x)).
+
+        Parameters:
+        -----------
+        x : array-like
+            Dense signal, shape (..., N)
+
+        Returns:
+        --------
+        y : ndarray
+            Convolution, shape (..., length + N - 1)
+        """
+        x = np.asarray(x)
+        N = x.shape[-1]
+        dtype = np.result_type(self.dtype, x.dtype)
+        y = np.zeros(x.shape[:-1] + (self.length + N - 1,), dtype=dtype)
+
+        if self.nnz <= N:
+            # Add one scaled, shifted copy of x per impulse
+            for k, v in zip(self.indices, self.values):
+                y[..., k:k + N] += v * x
+        else:
+            # Dense impulse train, short x: scatter one tap of x at a time
+            for j in range(N):
+                y[..., self.indices + j] += x[..., j, None] * self.values
+        return y
+
+
+class RunLengthSignal:
+    """
+    Piecewise-constant signal stored as constant segments.
+
+    Segment i holds `values[i]` on the relative positions
+    starts[i] <= k < stops[i]; every other sample is zero. Segments may
+    overlap, in which case their values add.
+
+    Parameters:
+    -----------
+    starts, stops : array-like of int
+        Segment bounds relative to the first sample (0 <= start <= stop <= length)
+    values : scalar or array-like
+        Segment values (a scalar is used for every segment)
+    length : int
+        Total number of samples
+    start : int
+        Time index of the first sample (default: 0)
+    dtype : dtype, optional
+        Sample dtype (default: get_default_dtype())
+
+    Examples:
+    ---------
+    >>> n = range(-5, 10**6)
+    >>> pulse = RunLengthSignal.rect(n, -2, 2)     # rect_pulse(n, -2, 2)
+    >>> y = pulse.convolve(x)                       # O(len(x)) moving sum
+    """
+
+    def __init__(self, starts, stops, values, length, start=0, dtype=None):
+        self.starts = np.asarray(starts, dtype=np.int64).ravel()
+        self.stops = np.asarray(stops, dtype=np.int64).ravel()
+        if self.starts.shape != self.stops.shape:
+            raise ValueError("starts and stops must have the same length")
+        if self.starts.size and (self.starts.min() < 0 or self.stops.max() > length
+                                 or np.any(self.stops < self.starts)):
+            raise ValueError("segments must satisfy 0 <= start <= stop <= length")
+        dtype = precision.real_dtype(dtype)
+        self.values = np.broadcast_to(np.asarray(values, dtype=dtype),
+                                      self.starts.shape).copy()
+        self.length = int(length)
+        self.start = int(start)
+
+    @classmethod
+    def rect(cls, n, n1, n2, amplitude=1.0, dtype=None):
+        """Run-length counterpart of rect_pulse(n, n1, n2) (n1..n2 inclusive)."""
+        start, length = _time_axis(n)
+        lo = min(max(n1 - start, 0), length)
+        hi = min(max(n2 - start + 1, lo), length)
+        return cls([lo], [hi], amplitude, length, start, dtype)
+
+    @classmethod
+    def step(cls, n, n0=0, amplitude=1.0, dtype=None):
+        """Run-length counterpart of unit_step(n, n0)."""
+        start, length = _time_axis(n)
+        lo = min(max(n0 - start, 0), length)
+        return cls([lo], [length], amplitude, length, start, dtype)
+
+    @classmethod
+    def from_dense(cls, x, start=0):
+        """Build a RunLengthSignal from the nonzero runs of a 1-D array."""
+        x = np.asarray(x)
+        if x.size == 0:
+            return cls([], [], 0, 0, start, x.dtype)
+        edges = np.flatnonzero(x[1:] != x[:-1]) + 1
+        starts = np.concatenate(([0], edges))
+        stops = np.concatenate((edges, [x.size]))
+        values = x[starts]
+        keep = values != 0
+        return cls(starts[keep], stops[keep], values[keep], x.size, start, x.dtype)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def n(self):
+        """Time indices covered by the signal."""
+        return range(self.start, self.start + self.length)
+
+    @property
+    def segments(self):
+        """Number of constant segments."""
+        return self.starts.size
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return (f"RunLengthSignal(segments={self.segments}, length={self.length}, "
+                f"start={self.start}, dtype={self.dtype})")
+
+    def __array__(self, dtype=None, copy=None):
+        x = self.to_dense()
+        return x if dtype is None else x.astype(dtype, copy=False)
+
+    def to_dense(self, start=None, stop=None):
+        """
+        Convert (part of) the signal to a dense array.
+
+        Parameters:
+        -----------
+        start, stop : int, optional
+            Time index range [start, stop) to return (default: the whole
+            signal). Samples outside the signal are zero.
+
+        Returns:
+        --------
+        x : ndarray
+            Dense samples for n = start, ..., stop - 1
+        """
+        start = self.start if start is None else start
+        stop = self.start + self.length if stop is None else stop
+        x = np.zeros(max(0, stop - start), dtype=self.dtype)
+        offset = self.start - start
+        lo = np.clip(self.starts + offset, 0, x.size)
+        hi = np.clip(self.stops + offset, 0, x.size)
+        for a, b, v in zip(lo, hi, self.values):
+            if a < b:
+                x[a:b] += v
+        return x
+
+    def blocks(self, block_size):
+        """
+        Iterate over the signal as consecutive dense blocks.
+
+        Yields:
+        -------
+        block : ndarray
+            Dense block of at most `block_size` samples
+        """
+        stop = self.start + self.length
+        for first in range(self.start, stop, block_size):
+            yield self.to_dense(first, min(first + block_size, stop))
+
+    @instrument(name='RunLengthSignal.convolve')
+    def convolve(self, x):
+        """
+        Full linear convolution with a dense signal by running sums.
+
+        A segment of value v on [s, e) contributes v times the sum of
+        x[m - e + 1], ..., x[m - s] to output sample m, a difference of
+        running sums, so each segment costs O(N) regardless of its length.
+        Integer inputs are accumulated exactly in int64. Floating-point
+        inputs are accumulated in float64 (or wider) with running sums
+        restarted every RUNNING_SUM_BLOCK samples, which keeps the error
+        independent of the signal length. Inputs containing NaN or inf
+        are convolved directly with np.convolve, so that they only affect
+        the outputs they overlap.
+
+        Parameters:
+        -----------
+        x : array-like
+            Dense signal, shape (..., N)
+
+        Returns:
+        --------
+        y : ndarray
+            Convolution, shape (..., length + N - 1), same as
+            np.convolve(np.asarray(self), x)
+        """
+        x = np.asarray(x)
+        N = x.shape[-1]
+        out_dtype = np.result_type(self.dtype, x.dtype)
+        acc = _accumulator_dtype(out_dtype)
+        size = self.length + N - 1
+        if N == 0 or self.length == 0:
+            return np.zeros(x.shape[:-1] + (max(size, 0),), dtype=out_dtype)
+
+        if acc.kind in 'fc' and not np.isfinite(x).all():
+            # A running sum would turn one NaN or inf into NaN for every
+            # later output (inf - inf)
+            h = np.asarray(self).astype(acc)
+            y = np.apply_along_axis(np.convolve, -1, x.astype(acc), h)
+            return y.astype(out_dtype, copy=False)
+
+        segments = [(s, e, v) for s, e, v in
+                    zip(self.starts, self.stops, self.values.astype(acc)) if s < e]
+        if len(segments) == 1 and segments[0][:2] == (0, self.length):
+            # Single boxcar covering the whole signal: no padding needed
+            _, e, v = segments[0]
+            y = _window_sums(x, e, acc)
+            if v != 1:
+                y *= v
+        else:
+            y = np.zeros(x.shape[:-1] + (size,), dtype=acc)
+            for s, e, v in segments:
+                y[..., s:e + N - 1] += v * _window_sums(x, e - s, acc)
+        return y.astype(out_dtype, copy=False)
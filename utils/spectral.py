@@ -0,0 +1,399 @@
+"""
+Incremental Spectral Estimation
+===============================
+
+Streaming autocorrelation and Welch power / cross spectral density
+estimators (Lessons 19-20).
+
+Every estimator is updated block by block with ``process`` and keeps only
+a fixed amount of state (a few segments or lags), however long the
+stream. The estimate can be read at any time, and estimators that ran on
+consecutive pieces of one recording in parallel workers can be combined
+with ``merge``:
+
+    >>> acf = RunningAutocorrelation(max_lag=32)
+    >>> for block in stream:
+    ...     acf.process(block)
+    >>> r = acf.estimate()                 # r[k], k = 0 .. 32
+
+    >>> psd = WelchPSD(nperseg=1024, fs=48000)
+    >>> for block in stream:
+    ...     psd.process(block)
+    >>> f, Pxx = psd.estimate()            # == scipy.signal.welch(..., detrend=False)
+
+Signals may have leading channel dimensions; time runs along the last axis.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import numpy as np
+
+from . import precision
+from .instrumentation import instrument
+
+
+def _scipy_fft():
+    """Import scipy.fft on first use (importing utils stays cheap)."""
+    import scipy.fft
+    return scipy.fft
+
+
+def _lagged_products(history, x, max_lag):
+    """
+    r[k] = sum_n x[n] conj(x[n - k]) over the samples n of block x, for
+    k = 0 .. max_lag, where samples before the block come from `history`
+    (the max_lag samples preceding x).
+    """
+    fft = _scipy_fft()
+    ext = np.concatenate((history, x), axis=-1)
+    size = fft.next_fast_len(ext.shape[-1])
+    a = np.zeros_like(ext)
+    a[..., max_lag:] = x
+    if ext.dtype.kind == 'c':
+        r = fft.ifft(fft.fft(a, size) * np.conj(fft.fft(ext, size)), size)
+    else:
+        r = fft.irfft(fft.rfft(a, size) * np.conj(fft.rfft(ext, size)), size)
+    # a[n] is zero before max_lag, so no product wraps around for k <= max_lag
+    return r[..., :max_lag + 1]
+
+
+class RunningAutocorrelation:
+    """
+    Streaming autocorrelation up to lag `max_lag`.
+
+    Accumulates r[k] = sum_n x[n] conj(x[n - k]) with one FFT per block,
+    keeping only the last max_lag samples between blocks. The result is
+    identical to correlating the whole stream at once.
+
+    Parameters:
+    -----------
+    max_lag : int
+        Largest lag L to estimate
+
+    Examples:
+    ---------
+    >>> acf = RunningAutocorrelation(max_lag=10)
+    >>> acf.process(x[:5000]); acf.process(x[5000:])
+    >>> np.allclose(acf.sums, np.correlate(x, x, 'full')[len(x) - 1:][:11])
+    True
+    """
+
+    def __init__(self, max_lag):
+        if max_lag < 0:
+            raise ValueError("max_lag must be non-negative")
+        self.max_lag = int(max_lag)
+        self.reset()
+
+    def reset(self):
+        """Discard all accumulated statistics."""
+        self.n = 0          # samples seen
+        self.sums = None    # sum of lagged products, shape (..., max_lag + 1)
+        self._head = None   # first max_lag samples (needed by merge)
+        self._tail = None   # last max_lag samples (zeros before the stream)
+
+    @instrument(name='RunningAutocorrelation.process')
+    def process(self, x):
+        """
+        Add the next block of samples.
+
+        Parameters:
+        -----------
+        x : array-like
+            Input block, shape (..., N)
+
+        Returns:
+        --------
+        self : RunningAutocorrelation
+        """
+        x = np.asarray(x)
+        x = x.astype(precision.result_dtype(x), copy=False)
+        L = self.max_lag
+        if self.sums is None:
+            self.sums = np.zeros(x.shape[:-1] + (L + 1,), dtype=x.dtype)
+            self._head = x[..., :0]
+            self._tail = np.zeros(x.shape[:-1] + (L,), dtype=x.dtype)
+        if x.shape[-1] == 0:
+            return self
+
+        self.sums = self.sums + _lagged_products(self._tail, x, L)
+        if self._head.shape[-1] < L:
+            self._head = np.concatenate((self._head, x[..., :L - self._head.shape[-1]]),
+                                        axis=-1)
+        self._tail = np.concatenate((self._tail, x), axis=-1)[..., x.shape[-1]:].copy()
+        self.n += x.shape[-1]
+        return self
+
+    def merge(self, other):
+        """
+        Combine with an estimator that processed the samples right after ours.
+
+        The products that straddle the boundary between the two pieces are
+        added from our last and `other`'s first max_lag samples, so merging
+        is exact: processing [a, b] equals a.merge(b).
+
+        Returns:
+        --------
+        self : RunningAutocorrelation
+        """
+        if other.max_lag != self.max_lag:
+            raise ValueError("cannot merge estimators with different max_lag")
+        if other.sums is None:
+            return self
+        if self.sums is None:
+            self.n, self.sums = other.n, other.sums.copy()
+            self._head, self._tail = other._head.copy(), other._tail.copy()
+            return self
+
+        L = self.max_lag
+        head = other._head
+        cross = (_lagged_products(self._tail, head, L)
+                 - _lagged_products(np.zeros_like(self._tail), head, L))
+        self.sums = self.sums + other.sums + cross
+
+        if self._head.shape[-1] < L:
+            self._head = np.concatenate((self._head, head), axis=-1)[..., :L]
+        seen = min(other.n, L)
+        self._tail = np.concatenate((self._tail, other._tail[..., L - seen:]),
+                                    axis=-1)[..., seen:]
+        self.n += other.n
+        return self
+
+    def estimate(self, biased=True):
+        """
+        Return the autocorrelation estimate for lags 0 .. max_lag.
+
+        Parameters:
+        -----------
+        biased : bool
+            Divide by the number of samples N (default: True; always a
+            valid, positive semi-definite sequence, as used for Wiener
+            filters) or by N - k (unbiased)
+
+        Returns:
+        --------
+        r : ndarray
+            Estimate, shape (..., max_lag + 1)
+        """
+        if self.sums is None or self.n == 0:
+            raise ValueError("no samples processed yet")
+        if biased:
+            return self.sums / self.n
+        counts = np.maximum(self.n - np.arange(self.max_lag + 1), 1)
+        return self.sums / counts
+
+
+class _Welch:
+    """Segmentation and averaging shared by WelchPSD and WelchCSD."""
+
+    def __init__(self, nperseg=256, noverlap=None, window='hann', fs=1.0,
+                 scaling='density', average='mean', alpha=0.1,
+                 return_onesided=True):
+        if nperseg < 1:
+            raise ValueError("nperseg must be at least 1")
+        noverlap = nperseg // 2 if noverlap is None else int(noverlap)
+        if not 0 <= noverlap < nperseg:
+            raise ValueError("noverlap must be in [0, nperseg)")
+        if scaling not in ('density', 'spectrum'):
+            raise ValueError("scaling must be 'density' or 'spectrum'")
+        if average not in ('mean', 'exponential'):
+            raise ValueError("average must be 'mean' or 'exponential'")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+
+        if isinstance(window, (str, tuple)):
+            from scipy.signal import get_window
+            window = get_window(window, nperseg)
+        self.window = np.asarray(window)
+        if self.window.shape != (nperseg,):
+            raise ValueError("window must have nperseg samples")
+
+        self.nperseg, self.noverlap = int(nperseg), noverlap
+        self.step = self.nperseg - noverlap
+        self.fs = fs
+        self.scaling = scaling
+        self.average = average
+        self.alpha = alpha
+        self.return_onesided = return_onesided
+        if scaling == 'density':
+            self._scale = 1.0 / (fs * np.sum(self.window ** 2))
+        else:
+            self._scale = 1.0 / np.sum(self.window) ** 2
+        self.reset()
+
+    def reset(self):
+        """Discard all accumulated statistics."""
+        self.segments = 0      # segments averaged so far
+        self._acc = None       # sum ('mean') or running estimate ('exponential')
+        self._buffer = None    # samples not yet part of a complete segment
+        self._complex = False
+
+    def _periodograms(self, stack):
+        """Cut new segments from the buffered signals and transform them."""
+        buf = stack if self._buffer is None else np.concatenate((self._buffer, stack), axis=-1)
+        available = buf.shape[-1]
+        count = (available - self.nperseg) // self.step + 1 if available >= self.nperseg else 0
+        self._buffer = buf[..., count * self.step:].copy()
+        if count == 0:
+            return None
+
+        frames = np.lib.stride_tricks.sliding_window_view(buf, self.nperseg, axis=-1)
+        frames = frames[..., :count * self.step:self.step, :]
+        fft = _scipy_fft()
+        self._complex = self._complex or buf.dtype.kind == 'c'
+        if self._onesided():
+            return fft.rfft(frames * self.window, axis=-1)
+        return fft.fft(frames * self.window, axis=-1)
+
+    def _onesided(self):
+        return self.return_onesided and not self._complex
+
+    def _accumulate(self, P):
+        """Average the periodograms P, shape (..., segments, bins)."""
+        count = P.shape[-2]
+        if self.average == 'mean':
+            total = P.sum(axis=-2)
+            self._acc = total if self._acc is None else self._acc + total
+        else:
+            if self._acc is None:
+                self._acc, P, count = P[..., 0, :], P[..., 1:, :], count - 1
+                self.segments += 1
+            # est <- (1 - a) est + a P_s for every segment s, in one step
+            decay = (1 - self.alpha) ** np.arange(count - 1, -1, -1)
+            self._acc = ((1 - self.alpha) ** count * self._acc
+                         + self.alpha * np.einsum('...sf,s->...f', P, decay))
+        self.segments += count
+
+    def merge(self, other):
+        """
+        Add the segments averaged by another estimator ('mean' only).
+
+        For the result to match one estimator run over the whole signal,
+        each worker's piece must start at a multiple of the segment step and
+        overlap the previous piece by noverlap samples.
+
+        Returns:
+        --------
+        self
+        """
+        if self.average != 'mean' or other.average != 'mean':
+            raise ValueError("only average='mean' estimators can be merged")
+        if (other.nperseg, other.noverlap, other.fs, other.scaling) != \
+                (self.nperseg, self.noverlap, self.fs, self.scaling) or \
+                not np.array_equal(other.window, self.window):
+            raise ValueError("cannot merge estimators with different parameters")
+        if other._acc is not None:
+            self._acc = other._acc.copy() if self._acc is None else self._acc + other._acc
+            self.segments += other.segments
+            self._complex = self._complex or other._complex
+        return self
+
+    def estimate(self):
+        """
+        Return the frequencies and the current spectral estimate.
+
+        Returns:
+        --------
+        f : ndarray
+            Frequencies in units of fs
+        P : ndarray
+            Estimate, shape (..., len(f))
+        """
+        if self._acc is None:
+            raise ValueError("no complete segment processed yet")
+        fft = _scipy_fft()
+        P = self._acc * self._scale
+        if self.average == 'mean':
+            P = P / self.segments
+        if self._onesided():
+            # Fold the negative frequencies onto the positive ones
+            P = P.copy()
+            last = -1 if self.nperseg % 2 == 0 else None
+            P[..., 1:last] *= 2
+            return fft.rfftfreq(self.nperseg, 1 / self.fs), P
+        return fft.fftfreq(self.nperseg, 1 / self.fs), P
+
+
+class WelchPSD(_Welch):
+    """
+    Streaming Welch power spectral density estimate.
+
+    Segments of nperseg samples overlapping by noverlap are windowed and
+    their periodograms averaged, either with equal weights ('mean', the
+    same result as scipy.signal.welch with detrend=False) or exponentially
+    ('exponential', est <- (1 - alpha) est + alpha P, which tracks slowly
+    changing spectra). Only the samples of one partial segment are kept
+    between blocks.
+
+    Parameters:
+    -----------
+    nperseg : int
+        Segment length (default: 256)
+    noverlap : int, optional
+        Overlap between segments (default: nperseg // 2)
+    window : str, tuple or array-like
+        Window name for scipy.signal.get_window, or the window samples
+        (default: 'hann')
+    fs : float
+        Sampling frequency (default: 1.0)
+    scaling : str
+        'density' (V**2/Hz) or 'spectrum' (V**2) (default: 'density')
+    average : str
+        'mean' or 'exponential' (default: 'mean')
+    alpha : float
+        Weight of the newest segment for average='exponential' (default: 0.1)
+    return_onesided : bool
+        One-sided spectrum for real signals (default: True)
+
+    Examples:
+    ---------
+    >>> psd = WelchPSD(nperseg=512, fs=8000)
+    >>> for block in blocks:
+    ...     psd.process(block)
+    >>> f, Pxx = psd.estimate()
+    """
+
+    @instrument(name='WelchPSD.process')
+    def process(self, x):
+        """
+        Add the next block of samples, shape (..., N).
+
+        Returns:
+        --------
+        self : WelchPSD
+        """
+        X = self._periodograms(np.asarray(x))
+        if X is not None:
+            self._accumulate(X.real ** 2 + X.imag ** 2)
+        return self
+
+
+class WelchCSD(_Welch):
+    """
+    Streaming Welch cross spectral density estimate of two signals.
+
+    Pxy = average of conj(X) * Y over segments, the convention of
+    scipy.signal.csd. Takes the same parameters as WelchPSD.
+
+    Examples:
+    ---------
+    >>> csd = WelchCSD(nperseg=512)
+    >>> csd.process(x_block, y_block)
+    >>> f, Pxy = csd.estimate()
+    """
+
+    @instrument(name='WelchCSD.process')
+    def process(self, x, y):
+        """
+        Add the next blocks of both signals, each shape (..., N).
+
+        Returns:
+        --------
+        self : WelchCSD
+        """
+        x, y = np.broadcast_arrays(np.asarray(x), np.asarray(y))
+        XY = self._periodograms(np.stack((x, y), axis=-2))
+        if XY is not None:
+            X, Y = XY[..., 0, :, :], XY[..., 1, :, :]
+            self._accumulate(np.conj(X) * Y)
+        return self
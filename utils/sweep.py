@@ -0,0 +1,364 @@
+"""
+Cached Parameter Sweeps
+=======================
+
+Run a lesson's compute function over a grid of parameters, in parallel,
+and keep every result on disk so that a rerun only evaluates the points
+whose inputs changed.
+
+Each grid point is stored under a content hash of
+
+* the parameters (numbers, strings, ranges, arrays, ... by value),
+* the code version: the source of the function's module and of every
+  repository module it imports, directly or through other modules (e.g.
+  utils/common_functions.py for a lesson that uses exponential_sequence,
+  and utils/sparse_signals.py, which that module imports in turn), and
+* the runtime policy: the precision defaults and the kernel backend,
+  which are also applied in the worker processes.
+
+Editing the lesson or any utils module it depends on, or running under
+a different precision or backend, therefore gives new cache entries;
+adding grid points only computes the new ones.
+
+    >>> from lessons.lesson_03.examples.convolution_basics import compute_exponential
+    >>> runner = SweepRunner(compute_exponential)
+    >>> results = runner.run(grid(alpha=[0.5, 0.7, 0.9], length=[8, 64]))
+    >>> runner.computed, runner.cached
+    (6, 0)
+
+or from the command line (values are Python literals):
+
+    python -m utils.sweep lessons.lesson_03.examples.convolution_basics:compute_exponential \\
+        alpha=0.5,0.7,0.9 length=8,64
+
+Results are pickled to DSP_SWEEP_CACHE (default: .sweep_cache/ in the
+repository root). Compute functions must be module-level so they can be
+sent to worker processes, and must depend only on their arguments.
+
+Author: DSP-in-Python Repository
+License: MIT
+"""
+
+import ast
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import itertools
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from . import backends, precision
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def default_cache_dir():
+    """DSP_SWEEP_CACHE if set, otherwise .sweep_cache/ in the repository root."""
+    return Path(os.environ.get('DSP_SWEEP_CACHE') or REPO_ROOT / '.sweep_cache')
+
+
+def grid(**axes):
+    """
+    Cartesian product of parameter values.
+
+    Parameters:
+    -----------
+    **axes : iterables
+        Values for each parameter
+
+    Returns:
+    --------
+    points : list of dict
+        One dict per combination, the last parameter varying fastest
+
+    Examples:
+    ---------
+    >>> grid(alpha=[0.5, 0.9], length=[8])
+    [{'alpha': 0.5, 'length': 8}, {'alpha': 0.9, 'length': 8}]
+    """
+    names = list(axes)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(list(axes[name]) for name in names))]
+
+
+def _canonical(value):
+    """
+    A deterministic text form of a parameter value for hashing.
+
+    Equal values give equal text whatever their container or numpy scalar
+    type (0.7 and np.float64(0.7) hash alike); arrays are hashed by dtype,
+    shape and contents.
+    """
+    if isinstance(value, np.ndarray):
+        data = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return f"ndarray({value.dtype.str},{value.shape},{data})"
+    if isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, dict):
+        items = sorted((str(k), _canonical(v)) for k, v in value.items())
+        return '{' + ','.join(f"{k!r}:{v}" for k, v in items) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_canonical(v) for v in value) + ']'
+    if isinstance(value, (bool, int, float, complex, str, bytes, range, type(None))):
+        return repr(value)
+    raise TypeError(f"cannot hash parameter of type {type(value).__name__}")
+
+
+def _repo_spec(name):
+    """(path, package) of a repository module, or None for anything else."""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.has_location or not spec.origin.endswith('.py'):
+        return None
+    path = Path(spec.origin).resolve()
+    return (path, spec.parent) if path.is_relative_to(REPO_ROOT) else None
+
+
+def _imports(path, package):
+    """Absolute names of the repository modules a source file imports."""
+    names = set()
+    for node in ast.walk(ast.parse(path.read_bytes(), str(path))):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level and not package:
+                continue
+            base = importlib.util.resolve_name('.' * node.level + (node.module or ''),
+                                               package) if node.level else node.module
+            names.add(base)
+            for alias in node.names:
+                if _repo_spec(f"{base}.{alias.name}") is not None:
+                    names.add(f"{base}.{alias.name}")  # a submodule
+                elif _repo_spec(base) is not None:
+                    # A name exported by a repository package (possibly
+                    # lazily, as utils does): follow it to its module
+                    value = getattr(importlib.import_module(base), alias.name, None)
+                    if isinstance(getattr(value, '__module__', None), str):
+                        names.add(value.__module__)
+    return names
+
+
+def _repo_modules(module):
+    """
+    Source files of the module and of every repository module it depends
+    on, directly or through other repository modules: {name: path}.
+    """
+    found = {module.__name__: Path(module.__file__).resolve()}
+    todo = [(found[module.__name__], module.__package__)]
+    while todo:
+        path, package = todo.pop()
+        for name in _imports(path, package):
+            spec = _repo_spec(name) if name not in found else None
+            if spec is not None:
+                found[name] = spec[0]
+                todo.append(spec)
+    return found
+
+
+def code_version(func):
+    """
+    Hash of the source code a compute function depends on.
+
+    Covers the module defining func and every repository module it
+    imports, directly or indirectly (found by reading their import
+    statements); library code (numpy, scipy) is not included.
+    """
+    digest = hashlib.sha256()
+    for name, path in sorted(_repo_modules(inspect.getmodule(func)).items()):
+        digest.update(name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def runtime_policy():
+    """
+    The process-wide settings that change results: the default and
+    accumulation dtypes (utils/precision.py) and the kernel backend
+    (utils/backends.py).
+    """
+    accumulate = precision.get_accumulate_dtype()
+    return {'dtype': precision.get_default_dtype().name,
+            'accumulate': None if accumulate is None else np.dtype(accumulate).name,
+            'backend': backends.get_backend()}
+
+
+def _evaluate(job):
+    # Worker processes start with the default policy: apply the caller's
+    func, params, policy = job
+    with precision.precision(policy['dtype'], accumulate=policy['accumulate']), \
+            backends.backend(policy['backend']):
+        return func(**params)
+
+
+class SweepRunner:
+    """
+    Evaluate a compute function over parameter points with an on-disk cache.
+
+    Parameters:
+    -----------
+    func : callable
+        Module-level function taking the sweep parameters as keyword
+        arguments and returning a picklable result
+    cache_dir : str or Path, optional
+        Cache root (default: default_cache_dir())
+    workers : int, optional
+        Number of worker processes (default: one per CPU, capped at the
+        number of points to compute; 1 computes in-process)
+
+    Attributes:
+    -----------
+    computed, cached : int
+        How many points the last run() evaluated and loaded from the cache
+
+    Examples:
+    ---------
+    >>> runner = SweepRunner(compute_signals, workers=4)
+    >>> results = runner.run(grid(a=[0.5, 0.8], omega=[np.pi / 8, np.pi / 4]))
+    """
+
+    def __init__(self, func, cache_dir=None, workers=None):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.directory = Path(cache_dir or default_cache_dir()) / self.name
+        self.workers = workers
+        self.computed = 0
+        self.cached = 0
+
+    def key(self, params, version=None, policy=None):
+        """Content hash of one parameter point for the current code and policy."""
+        version = code_version(self.func) if version is None else version
+        policy = runtime_policy() if policy is None else policy
+        text = f"{self.name}\n{version}\n{_canonical(policy)}\n{_canonical(dict(params))}"
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}.pkl"
+
+    def _load(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return True, pickle.load(f)['result']
+        except FileNotFoundError:
+            return False, None
+        except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+            return False, None  # unreadable entry: compute it again
+
+    def _store(self, key, params, result):
+        # Write to a temporary file and rename, so readers never see half a file
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'params': params, 'result': result}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def stale(self, points):
+        """Return the points that are not in the cache for the current code and policy."""
+        version, policy = code_version(self.func), runtime_policy()
+        return [dict(p) for p in points
+                if not self._path(self.key(p, version, policy)).exists()]
+
+    def run(self, points):
+        """
+        Evaluate func at every point, reusing cached results.
+
+        Parameters:
+        -----------
+        points : iterable of dict
+            Keyword arguments for func, e.g. from grid()
+
+        Returns:
+        --------
+        results : list
+            func(**point) for every point, in order
+        """
+        points = [dict(p) for p in points]
+        version, policy = code_version(self.func), runtime_policy()
+        keys = [self.key(p, version, policy) for p in points]
+
+        results, todo = [None] * len(points), {}
+        for i, key in enumerate(keys):
+            found, result = self._load(key)
+            if found:
+                results[i] = result
+            else:
+                todo.setdefault(key, []).append(i)  # duplicates computed once
+
+        jobs = [(self.func, points[indices[0]], policy) for indices in todo.values()]
+        workers = self.workers or os.cpu_count() or 1
+        workers = max(1, min(workers, len(jobs)))
+        if workers == 1:
+            values = map(_evaluate, jobs)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            values = pool.map(_evaluate, jobs)
+        try:
+            for (key, indices), (_, params, _), result in zip(todo.items(), jobs, values):
+                self._store(key, params, result)
+                for i in indices:
+                    results[i] = result
+        finally:
+            if workers > 1:
+                pool.shutdown(cancel_futures=True)
+
+        self.computed = len(jobs)
+        self.cached = len(points) - sum(len(indices) for indices in todo.values())
+        return results
+
+    def clear(self):
+        """Delete every cached result of this function (all code versions)."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _parse_axis(text):
+    """'alpha=0.5,0.7' -> ('alpha', [0.5, 0.7]); values are Python literals."""
+    name, _, values = text.partition('=')
+    if not name or not values:
+        raise ValueError(f"expected name=value[,value...], got {text!r}")
+    parsed = ast.literal_eval(values + ',')
+    return name.strip(), list(parsed)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Run a compute function over a parameter grid with caching.')
+    parser.add_argument('function', help='module:function, e.g. '
+                        'lessons.lesson_03.examples.convolution_basics:compute_exponential')
+    parser.add_argument('axes', nargs='*', metavar='name=v1,v2,...')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--clear', action='store_true',
+                        help='delete the cached results first')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(REPO_ROOT))
+    module, _, name = args.function.partition(':')
+    func = getattr(importlib.import_module(module), name)
+    runner = SweepRunner(func, cache_dir=args.cache_dir, workers=args.workers)
+    if args.clear:
+        runner.clear()
+    points = grid(**dict(_parse_axis(axis) for axis in args.axes))
+    runner.run(points)
+    print(f"{runner.name}: {len(points)} points, {runner.computed} computed, "
+          f"{runner.cached} cached ({runner.directory})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())